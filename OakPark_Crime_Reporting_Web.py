@@ -9,15 +9,17 @@ import time
 from datetime import datetime
 import string
 import googlemaps
-import zipfile
 
 from utils import (
     load_env_vars,
     normalize_location,
     load_json_cache,
     save_json_cache,
+    save_zip,
+    load_csv_data,
     fetch_pdf_links,
     download_pdf,
+    check_pdf_cache,
     extract_data_from_pdf,
     clean_narrative_basic,
     process_narrative_nlp,
@@ -25,11 +27,28 @@ from utils import (
     clean_text,
     get_lat_long,
     get_api_call_count,
+    set_geocode_budget,
+    set_location_match_log,
+    validate_location_cache,
+    validate_dataset_coordinates,
+    set_pdf_text_backend,
+    retry_failed_geocodes,
+    backfill_coordinates,
     extract_year,
     git_commit_and_force_push, 
     synchronize_repository,
     upload_files
 )
+from migrate_location_cache import ensure_location_cache_current
+from text_repair import ensure_merge_table, load_merge_table, set_narrative_merges
+from narrative_search import update_narrative_index
+from rollups import update_rollup_store
+from complaint_index import load_complaint_numbers, empty_key_index, update_key_index
+from offense_taxonomy import update_offense_map_file
+from ingest_pipeline import run_ingest_pipeline
+from ingest_checkpoint import IngestCheckpoint
+from log_config import configure_logging
+from pipeline_metrics import reset_metrics, stage_timer, add_timing, increment, record_pdf_duration, write_run_record
 
 # Ensure you've downloaded stopwords once:
 # nltk.download('stopwords')
@@ -37,6 +56,7 @@ from utils import (
 
 def main():
     start_time = time.time()
+    reset_metrics()
     start_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     # Determine the directory where this script resides
@@ -78,9 +98,22 @@ def main():
     output_zip_path = data_dir / 'summary_report.zip'
     cache_path = cache_dir / 'pdf_cache.json'
     location_cache_path = cache_dir / 'location_cache.json'
+    narrative_merges_path = cache_dir / 'narrative_merges.json'
+    narrative_index_path = cache_dir / 'narrative_index.sqlite'
+    rollups_path = cache_dir / 'rollups.npz'
+    checkpoint_path = cache_dir / 'ingest_checkpoint.jsonl'
+    complaint_index_path = cache_dir / 'complaint_index.npz'
+    offense_map_path = cache_dir / 'offense_map.json'
+    location_match_log_path = cache_dir / 'location_matches.jsonl'
     reprocess = True
     redownload = False
     reprocess_locs = False    # Flag for reprocessing locations
+    geocode_budget = 250      # Max geocoding API calls per run (None = unlimited)
+    pdf_text_backend = None   # pypdf2, pdfminer or pypdfium2 (None = OP_CRIME_PDF_BACKEND env var, then pypdf2)
+    use_pipeline = False      # Overlap download, parse and geocode stages (for backfills)
+    pipeline_settings = {}    # Stage concurrency overrides, e.g. {"parse_workers": 2, "geocode_rate": 5.0}
+    checkpoint_every_pdfs = 25   # Checkpoint caches and rows after this many PDFs...
+    checkpoint_every_sec = 300   # ...or this many seconds, whichever comes first
 
     # Create download directory if it doesn't exist
     download_dir.mkdir(parents=True, exist_ok=True)
@@ -88,37 +121,49 @@ def main():
     # Load caches
     pdf_cache = load_json_cache(cache_path)
     location_cache = load_json_cache(location_cache_path)
+    # Rewrite cache keys if the location normalizer changed since the last run
+    ensure_location_cache_current(location_cache_path, location_cache)
+    # Coordinates outside the village are queued for a bounded re-geocode,
+    # which the retry pass below spends the remaining budget on
+    with stage_timer("geofence"):
+        queued_outliers, out_of_town = validate_location_cache(location_cache)
+    if queued_outliers or out_of_town:
+        logging.info(f"Geofence: queued {queued_outliers} cached location(s) outside Oak Park for re-geocoding; "
+                     f"accepted {out_of_town} as out of town.")
+        print(f"Geofence: queued {queued_outliers} cached location(s) outside Oak Park for re-geocoding.")
+    set_geocode_budget(geocode_budget)
+    # Locations resolved from a near-identical cached one, for review
+    set_location_match_log(location_match_log_path)
+    pdf_text_backend = set_pdf_text_backend(pdf_text_backend)
+    logging.info(f"Using PDF text backend '{pdf_text_backend}'.")
 
     # Initialize complaint number tracker
     complaint_number_tracker = defaultdict(int)  # Tracks occurrence of each complaint number
 
-    # Initialize existing complaint numbers
-    existing_complaint_numbers = set()
-    # Prioritize zip file
-    if output_zip_path.exists():
-        try:
-            existing_df = pd.read_csv(output_zip_path, compression='zip', encoding="cp1252", encoding_errors='replace')
-            existing_complaint_numbers = set(existing_df["Complaint #"].dropna())
-            logging.info(f"Loaded existing data from '{output_zip_path}'.")
-            print(f"Loaded existing data from '{output_zip_path}'.")
-        except Exception as e:
-            logging.warning(f"Could not read CSV from zip '{output_zip_path}': {e}")
-            print(f"Warning: Could not read CSV from zip '{output_zip_path}': {e}")
-    elif output_csv_path.exists():
-        try:
-            existing_df = pd.read_csv(output_csv_path, encoding="cp1252", encoding_errors='replace')
-            existing_complaint_numbers = set(existing_df["Complaint #"].dropna())
-            logging.info(f"Loaded existing data from '{output_csv_path}'.")
-            print(f"Loaded existing data from '{output_csv_path}'.")
-        except Exception as e:
-            logging.warning(f"Could not read existing CSV '{output_csv_path}': {e}")
-            print(f"Warning: Could not read existing CSV '{output_csv_path}': {e}")
+    # Complaint numbers already in the dataset, from the key index (the
+    # dataset itself is only read if the index is missing or stale)
+    dataset_path = output_zip_path if output_zip_path.exists() else output_csv_path
+    if dataset_path.exists():
+        with stage_timer("complaint_index"):
+            existing_complaint_numbers, complaint_key_index = load_complaint_numbers(complaint_index_path, dataset_path)
+        logging.info(f"Loaded {len(existing_complaint_numbers)} existing complaint numbers for '{dataset_path}'.")
+        print(f"Loaded {len(existing_complaint_numbers)} existing complaint numbers for '{dataset_path}'.")
     else:
+        existing_complaint_numbers, complaint_key_index = set(), empty_key_index()
         logging.info("No existing data found. Starting fresh.")
         print("No existing data found. Starting fresh.")
 
+    # Split-word repair table, built once from the existing narratives
+    if existing_complaint_numbers and not narrative_merges_path.exists():
+        existing_df = load_csv_data(output_csv_path, output_zip_path)
+        narrative_merges = ensure_merge_table(narrative_merges_path, existing_df["Narrative"])
+    else:
+        narrative_merges = load_merge_table(narrative_merges_path)
+    set_narrative_merges(narrative_merges)
+
     # Fetch PDF links
-    pdf_links = fetch_pdf_links(base_url)
+    with stage_timer("link_fetch"):
+        pdf_links = fetch_pdf_links(base_url)
     logging.info(f"Found {len(pdf_links)} PDF links to process.")
     print(f"Found {len(pdf_links)} PDF links to process.")
 
@@ -130,58 +175,21 @@ def main():
     complaints_with_errors = 0
     duplicate_complaints_count = 0  # Initialize duplicate complaints count
 
-    for pdf_link in pdf_links:
-        pdf_url = pdf_link
-        pdf_path = download_pdf(pdf_url, download_dir, redownload=redownload)
-        # print(pdf_url)
-        if not pdf_path:
-            continue  # Skip if download failed
-
+    def record_pdf_result(pdf_path, file_info, report_data, log_entries, resumed=False):
+        """
+        Book one processed PDF: counters, its pdf_cache entry and its rows.
+        Called in PDF completion order by whichever ingest path runs, and
+        for each PDF replayed from an interrupted run's checkpoint.
+        """
+        nonlocal complaints_processed, invalid_dates_count, complaints_with_errors
         filename = Path(pdf_path).name
-        try:
-            pdf_size = Path(pdf_path).stat().st_size
-            pdf_mtime = Path(pdf_path).stat().st_mtime
-        except OSError as e:
-            logging.error(f"Failed to get stats for '{pdf_path}': {e}")
-            print(f"Failed to get stats for '{pdf_path}': {e}")
-            continue
-
-        cache_info = pdf_cache.get(filename, {})
-        if cache_info:
-            cached_size = cache_info.get("file_size", -1)
-            cached_mtime = cache_info.get("last_modified", -1)
-            pdf_all_err_free = cache_info.get("all_error_free", False)
-            complaint_list = cache_info.get("complaints", [])
-
-            if (
-                pdf_size == cached_size
-                and pdf_mtime == cached_mtime
-                and pdf_all_err_free
-                and all(c in existing_complaint_numbers for c in complaint_list)
-            ):
-                logging.info(f"Skipping '{filename}' (cache says all error-free + all in CSV + unchanged).")
-                print(f"Skipping '{filename}' (cache says all error-free + all in CSV + unchanged).")
-                continue
-            else:
-                logging.info(f"Reprocessing '{filename}' because changed or missing from CSV...")
-                print(f"Reprocessing '{filename}' because changed or missing from CSV...")
-        else:
-            logging.info(f"No cache entry for '{filename}'; processing...")
-            print(f"No cache entry for '{filename}'; processing...")
-
-        # **Pass existing_complaint_numbers to prevent double processing**
-        report_data, log_entries = extract_data_from_pdf(
-            pdf_path,
-            gmaps_client,
-            location_cache,
-            reprocess_locs,
-            existing_complaint_numbers,  # Pass existing complaint numbers
-            pdf_url
-        )
-
         if not report_data:
             logging.warning(f"No new data extracted from '{filename}'.")
-            continue
+            # Keep the digest and stat so an unchanged PDF is not hashed and
+            # reprocessed again next run
+            if filename in pdf_cache and file_info:
+                pdf_cache[filename].update(file_info)
+            return
 
         all_error_free = True
         complaint_nums = []
@@ -201,25 +209,134 @@ def main():
         pdf_cache[filename] = {
             "complaints": complaint_nums,
             "all_error_free": all_error_free,
-            "file_size": pdf_size,
-            "last_modified": pdf_mtime
+            **file_info
         }
 
         all_report_data.extend(report_data)
         all_log_entries.extend(log_entries)
+        if not resumed:
+            checkpoint.add(pdf_path, file_info, report_data, log_entries)
+
+    # Resume an interrupted run: its finished PDFs count as processed, and
+    # their complaints are skipped if the PDFs are parsed again
+    checkpoint = IngestCheckpoint(
+        checkpoint_path,
+        {cache_path: pdf_cache, location_cache_path: location_cache},
+        every_pdfs=checkpoint_every_pdfs,
+        every_sec=checkpoint_every_sec
+    )
+    resumed_results = checkpoint.load()
+    for pdf_path, file_info, report_data, log_entries in resumed_results:
+        record_pdf_result(pdf_path, file_info, report_data, log_entries, resumed=True)
+        existing_complaint_numbers.update(row["Complaint #"] for row in report_data)
+    if resumed_results:
+        logging.info(f"Resumed {len(resumed_results)} PDF(s) ({len(all_report_data)} rows) from '{checkpoint_path}'.")
+        print(f"Resumed {len(resumed_results)} PDF(s) ({len(all_report_data)} rows) from '{checkpoint_path}'.")
+
+    if use_pipeline:
+        # Overlap downloads, parsing and geocoding (see ingest_pipeline.py)
+        run_ingest_pipeline(
+            pdf_links,
+            download_dir,
+            gmaps_client,
+            location_cache,
+            pdf_cache,
+            existing_complaint_numbers,
+            record_pdf_result,
+            redownload=redownload,
+            reprocess_locs=reprocess_locs,
+            **pipeline_settings
+        )
+    else:
+        for pdf_link in pdf_links:
+            pdf_url = pdf_link
+            with stage_timer("download"):
+                pdf_path = download_pdf(pdf_url, download_dir, redownload=redownload)
+            # print(pdf_url)
+            if not pdf_path:
+                continue  # Skip if download failed
+
+            process_pdf, file_info = check_pdf_cache(pdf_path, pdf_cache, existing_complaint_numbers)
+            if not process_pdf:
+                continue
+
+            # **Pass existing_complaint_numbers to prevent double processing**
+            pdf_start = time.perf_counter()
+            report_data, log_entries = extract_data_from_pdf(
+                pdf_path,
+                gmaps_client,
+                location_cache,
+                reprocess_locs,
+                existing_complaint_numbers,  # Pass existing complaint numbers
+                pdf_url
+            )
+            record_pdf_duration(Path(pdf_path).name, time.perf_counter() - pdf_start, len(report_data))
+            increment("pdfs_processed")
+
+            record_pdf_result(pdf_path, file_info, report_data, log_entries)
+
+    # Spend any remaining geocoding budget on failed locations that are due for a retry
+    retried_locations = retry_failed_geocodes(location_cache, gmaps_client)
+    if retried_locations:
+        logging.info(f"Resolved {retried_locations} previously failed location(s) on retry.")
+        print(f"Resolved {retried_locations} previously failed location(s) on retry.")
 
     # Save caches
-    save_json_cache(cache_path, pdf_cache)
-    save_json_cache(location_cache_path, location_cache)
+    with stage_timer("cache_save"):
+        # Journal PDFs finished since the last checkpoint in case the dataset write fails
+        checkpoint.save(save_caches=False)
+        save_json_cache(cache_path, pdf_cache)
+        save_json_cache(location_cache_path, location_cache)
+
+    if not all_report_data:
+        checkpoint.clear()
+
+    def update_derived_indexes(dataset_df):
+        """
+        Bring the files derived from the dataset up to date after it was written.
+
+        Each one is updated on its own: a failure is logged and the file
+        catches up from the full dataset on the next run, without affecting
+        the dataset write or the other indexes.
+        """
+        updates = (
+            ("search_index", narrative_index_path,
+             lambda: update_narrative_index(narrative_index_path, dataset_df),
+             "Indexed {} new or changed narrative(s) in '{}'."),
+            ("rollups", rollups_path,
+             lambda: update_rollup_store(rollups_path, dataset_df),
+             "Added {} new complaint(s) to the rollups in '{}'."),
+            ("complaint_index", complaint_index_path,
+             lambda: update_key_index(complaint_index_path, complaint_key_index, all_report_data, output_zip_path),
+             "Added {} new complaint number(s) to '{}'."),
+            ("offense_map", offense_map_path,
+             lambda: update_offense_map_file(offense_map_path, dataset_df["Offense"]),
+             "Typed {} new offense text(s) in '{}'."),
+        )
+        for stage, path, update, message in updates:
+            try:
+                with stage_timer(stage):
+                    result = update()
+            except Exception as e:
+                logging.error(f"Failed to update '{path}': {e}")
+                print(f"Failed to update '{path}': {e}")
+                continue
+            if result is not None:
+                logging.info(message.format(result, path))
 
     if all_report_data:
         try:
+            merge_start = time.perf_counter()
             if output_zip_path.exists():
                 existing_df = pd.read_csv(output_zip_path, compression='zip', encoding="cp1252", encoding_errors='replace')
                 new_df = pd.DataFrame(all_report_data)
 
                 combined_df = pd.concat([existing_df, new_df], ignore_index=True)
                 combined_df.drop_duplicates(subset=["Complaint #", "File Name"], keep="first", inplace=True)
+                backfill_coordinates(combined_df, location_cache)
+                with stage_timer("geofence"):
+                    geofence_counts = validate_dataset_coordinates(combined_df, location_cache)
+                logging.info(f"Geofence check of the dataset: {geofence_counts}.")
                 combined_df.sort_values(by="Date", ascending=False, inplace=True)
 
                 # Calculate duplicates BEFORE writing to zip
@@ -234,6 +351,9 @@ def main():
                     logging.info(f"Duplicated Complaint Numbers: {duplicate_list}")
                     print(f"Duplicated Complaint Numbers: {duplicate_list}")
 
+                add_timing("merge", time.perf_counter() - merge_start)
+                write_start = time.perf_counter()
+
                 # Write to a temporary CSV before zipping
                 temp_csv = data_dir / 'summary_report.csv'
                 combined_df.to_csv(
@@ -244,17 +364,27 @@ def main():
                 )
 
                 # Zip the CSV
-                with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    zipf.write(temp_csv, arcname='summary_report.csv')
+                save_zip(output_zip_path, temp_csv, 'summary_report.csv')
+
+                add_timing("write", time.perf_counter() - write_start)
 
                 # Remove the temporary CSV
                 # temp_csv.unlink()
 
+                # The rows are in the dataset now; a rerun must not replay them
+                checkpoint.clear()
+
                 logging.info(f"Appended new data to '{output_zip_path}'.")
                 print(f"Appended new data to '{output_zip_path}'.")
+
+                # Only new or changed rows are written to the search index
+                update_derived_indexes(combined_df)
             else:
                 new_df = pd.DataFrame(all_report_data)
                 new_df.drop_duplicates(subset=["Complaint #", "File Name"], keep="first", inplace=True)
+                with stage_timer("geofence"):
+                    geofence_counts = validate_dataset_coordinates(new_df, location_cache)
+                logging.info(f"Geofence check of the dataset: {geofence_counts}.")
                 new_df.sort_values(by="Date", ascending=False, inplace=True)
 
                 # Calculate duplicates BEFORE writing to zip
@@ -269,6 +399,9 @@ def main():
                     logging.info(f"Duplicated Complaint Numbers: {duplicate_list}")
                     print(f"Duplicated Complaint Numbers: {duplicate_list}")
 
+                add_timing("merge", time.perf_counter() - merge_start)
+                write_start = time.perf_counter()
+
                 # Write to a temporary CSV before zipping
                 temp_csv = data_dir / 'summary_report.csv'
                 new_df.to_csv(
@@ -279,14 +412,21 @@ def main():
                 )
 
                 # Zip the CSV
-                with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    zipf.write(temp_csv, arcname='summary_report.csv')
+                save_zip(output_zip_path, temp_csv, 'summary_report.csv')
+
+                add_timing("write", time.perf_counter() - write_start)
 
                 # Remove the temporary CSV
                 # temp_csv.unlink()
 
+                # The rows are in the dataset now; a rerun must not replay them
+                checkpoint.clear()
+
                 logging.info(f"Created new zip archive '{output_zip_path}'.")
                 print(f"Created new '{output_zip_path}'.")
+
+                # Only new or changed rows are written to the search index
+                update_derived_indexes(new_df)
         except Exception as e:
             logging.error(f"Error writing to zip '{output_zip_path}': {e}")
             print(f"Error writing to zip '{output_zip_path}': {e}")
@@ -328,6 +468,22 @@ def main():
         logging.error(f"Failed to write logs to '{log_file_path}': {e}")
         print(f"Failed to write logs to '{log_file_path}': {e}")
 
+    # Structured per-stage metrics, one JSON line per run next to the text log
+    run_record_path = script_dir / f"logs_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+    if write_run_record(
+        run_record_path,
+        start_time=start_time_str,
+        end_time=end_time_str,
+        total_sec=round(total_time_sec, 3),
+        complaints_processed=complaints_processed,
+        invalid_dates=invalid_dates_count,
+        complaints_with_errors=complaints_with_errors,
+        duplicate_complaint_numbers=num_unique_duplicate_complaints,
+        geocoding_api_calls=get_api_call_count()
+    ):
+        logging.info(f"Run metrics written to '{run_record_path}'.")
+        print(f"Run metrics written to '{run_record_path}'.")
+
     # Compute the "error rate"
     # Here, we'll define error_rate as fraction of complaints that had "Error Free = 0"
     # Example: 5% = 0.05,  or you could do 5.00 for 5%.
@@ -359,7 +515,7 @@ def main():
     commit_message = f"Automated update on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
     # Upload desired files (e.g., logs and error_rate file) to a target subfolder
-    files_to_upload = [log_file_path, error_rate_file]
+    files_to_upload = [log_file_path, run_record_path, error_rate_file]
     target_subfolder = "crime_map_outputs"  # Adjust as needed
     upload_files(github_repo_path, files_to_upload, target_subfolder)
 
@@ -369,13 +525,9 @@ def main():
     print("daily crime map update process completed with forced Git push.")
     logging.info("daily crime map update process completed with forced Git push.")
 if __name__ == '__main__':
-    # Configure logging
+    # Configure logging: size-rotated file, profile from OP_CRIME_LOG_PROFILE (debug/verbose/quiet)
     script_dir = Path(__file__).parent.resolve()  # Ensure log file is in script directory
-    logging.basicConfig(
-        filename=script_dir / f'processing_{datetime.now().strftime("%Y_%m_%d_%H_%M_%S")}.log',  # Updated to store log in script directory
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    configure_logging(script_dir / 'processing.log')
     
     # Ensure stopwords are downloaded: nltk.download('stopwords')
     main()
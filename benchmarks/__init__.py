@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+Offline benchmarks for the OP-Crime pipeline stages.
+
+Run with `python -m benchmarks` from the repository root.
+"""
@@ -0,0 +1,37 @@
+# benchmarks/fake_gmaps.py
+
+from utils import normalize_location, location_entry_coords
+
+ADDRESS_SUFFIX = " Street, Oak Park, IL, 60302"
+
+
+class FakeGmapsClient:
+    """
+    Stand-in for googlemaps.Client that answers geocode() from a location
+    cache, so extraction can be benchmarked without network access or cost.
+    """
+
+    def __init__(self, location_cache):
+        self.location_cache = location_cache
+        self.calls = 0
+
+    def geocode(self, address, bounds=None):
+        """
+        Mimic googlemaps.Client.geocode for addresses built by get_lat_long.
+
+        Args:
+            address (str): Full address ('<location> Street, Oak Park, IL, 60302').
+            bounds (dict): Viewport bias; ignored.
+
+        Returns:
+            list: One result with geometry.location, or [] when not cached.
+        """
+        self.calls += 1
+        location = address[:-len(ADDRESS_SUFFIX)] if address.endswith(ADDRESS_SUFFIX) else address
+        entry = self.location_cache.get(normalize_location(location))
+        if entry is None:
+            return []
+        lat, lng = location_entry_coords(entry)
+        if lat is None or lng is None:
+            return []
+        return [{"geometry": {"location": {"lat": lat, "lng": lng}}}]
@@ -0,0 +1,58 @@
+# benchmarks/geofence_cases.py
+
+import sys
+
+from utils import names_other_town
+
+# Location strings and whether they name a town other than Oak Park
+OTHER_TOWN_CASES = [
+    # Another town after a comma, or a neighboring town ending the location
+    ("1500 BLOCK OF S. SPRINGFIELD, CHICAGO", True),
+    ("5200 BLOCK OF W. JACKSON BLVD PULASKI CHICAGO", True),
+    ("1600 BLOCK OF S. AUSTIN BLVD, CICERO", True),
+    ("1100 BLOCK OF HARLEM BERWYN IL", True),
+    ("7200 BLOCK OF MADISON FOREST PARK", True),
+    ("HARLEM AND BERWYN", True),
+    # Oak Park and the state are not another town
+    ("1129 LAKE ST, OAK PARK, IL", False),
+    ("1129 LAKE ST OAK PARK IL", False),
+    ("100 BLOCK OF N. MARION ST, IL", False),
+    # Streets named after a town
+    ("200 BLOCK OF CHICAGO", False),
+    ("800 BLOCK OF CHICAGO AVE.", False),
+    ("1000 BLOCK OF SOUTH BLVD", False),
+    # In-town intersections with Chicago Ave as the second street
+    ("RIDGELAND AND CHICAGO", False),
+    ("RIDGELAND & CHICAGO", False),
+    ("HARLEM / CHICAGO", False),
+    ("HARLEM/CHICAGO", False),
+    ("AUSTIN AT CHICAGO", False),
+    ("OAK PARK AVE AND  CHICAGO", False),
+    # Text after the location is ignored
+    ("100 BLOCK OF N. MARION ST VICTIM/ADDRESS: CHICAGO RESIDENT", False),
+]
+
+
+def check_cases(cases=OTHER_TOWN_CASES):
+    """
+    Returns:
+        list of str: Cases where names_other_town disagrees with the table.
+    """
+    return [
+        f"names_other_town({location!r}) is {not expected}, expected {expected}"
+        for location, expected in cases
+        if names_other_town(location) != expected
+    ]
+
+
+def main():
+    failures = check_cases()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"names_other_town: {len(OTHER_TOWN_CASES)} cases OK.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
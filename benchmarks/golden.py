@@ -0,0 +1,282 @@
+# benchmarks/golden.py
+
+import sys
+import json
+import time
+import math
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+
+from utils import (
+    extract_data_from_pdf,
+    load_csv_data,
+    set_geocode_budget,
+    set_geocode_pause,
+    set_pdf_text_backend,
+    available_pdf_text_backends
+)
+from reextract_reports import pdf_name, reextract_misaligned
+from benchmarks.fake_gmaps import FakeGmapsClient
+from benchmarks.stages import sample_pdfs, load_location_cache, use_narrative_merges
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SNAPSHOT = Path(__file__).resolve().parent / "golden_snapshot.json"
+DEFAULT_SAMPLE_SIZE = 100
+
+# Fields compared per complaint (Complaint # is the join key)
+GOLDEN_FIELDS = [
+    "Date", "Offense", "Time", "Location", "Victim/Address",
+    "Narrative", "NLP_Text", "Lat", "Long", "Error Free",
+]
+COORD_TOLERANCE = 1e-6
+# pandas reads the extractor's "N/A" placeholder back from the CSV as NaN
+MISSING_VALUES = (None, "N/A")
+# Free-text fields where PDF backends differ in spacing ("blo ck" vs "block")
+TEXT_FIELDS = {"Offense", "Time", "Location", "Victim/Address", "Narrative", "NLP_Text"}
+
+
+def json_value(value):
+    """
+    Convert a CSV cell to a JSON-friendly value (NaN -> None).
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def pin_sample(df, pdf_dir, sample_size=DEFAULT_SAMPLE_SIZE):
+    """
+    Evenly spaced sample of the downloaded PDFs that own rows in the dataset.
+
+    Returns:
+        list of str: Sorted PDF names.
+    """
+    owned = set(df["File Name"].map(pdf_name))
+    eligible_dir = [p for p in sample_pdfs(pdf_dir) if p.name in owned]
+    step = max(len(eligible_dir) / sample_size, 1)
+    return sorted({eligible_dir[int(i * step)].name for i in range(min(sample_size, len(eligible_dir)))})
+
+
+def build_snapshot(df, pinned):
+    """
+    Record the dataset rows extracted from the pinned PDFs.
+
+    Duplicates of a complaint reported again in a later PDF are attributed
+    to the first one. Rows written by the pre-streaming extractor may hold
+    a neighbouring complaint's fields; re-extract those first (see
+    reextract_misaligned). Any other row keeps the dataset's values, so the
+    snapshot is not simply the current extractor's output.
+
+    Args:
+        df (DataFrame): The current summary_report dataset.
+        pinned (list of str): PDF names from pin_sample.
+
+    Returns:
+        dict: {'created', 'fields', 'files': {pdf name: {complaint #: {field: value}}}}
+    """
+    df = df.assign(_pdf=df["File Name"].map(pdf_name))
+    files = {}
+    for name, group in df[df["_pdf"].isin(pinned)].groupby("_pdf", sort=True):
+        files[name] = {
+            str(row["Complaint #"]): {field: json_value(row[field]) for field in GOLDEN_FIELDS}
+            for _, row in group.iterrows()
+        }
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "fields": GOLDEN_FIELDS,
+        "files": files,
+    }
+
+
+def values_equal(field, expected, actual, ignore_spacing=False):
+    """
+    Compare one field, treating missing values alike and coordinates approximately.
+    With ignore_spacing, whitespace is ignored in free-text fields.
+    """
+    expected, actual = json_value(expected), json_value(actual)
+    if expected in MISSING_VALUES or actual in MISSING_VALUES:
+        return expected in MISSING_VALUES and actual in MISSING_VALUES
+    if field in ("Lat", "Long"):
+        return abs(float(expected) - float(actual)) <= COORD_TOLERANCE
+    if field == "Error Free":
+        return int(expected) == int(actual)
+    if ignore_spacing and field in TEXT_FIELDS:
+        return "".join(str(expected).split()) == "".join(str(actual).split())
+    return str(expected).strip() == str(actual).strip()
+
+
+def run_extractor(pdf_paths, location_cache):
+    """
+    Extract every complaint from the given PDFs, geocoding from the cache.
+
+    Returns:
+        tuple: ({pdf name: {complaint #: row}}, elapsed seconds)
+    """
+    gmaps_client = FakeGmapsClient(dict(location_cache))
+    set_geocode_pause(0)
+    set_geocode_budget(None)
+
+    extracted = {}
+    start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        report, _ = extract_data_from_pdf(pdf_path, gmaps_client, location_cache, False, set(), pdf_path.name)
+        rows = extracted[pdf_path.name] = {}
+        for row in report:
+            # Keep the first occurrence, as the dataset's de-duplication does
+            rows.setdefault(str(row["Complaint #"]), row)
+    return extracted, time.perf_counter() - start
+
+
+def compare(snapshot_files, extracted, ignore_spacing=False):
+    """
+    Diff extracted rows field by field against the snapshot.
+
+    Complaints in the snapshot but not extracted count as a miss on every
+    field. Extracted complaints absent from the snapshot (e.g. repeats
+    attributed to an earlier PDF) are only counted.
+
+    Returns:
+        dict: Per-field accuracy, row counts and a list of diffs.
+    """
+    matches = Counter()
+    expected_rows = 0
+    missing = []
+    extra = 0
+    diffs = []
+    for name, expected_by_complaint in snapshot_files.items():
+        actual_by_complaint = extracted.get(name, {})
+        extra += len(set(actual_by_complaint) - set(expected_by_complaint))
+        for complaint, expected in expected_by_complaint.items():
+            expected_rows += 1
+            actual = actual_by_complaint.get(complaint)
+            if actual is None:
+                missing.append(f"{name}: {complaint}")
+                continue
+            for field in GOLDEN_FIELDS:
+                if values_equal(field, expected.get(field), actual.get(field), ignore_spacing):
+                    matches[field] += 1
+                else:
+                    diffs.append({
+                        "file": name, "complaint": complaint, "field": field,
+                        "expected": json_value(expected.get(field)), "actual": json_value(actual.get(field)),
+                    })
+
+    field_accuracy = {
+        field: (matches[field] / expected_rows if expected_rows else 0.0) for field in GOLDEN_FIELDS
+    }
+    total_fields = expected_rows * len(GOLDEN_FIELDS)
+    return {
+        "expected_rows": expected_rows,
+        "missing_rows": missing,
+        "extra_rows": extra,
+        "field_accuracy": field_accuracy,
+        "overall_accuracy": sum(matches.values()) / total_fields if total_fields else 0.0,
+        "row_accuracy": (expected_rows - len(missing) - len({(d["file"], d["complaint"]) for d in diffs}))
+                        / expected_rows if expected_rows else 0.0,
+        "diffs": diffs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.golden",
+        description="Check extract_data_from_pdf against a golden snapshot of summary_report.csv."
+    )
+    parser.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT,
+                        help="Golden snapshot JSON (pinned PDFs and expected rows).")
+    parser.add_argument("--build", action="store_true",
+                        help="Pin a new PDF sample and snapshot its rows from data/summary_report.zip, "
+                             "re-extracting rows whose fields belong to another complaint.")
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="Number of PDFs to pin when building.")
+    parser.add_argument("--show-diffs", type=int, default=10,
+                        help="Number of field differences to print.")
+    parser.add_argument("--min-accuracy", type=float,
+                        help="Exit with status 1 if overall field accuracy is below this (0-1).")
+    parser.add_argument("--backends",
+                        help="Comma-separated PDF text backends to compare "
+                             f"(installed: {', '.join(available_pdf_text_backends())}).")
+    parser.add_argument("--ignore-spacing", action="store_true",
+                        help="Ignore whitespace in free-text fields (backends differ in mid-word spaces).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    pdf_dir = REPO_DIR / "downloaded_pdfs"
+
+    if args.build:
+        data_dir = REPO_DIR / "data"
+        df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+        pinned = pin_sample(df, pdf_dir, args.sample_size)
+        use_narrative_merges(REPO_DIR / "cache")
+        location_cache = load_location_cache(REPO_DIR / "cache" / "location_cache.json")
+        df, changes, unproven, _ = reextract_misaligned(df, pdf_dir, location_cache, pinned)
+        snapshot = build_snapshot(df, pinned)
+        args.snapshot.write_text(json.dumps(snapshot, indent=1) + "\n", encoding="utf-8")
+        rows = sum(len(v) for v in snapshot["files"].values())
+        print(f"Pinned {len(snapshot['files'])} PDFs ({rows} rows, {len(changes)} rows shifted from a "
+              f"neighbour re-extracted, {len(unproven)} differing rows kept) in '{args.snapshot}'.")
+        return 0
+
+    if not args.snapshot.exists():
+        parser.error(f"No snapshot at '{args.snapshot}'; create one with --build.")
+    snapshot = json.loads(args.snapshot.read_text(encoding="utf-8"))
+    pdf_paths = [pdf_dir / name for name in snapshot["files"]]
+    absent = [p.name for p in pdf_paths if not p.exists()]
+    if absent:
+        print(f"Warning: {len(absent)} pinned PDF(s) not found: {', '.join(absent[:5])}")
+    pdf_paths = [p for p in pdf_paths if p.exists()]
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()] if args.backends else [None]
+    location_cache = load_location_cache(REPO_DIR / "cache" / "location_cache.json")
+    use_narrative_merges(REPO_DIR / "cache")
+    print(f"Snapshot from {snapshot['created']}: {len(pdf_paths)} PDFs.")
+
+    summaries = []
+    for backend in backends:
+        try:
+            backend = set_pdf_text_backend(backend)
+        except ValueError as e:
+            print(f"Skipping backend: {e}")
+            continue
+        extracted, seconds = run_extractor(pdf_paths, dict(location_cache))
+        report = compare(snapshot["files"], extracted, args.ignore_spacing)
+        rows = sum(len(v) for v in extracted.values())
+        # Agreement with the first backend separates text-engine differences
+        # from errors already present in the snapshot
+        reference = summaries[0][4] if summaries else extracted
+        agreement = compare(reference, extracted, args.ignore_spacing)
+        summaries.append((backend, len(pdf_paths) / seconds, rows / seconds, report, extracted, agreement))
+
+        print(f"\n[{backend}] {report['expected_rows']} expected rows")
+        print(f"Throughput: {len(pdf_paths) / seconds:.1f} PDFs/s, {rows / seconds:.1f} rows/s ({seconds:.2f}s)")
+        print(f"Overall field accuracy: {report['overall_accuracy']:.2%}; "
+              f"rows fully matching: {report['row_accuracy']:.2%}")
+        print(f"Missing rows: {len(report['missing_rows'])}; extra rows: {report['extra_rows']}")
+        for field, accuracy in report["field_accuracy"].items():
+            print(f"  {field:15s} {accuracy:.2%}")
+        for diff in report["diffs"][:args.show_diffs]:
+            print(f"  {diff['file']} #{diff['complaint']} {diff['field']}: "
+                  f"expected {diff['expected']!r}, got {diff['actual']!r}")
+        for entry in report["missing_rows"][:args.show_diffs]:
+            print(f"  missing {entry}")
+
+    if len(summaries) > 1:
+        first = summaries[0][0]
+        print(f"\n{'backend':10s} {'PDFs/s':>8s} {'rows/s':>8s} {'fields':>8s} {'rows':>8s} "
+              f"{'fields vs ' + first:>18s} {'rows vs ' + first:>16s}")
+        for backend, pdfs_per_sec, rows_per_sec, report, _, agreement in summaries:
+            print(f"{backend:10s} {pdfs_per_sec:>8.1f} {rows_per_sec:>8.1f} "
+                  f"{report['overall_accuracy']:>8.2%} {report['row_accuracy']:>8.2%} "
+                  f"{agreement['overall_accuracy']:>18.2%} {agreement['row_accuracy']:>16.2%}")
+
+    if args.min_accuracy is not None and any(s[3]["overall_accuracy"] < args.min_accuracy for s in summaries):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
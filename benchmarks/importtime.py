@@ -0,0 +1,81 @@
+# benchmarks/importtime.py
+
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Module -> cumulative import budget in milliseconds (from `python -X importtime`)
+IMPORT_BUDGETS_MS = {
+    "utils": 50,
+    "utils.env": 50,
+    "utils.git": 150,
+}
+
+# Heavy dependencies the light modules must not pull in
+HEAVY_MODULES = ["pandas", "numpy", "requests", "bs4", "PyPDF2", "nltk", "googlemaps", "dateutil"]
+
+# "import time: <self us> | <cumulative us> | <indented module name>"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Returns:
+        tuple: (cumulative import ms, set of every module imported along the way)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    cumulative_ms = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        imported.add(match.group(4))
+        if match.group(4) == module:
+            cumulative_ms = int(match.group(2)) / 1000
+    return cumulative_ms, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.importtime",
+        description="Check that the light utils modules import within budget and without heavy dependencies."
+    )
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Imports per module; the fastest is compared to the budget.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        samples = [measure_import(module) for _ in range(max(args.repeat, 1))]
+        best_ms = min(ms for ms, _ in samples)
+        heavy_roots = sorted({name.split(".")[0] for name in samples[0][1]} & set(HEAVY_MODULES))
+        status = "ok"
+        if best_ms > budget_ms:
+            status = "OVER BUDGET"
+            failures.append(f"{module}: {best_ms:.1f} ms > {budget_ms} ms")
+        if heavy_roots:
+            status = "HEAVY IMPORTS"
+            failures.append(f"{module}: imports {', '.join(heavy_roots)}")
+        print(f"{module:12s} {best_ms:8.1f} ms  (budget {budget_ms} ms)  {status}")
+
+    if failures:
+        print("Import budget check failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("Import budgets met.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# benchmarks/mailchimp_stub.py
+
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from mailchimp_sync import sync_mailchimp_subscribers
+
+STUB_AUDIENCE_ID = "stub-list"
+STUB_API_KEY = "stub-key-us0"
+
+
+class StubMailchimpServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the Mailchimp members endpoint, so the subscriber
+    sync can be checked without network access or an API key.
+
+    Serves GET /lists/<id>/members with offset/count paging, the status and
+    since_last_changed filters, and answers the first request for each
+    listed offset with a 429 so the retry path is exercised.
+    """
+
+    def __init__(self, members, throttle_offsets=()):
+        """
+        Args:
+            members (dict): {email: (status, last_changed datetime)}.
+            throttle_offsets (iterable of int): Offsets answered once with 429.
+        """
+        super().__init__(("127.0.0.1", 0), StubMailchimpHandler)
+        self.members = members
+        self.throttle_offsets = set(throttle_offsets)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/3.0"
+
+
+class StubMailchimpHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.peak_active = max(server.peak_active, server.active)
+        try:
+            self.respond()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def respond(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        if parsed.path != f"/3.0/lists/{STUB_AUDIENCE_ID}/members":
+            return self.send_json(404, {"detail": "Not found"})
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        offset = int(params.get("offset", 0))
+        count = int(params.get("count", 10))
+        with server.lock:
+            if offset in server.throttle_offsets:
+                server.throttle_offsets.discard(offset)
+                return self.send_json(429, {"detail": "Too many requests"})
+            members = sorted(server.members.items())
+
+        if "status" in params:
+            members = [m for m in members if m[1][0] == params["status"]]
+        if "since_last_changed" in params:
+            since = datetime.fromisoformat(params["since_last_changed"])
+            members = [m for m in members if m[1][1] > since]
+        page = members[offset:offset + count]
+        self.send_json(200, {
+            "total_items": len(members),
+            "members": [
+                {"email_address": email, "status": status, "last_changed": changed.isoformat()}
+                for email, (status, changed) in page
+            ],
+        })
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("stub: " + format, *args)
+
+
+def check_sync(member_count=2500, page_size=1000, max_workers=4):
+    """
+    Run a full sync, change some members, then run a delta sync.
+
+    Returns:
+        list of str: Failed checks (empty if the sync behaved).
+    """
+    now = datetime.now(timezone.utc)
+    long_ago = now - timedelta(days=30)
+    members = {f"user{i:05d}@example.com": ("subscribed", long_ago) for i in range(member_count)}
+    members["gone@example.com"] = ("unsubscribed", long_ago)
+    server = StubMailchimpServer(members, throttle_offsets=[page_size])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "subscribers.json"
+            kwargs = dict(api_url=server.api_url, audience_id=STUB_AUDIENCE_ID, api_key=STUB_API_KEY,
+                          max_workers=max_workers, page_size=page_size)
+
+            emails = sync_mailchimp_subscribers(cache_path, **kwargs)
+            if len(emails) != member_count:
+                failures.append(f"full sync returned {len(emails)} subscribers, expected {member_count}")
+            if server.peak_active > max_workers:
+                failures.append(f"{server.peak_active} concurrent requests, limit {max_workers}")
+
+            changed_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+            with server.lock:
+                members["user00000@example.com"] = ("unsubscribed", changed_at)
+                members["new@example.com"] = ("subscribed", changed_at)
+                requests_before = server.requests
+            emails = sync_mailchimp_subscribers(cache_path, **kwargs)
+            delta_requests = server.requests - requests_before
+            if len(emails) != member_count or "user00000@example.com" in emails or "new@example.com" not in emails:
+                failures.append("delta sync did not apply the unsubscribe and the new member")
+            if delta_requests != 1:
+                failures.append(f"delta sync made {delta_requests} requests, expected 1")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.mailchimp_stub",
+        description="Check the Mailchimp subscriber sync against a local HTTP stub."
+    )
+    parser.add_argument("--members", type=int, default=2500, help="Subscribed members in the stub audience.")
+    parser.add_argument("--page-size", type=int, default=1000, help="Members per page.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent page requests.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    failures = check_sync(args.members, args.page_size, args.workers)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("Mailchimp sync: full and delta sync against the stub OK.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
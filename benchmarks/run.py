@@ -0,0 +1,201 @@
+# benchmarks/run.py
+
+import sys
+import json
+import logging
+import argparse
+import platform
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_PDF_LIMIT = 200
+DEFAULT_TOLERANCE = 0.2
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the current process in MB (None if unavailable).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_stage(name, ctx):
+    """
+    Run one stage; executed in a fresh process so peak RSS is per stage.
+    """
+    from benchmarks.stages import STAGES
+    from utils import set_pdf_text_backend
+
+    logging.basicConfig(level=logging.ERROR)
+    set_pdf_text_backend(ctx.get("backend"))
+    stage_result = STAGES[name](ctx)
+    stage_result["peak_rss_mb"] = peak_rss_mb()
+    return stage_result
+
+
+def run_benchmarks(stage_names, ctx):
+    """
+    Run the selected stages, each in its own spawned process.
+
+    Args:
+        stage_names (list of str): Stages to run, in order.
+        ctx (dict): Shared inputs (pdfs, data_dir, location_cache_path).
+
+    Returns:
+        dict: {stage: result}
+    """
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    for name in stage_names:
+        print(f"Running {name}...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            results[name] = executor.submit(run_stage, name, ctx).result()
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results with a stored baseline.
+
+    A stage regresses when its throughput drops, or its peak RSS grows, by
+    more than the tolerance. Output size changes are reported, not judged.
+
+    Args:
+        results (dict): {stage: result} from run_benchmarks.
+        baseline (dict): Stored baseline ({'stages': {...}, ...}).
+        tolerance (float): Allowed relative change (0.2 = 20%).
+
+    Returns:
+        tuple: (list of report lines, list of regressed stage names)
+    """
+    lines = []
+    regressions = []
+    base_stages = baseline.get("stages", {})
+    for name, current in results.items():
+        base = base_stages.get(name)
+        if not base:
+            lines.append(f"{name:20s} no baseline")
+            continue
+        notes = []
+        regressed = False
+        if base.get("throughput") and current.get("throughput"):
+            change = current["throughput"] / base["throughput"] - 1
+            notes.append(f"throughput {change:+.1%}")
+            regressed |= change < -tolerance
+        if base.get("peak_rss_mb") and current.get("peak_rss_mb"):
+            change = current["peak_rss_mb"] / base["peak_rss_mb"] - 1
+            notes.append(f"peak RSS {change:+.1%}")
+            regressed |= change > tolerance
+        if base.get("output_bytes") and current.get("output_bytes"):
+            change = current["output_bytes"] / base["output_bytes"] - 1
+            notes.append(f"output {change:+.1%}")
+        if base.get("items") != current.get("items"):
+            notes.append(f"items {base.get('items')} -> {current.get('items')}")
+        if regressed:
+            regressions.append(name)
+        lines.append(f"{name:20s} {'REGRESSION' if regressed else 'ok':10s} " + ", ".join(notes))
+    return lines, regressions
+
+
+def format_results(results):
+    """
+    Render results as a fixed-width table.
+    """
+    lines = [f"{'stage':20s} {'items':>7s} {'unit':5s} {'seconds':>9s} {'per sec':>10s} {'peak MB':>8s} {'output':>10s}"]
+    for name, r in results.items():
+        lines.append(
+            f"{name:20s} {r['items']:>7d} {r['unit']:5s} {r['seconds']:>9.3f} "
+            f"{(r['throughput'] or 0):>10.1f} {(r['peak_rss_mb'] or 0):>8.1f} "
+            f"{r.get('output_bytes', ''):>10}"
+        )
+        if "rows_per_sec" in r:
+            lines.append(f"{'':20s} {r['rows']:>7d} rows  {'':9s} {(r['rows_per_sec'] or 0):>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from benchmarks.stages import STAGES, sample_pdfs
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark pipeline stages offline over downloaded_pdfs/ and data/summary_report.zip."
+    )
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages to run (default: all of {', '.join(STAGES)}).")
+    parser.add_argument("--limit-pdfs", type=int, default=DEFAULT_PDF_LIMIT,
+                        help="Evenly spaced PDF sample size; 0 runs the whole corpus.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative throughput drop / RSS growth treated as a regression.")
+    parser.add_argument("--backend",
+                        help="PDF text backend for the PDF stages (default: OP_CRIME_PDF_BACKEND, then pypdf2).")
+    parser.add_argument("--output", type=Path, help="Also write the results JSON here.")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any stage regressed.")
+    args = parser.parse_args(argv)
+
+    stage_names = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stage_names if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(unknown)}")
+
+    pdfs = sample_pdfs(REPO_DIR / "downloaded_pdfs", args.limit_pdfs or None)
+    ctx = {
+        "pdfs": pdfs,
+        "data_dir": REPO_DIR / "data",
+        "location_cache_path": REPO_DIR / "cache" / "location_cache.json",
+        "backend": args.backend,
+    }
+    print(f"Benchmarking {len(stage_names)} stage(s) over {len(pdfs)} PDF(s).")
+
+    results = run_benchmarks(stage_names, ctx)
+    run = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pdf_sample": len(pdfs),
+        "backend": args.backend or "default",
+        "stages": results,
+    }
+    print()
+    print(format_results(results))
+
+    regressions = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        print(f"\nCompared to baseline from {baseline.get('recorded_at')} ({baseline.get('platform')}):")
+        if baseline.get("pdf_sample") != len(pdfs):
+            print(f"Note: baseline used {baseline.get('pdf_sample')} PDFs; this run used {len(pdfs)}.")
+        if baseline.get("backend", "default") != run["backend"]:
+            print(f"Note: baseline used the '{baseline.get('backend', 'default')}' PDF backend; "
+                  f"this run used '{run['backend']}'.")
+        lines, regressions = compare_to_baseline(results, baseline, args.tolerance)
+        print("\n".join(lines))
+    else:
+        print(f"\nNo baseline at '{args.baseline}'.")
+
+    if args.output:
+        args.output.write_text(json.dumps(run, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to '{args.baseline}'.")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
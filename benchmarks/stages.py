@@ -0,0 +1,237 @@
+# benchmarks/stages.py
+
+import re
+import copy
+import time
+import tempfile
+from pathlib import Path
+from datetime import date
+
+import pandas as pd
+
+from utils import (
+    DATE_PATTERN,
+    iter_pdf_pages,
+    parse_date,
+    normalize_location,
+    process_narrative_nlp,
+    extract_data_from_pdf,
+    LOCATION_KEY_VERSION,
+    load_json_cache,
+    load_csv_data,
+    set_geocode_budget,
+    set_geocode_pause
+)
+from migrate_location_cache import location_cache_meta_path, migrate_location_cache
+from text_repair import load_merge_table, set_narrative_merges
+from benchmarks.fake_gmaps import FakeGmapsClient
+
+# Fixed report week so the weekly map input does not change as data grows
+WEEKLY_MAP_END = date(2025, 5, 15)
+
+
+def sample_pdfs(pdf_dir, limit=None):
+    """
+    Pick a deterministic, evenly spaced sample of PDFs from the corpus.
+
+    Args:
+        pdf_dir (Path): Directory with downloaded PDFs.
+        limit (int): Maximum number of PDFs (None = all).
+
+    Returns:
+        list of Path: Sorted sample.
+    """
+    pdfs = sorted(Path(pdf_dir).glob("*.pdf"))
+    if limit is None or limit >= len(pdfs):
+        return pdfs
+    step = len(pdfs) / limit
+    return [pdfs[int(i * step)] for i in range(limit)]
+
+
+def load_dataset(data_dir):
+    """
+    Load the checked-in dataset (summary_report.zip, falling back to the CSV).
+    """
+    data_dir = Path(data_dir)
+    return load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+
+
+def load_location_cache(location_cache_path):
+    """
+    Load the location cache, migrating it in memory (never on disk) when it
+    predates LOCATION_KEY_VERSION, as ingestion would.
+    """
+    location_cache = load_json_cache(location_cache_path)
+    meta = load_json_cache(location_cache_meta_path(location_cache_path))
+    if meta.get("normalizer_version", 1) < LOCATION_KEY_VERSION:
+        location_cache, _, _ = migrate_location_cache(location_cache, meta)
+    return location_cache
+
+
+def use_narrative_merges(cache_dir):
+    """
+    Activate the saved split-word repair table, as ingestion does.
+    """
+    set_narrative_merges(load_merge_table(Path(cache_dir) / 'narrative_merges.json'))
+
+
+def result(items, unit, seconds, **extra):
+    """
+    Build one stage result.
+    """
+    return {
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 4),
+        "throughput": round(items / seconds, 3) if seconds > 0 else None,
+        **extra,
+    }
+
+
+def bench_extract(ctx):
+    """
+    End-to-end extract_data_from_pdf over the PDF sample, with geocoding
+    served from location_cache.json by FakeGmapsClient.
+    """
+    location_cache = load_location_cache(ctx["location_cache_path"])
+    use_narrative_merges(Path(ctx["location_cache_path"]).parent)
+    gmaps_client = FakeGmapsClient(copy.deepcopy(location_cache))
+    set_geocode_pause(0)
+    set_geocode_budget(None)
+
+    rows = 0
+    start = time.perf_counter()
+    for pdf_path in ctx["pdfs"]:
+        report, _ = extract_data_from_pdf(pdf_path, gmaps_client, location_cache, False, set(), pdf_path.name)
+        rows += len(report)
+    seconds = time.perf_counter() - start
+    return result(len(ctx["pdfs"]), "PDFs", seconds, rows=rows,
+                  rows_per_sec=round(rows / seconds, 3) if seconds > 0 else None,
+                  fake_geocode_calls=gmaps_client.calls)
+
+
+def bench_pdf_text(ctx):
+    """
+    Page text extraction (selected backend) and clean_text alone.
+    """
+    start = time.perf_counter()
+    chars = 0
+    for pdf_path in ctx["pdfs"]:
+        chars += sum(len(page_text) for page_text in iter_pdf_pages(pdf_path))
+    seconds = time.perf_counter() - start
+    return result(len(ctx["pdfs"]), "PDFs", seconds, chars=chars)
+
+
+def bench_parse_date(ctx):
+    """
+    parse_date over the raw DATE(S) strings found in the PDF sample.
+    """
+    raw_dates = []
+    for pdf_path in ctx["pdfs"]:
+        text = " ".join(iter_pdf_pages(pdf_path))
+        for raw in re.findall(DATE_PATTERN, text):
+            raw_dates.extend(raw.split("&"))
+
+    start = time.perf_counter()
+    for raw in raw_dates:
+        parse_date(raw)
+    seconds = time.perf_counter() - start
+    return result(len(raw_dates), "rows", seconds)
+
+
+def bench_normalize_location(ctx):
+    """
+    normalize_location over every Location in the dataset.
+    """
+    locations = load_dataset(ctx["data_dir"])["Location"].dropna().astype(str).tolist()
+    start = time.perf_counter()
+    for loc in locations:
+        normalize_location(loc)
+    seconds = time.perf_counter() - start
+    return result(len(locations), "rows", seconds)
+
+
+def bench_nlp(ctx):
+    """
+    process_narrative_nlp over every Narrative in the dataset.
+    """
+    narratives = load_dataset(ctx["data_dir"])["Narrative"].dropna().astype(str).tolist()
+    start = time.perf_counter()
+    for narrative in narratives:
+        process_narrative_nlp(narrative)
+    seconds = time.perf_counter() - start
+    return result(len(narratives), "rows", seconds)
+
+
+def map_input(data_dir):
+    """
+    Dataset rows with coordinates and a parseable date, as the map jobs use them.
+    """
+    df = load_dataset(data_dir)
+    df = df.dropna(subset=["Lat", "Long", "Date"])
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    return df.dropna(subset=["Date"])
+
+
+def bench_map_daily(ctx):
+    """
+    crime_map_daily.create_map_load_all over the full dataset.
+    """
+    from crime_map_daily import create_map_load_all
+
+    df = map_input(ctx["data_dir"])
+    df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+    with tempfile.TemporaryDirectory() as tmp:
+        output_html = Path(tmp) / "map.html"
+        start = time.perf_counter()
+        create_map_load_all(df, str(output_html))
+        seconds = time.perf_counter() - start
+        output_bytes = output_html.stat().st_size
+    return result(len(df), "rows", seconds, output_bytes=output_bytes)
+
+
+def bench_map_weekly(ctx):
+    """
+    weekly_crime_report.create_folium_map_filtered_data over a pinned week.
+    """
+    from weekly_crime_report import determine_date_range, filter_crime_data, create_folium_map_filtered_data
+
+    df = map_input(ctx["data_dir"])
+    start_date, end_date = determine_date_range(df, WEEKLY_MAP_END)
+    df = filter_crime_data(df, start_date, end_date)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_html = Path(tmp) / "weekly_map.html"
+        start = time.perf_counter()
+        create_folium_map_filtered_data(df, output_html_path=output_html)
+        seconds = time.perf_counter() - start
+        output_bytes = output_html.stat().st_size
+    return result(len(df), "rows", seconds, output_bytes=output_bytes)
+
+
+def bench_map_cumulative(ctx):
+    """
+    weekly_crime_report.create_folium_map_cumulative over the full dataset.
+    """
+    from weekly_crime_report import create_folium_map_cumulative
+
+    df = map_input(ctx["data_dir"])
+    with tempfile.TemporaryDirectory() as tmp:
+        output_html = Path(tmp) / "cumulative_map.html"
+        start = time.perf_counter()
+        create_folium_map_cumulative(df, output_html_path=output_html)
+        seconds = time.perf_counter() - start
+        output_bytes = output_html.stat().st_size
+    return result(len(df), "rows", seconds, output_bytes=output_bytes)
+
+
+# Stage name -> benchmark function, in run order
+STAGES = {
+    "extract": bench_extract,
+    "pdf_text": bench_pdf_text,
+    "parse_date": bench_parse_date,
+    "normalize_location": bench_normalize_location,
+    "nlp": bench_nlp,
+    "map_daily": bench_map_daily,
+    "map_weekly": bench_map_weekly,
+    "map_cumulative": bench_map_cumulative,
+}
@@ -0,0 +1,78 @@
+# benchmarks/text_repair_cases.py
+
+import sys
+import logging
+from pathlib import Path
+
+from utils import load_csv_data
+from text_repair import build_merge_table, build_vocabulary, check_repairs, repair_text
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Texts whose leading single-letter word must survive repair with a merge
+# table built from the dataset (the split after it may still be joined,
+# "a l oud" -> "a loud")
+PROTECTED_SPLITS = [
+    "a t-shirt",
+    "a l oud noise",
+    "a l ight pole",
+    "a l.e.a.d.s report",
+    "a re d head",
+]
+
+# (original, repaired) pairs check_repairs must reject
+BAD_REPAIRS = [
+    ("a t-shirt", "at-shirt"),
+    ("a l.e.a.d.s report", "al.e.a.d.s report"),
+    ("a re d head", "are d head"),
+    ("a l oud noise", "a loud nose"),
+]
+# ... and pairs it must accept
+GOOD_REPAIRS = [
+    ("a l oud noise", "a loud noise"),
+    ("the victim’s car was parked a t the curb.", "the victim’s car was parked at the curb."),
+    ("i n the alley", "in the alley"),
+]
+
+
+def check_cases(texts):
+    """
+    Args:
+        texts (Series): Lowercased narratives to build the merge table from.
+
+    Returns:
+        list of str: Failed cases.
+    """
+    merges = build_merge_table(texts)
+    vocab, _ = build_vocabulary(texts)
+    failures = []
+    for text in PROTECTED_SPLITS:
+        repaired = repair_text(text, merges)
+        if repaired.split()[0] != text.split()[0]:
+            failures.append(f"repair_text({text!r}) merged the leading word: {repaired!r}")
+    for before, after in BAD_REPAIRS:
+        if not check_repairs([before], [after], vocab):
+            failures.append(f"check_repairs accepted {before!r} -> {after!r}")
+    for before, after in GOOD_REPAIRS:
+        for _, _, reason in check_repairs([before], [after], vocab):
+            failures.append(f"check_repairs rejected {before!r} -> {after!r} ({reason})")
+    return failures
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    data_dir = REPO_DIR / "data"
+    df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+    if df.empty:
+        print("No data found.")
+        return 1
+    failures = check_cases(df["Narrative"].dropna().astype(str).str.lower())
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"text_repair: {len(PROTECTED_SPLITS) + len(BAD_REPAIRS) + len(GOOD_REPAIRS)} cases OK.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,12 +6,22 @@ import json
 import pandas as pd
 from pathlib import Path
 import logging
-from collections import defaultdict
 import time
 from datetime import datetime
 import string
 
-from utils import load_env_vars, normalize_location, load_json_cache, save_json_cache, load_csv_data
+from utils import (
+    load_env_vars,
+    normalize_location,
+    load_json_cache,
+    save_json_cache,
+    load_csv_data,
+    make_location_entry,
+    location_entry_coords,
+    GEOCODE_SOURCE_CSV
+)
+from migrate_location_cache import ensure_location_cache_current
+from log_config import configure_logging
 
 def main():
     start_time = time.time()
@@ -32,11 +42,7 @@ def main():
 
     # Initialize logging
     log_file_path = script_dir / f"check_localization_logs_{datetime.now().strftime('%Y-%m-%d')}.txt"
-    logging.basicConfig(
-        filename=script_dir / 'check_localization.log',  # Log file in script directory
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    configure_logging(script_dir / 'check_localization.log')  # Log file in script directory
 
     # Define paths relative to script directory
     data_dir = script_dir / 'data'
@@ -50,6 +56,7 @@ def main():
     
     # Load location cache
     location_cache = load_json_cache(location_cache_path)
+    ensure_location_cache_current(location_cache_path, location_cache)
 
     # Load CSV data
     csv_df = load_csv_data(output_csv_path, output_zip_path)
@@ -66,53 +73,71 @@ def main():
             logging.error(f"Required column '{col}' not found in the CSV.")
             return
 
-    # Extract unique location strings from the CSV
+    # Normalize each unique location once, then broadcast the key as a column
     unique_locations = csv_df["Location"].dropna().unique()
     print(f"Total unique locations in CSV: {len(unique_locations)}")
     logging.info(f"Total unique locations in CSV: {len(unique_locations)}")
 
-    # Normalize location strings
-    normalized_locations = set(normalize_location(loc) for loc in unique_locations)
+    key_map = {loc: normalize_location(loc) for loc in unique_locations}
+    csv_df["Normalized Location"] = csv_df["Location"].map(key_map).fillna("")
+    located_df = csv_df[csv_df["Normalized Location"] != ""]
+
+    normalized_locations = located_df["Normalized Location"].unique()
     print(f"Total normalized unique locations: {len(normalized_locations)}")
     logging.info(f"Total normalized unique locations: {len(normalized_locations)}")
 
-    # Initialize missing info
-    missing_info = defaultdict(list)  # {normalized_location: [list of dicts with Complaint # and File Name]}
-    updated_locations = 0  # Counter for updated cache entries
-
-    # Iterate through the CSV to process each location
-    for index, row in csv_df.iterrows():
-        loc = row.get("Location", "")
-        normalized_loc = normalize_location(loc)
-        if not normalized_loc:
-            continue  # Skip if location is empty after normalization
-
-        lat = row.get("Lat", None)
-        lng = row.get("Long", None)
-
-        # Check if the location is already in the cache
-        if normalized_loc in location_cache:
-            # If cache has [null, null], try to update with CSV coordinates
-            if (location_cache[normalized_loc][0] is None or location_cache[normalized_loc][1] is None) and pd.notna(lat) and pd.notna(lng):
-                location_cache[normalized_loc] = [lat, lng]
-                updated_locations += 1
-                logging.info(f"Updated cache for '{normalized_loc}' with coordinates: ({lat}, {lng})")
-        else:
-            # If not in cache, add to missing_info if coordinates are missing
-            if pd.isna(lat) or pd.isna(lng):
-                missing_info[normalized_loc].append({
-                    "Complaint #": row.get("Complaint #", "N/A"),
-                    "File Name": row.get("File Name", "N/A")
-                })
-                location_cache[normalized_loc] = [None, None]
-                logging.info(f"Added missing location to cache: '{normalized_loc}' with [null, null]")
-            else:
-                # Add location with existing coordinates from CSV
-                location_cache[normalized_loc] = [lat, lng]
-                logging.info(f"Added location to cache: '{normalized_loc}' with coordinates: ({lat}, {lng})")
+    # Group table: one row per key with the first row that has both coordinates
+    group_df = pd.DataFrame(index=pd.Index(normalized_locations, name="Normalized Location"))
+    group_df["rows"] = located_df.groupby("Normalized Location", sort=False).size()
+    first_coords = (
+        located_df.dropna(subset=["Lat", "Long"])
+        .groupby("Normalized Location", sort=False)[["Lat", "Long"]]
+        .first()
+    )
+    group_df = group_df.join(first_coords)
+
+    # Join against the cache as a DataFrame
+    cache_df = pd.DataFrame(
+        [(key, *location_entry_coords(value)) for key, value in location_cache.items()],
+        columns=["Normalized Location", "cache_lat", "cache_lng"]
+    ).set_index("Normalized Location")
+    group_df = group_df.join(cache_df, how="left")
+    group_df["in_cache"] = group_df.index.isin(cache_df.index)
+
+    has_csv_coords = group_df["Lat"].notna() & group_df["Long"].notna()
+    cache_null = group_df["cache_lat"].isna() | group_df["cache_lng"].isna()
+
+    # Cache entry failed but the CSV has coordinates -> backfill
+    to_update = group_df[group_df["in_cache"] & cache_null & has_csv_coords]
+    # Not cached but the CSV has coordinates -> add them
+    to_add = group_df[~group_df["in_cache"] & has_csv_coords]
+    # Not cached and no coordinates anywhere -> missing
+    missing_df = group_df[~group_df["in_cache"] & ~has_csv_coords]
+
+    for key, lat, lng in zip(to_update.index, to_update["Lat"].tolist(), to_update["Long"].tolist()):
+        location_cache[key] = make_location_entry(lat, lng, GEOCODE_SOURCE_CSV)
+    for key, lat, lng in zip(to_add.index, to_add["Lat"].tolist(), to_add["Long"].tolist()):
+        location_cache[key] = make_location_entry(lat, lng, GEOCODE_SOURCE_CSV)
+    for key in missing_df.index:
+        # Never attempted: no timestamp, so the next ingest geocodes it right away
+        entry = make_location_entry(None, None, GEOCODE_SOURCE_CSV)
+        entry["updated"] = None
+        location_cache[key] = entry
+    updated_locations = len(to_update)
+    logging.info(f"Added {len(to_add)} location(s) to cache with coordinates from the CSV.")
+    logging.info(f"Added {len(missing_df)} missing location(s) to cache as failed entries.")
+
+    # Build the missing report from the rows belonging to missing keys
+    missing_rows = located_df.loc[
+        located_df["Normalized Location"].isin(missing_df.index),
+        ["Normalized Location", "Complaint #", "File Name"]
+    ].fillna("N/A")
+    missing_info = {key: [] for key in missing_df.index}
+    for key, complaint, file_name in missing_rows.itertuples(index=False, name=None):
+        missing_info[key].append({"Complaint #": complaint, "File Name": file_name})
 
     # Calculate total missing entries
-    total_missing_entries = sum(len(details) for details in missing_info.values())
+    total_missing_entries = int(missing_df["rows"].sum())
     print(f"Number of locations missing in cache: {len(missing_info)}")
     print(f"Total missing location entries in CSV: {total_missing_entries}")
     logging.info(f"Number of locations missing in cache: {len(missing_info)}")
@@ -131,21 +156,15 @@ def main():
         except OSError as e:
             logging.error(f"Failed to save missing locations report to '{missing_report_path}': {e}")
             print(f"Error: Failed to save missing locations report to '{missing_report_path}': {e}")
-        
-        # Additionally, print a summary of missing locations
+
+        # One summary line per missing location; per-complaint details are in the JSON report
+        summary_lines = [
+            f"  {key}: {rows} entr{'y' if rows == 1 else 'ies'}"
+            for key, rows in missing_df["rows"].sort_values(ascending=False).items()
+        ]
         print("\nSummary of Missing Locations:")
-        for loc, details in missing_info.items():
-            print(f"\nNormalized Location: {loc}")
-            print(f"Number of Missing Entries: {len(details)}")
-            for entry in details:
-                print(f"  - Complaint #: {entry['Complaint #']}, File Name: {entry['File Name']}")
-        
-        # Log the summary
-        for loc, details in missing_info.items():
-            logging.info(f"\nNormalized Location: {loc}")
-            logging.info(f"Number of Missing Entries: {len(details)}")
-            for entry in details:
-                logging.info(f"  - Complaint #: {entry['Complaint #']}, File Name: {entry['File Name']}")
+        print("\n".join(summary_lines))
+        logging.info("Summary of Missing Locations:\n" + "\n".join(summary_lines))
     else:
         print("No missing locations found. All locations are already present in the cache.")
         logging.info("No missing locations found. All locations are already present in the cache.")
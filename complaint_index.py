@@ -0,0 +1,237 @@
+# complaint_index.py
+
+import time
+import zipfile
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from utils import file_sha256, save_npz
+
+# Bump when the stored arrays change; older indexes are rebuilt
+KEY_INDEX_VERSION = 2
+
+
+def empty_key_index():
+    """
+    A key index with no keys and no source dataset.
+
+    The index holds the dataset's complaint numbers as a sorted string
+    array, plus the size, mtime and SHA-256 of the dataset file it reflects.
+    (Complaint #, File Name) de-duplication happens when the dataset is
+    rewritten, over the full combined frame, so those keys are not stored.
+    """
+    return {
+        "complaints": np.array([], dtype=str),
+        "source": {"file_size": -1, "last_modified": -1.0, "sha256": ""},
+    }
+
+
+def load_key_index(index_path):
+    """
+    Load the key index (None if missing, unreadable, corrupt or outdated, so
+    the caller rebuilds it from the dataset).
+
+    Args:
+        index_path (Path): Path to complaint_index.npz.
+
+    Returns:
+        dict: Key index (see empty_key_index), or None.
+    """
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return None
+    try:
+        with np.load(index_path, allow_pickle=False) as npz:
+            if int(npz["version"]) != KEY_INDEX_VERSION:
+                logging.info(f"Complaint index '{index_path}' is outdated; rebuilding.")
+                return None
+            return {
+                "complaints": npz["complaints"],
+                "source": {
+                    "file_size": int(npz["source_size"]),
+                    "last_modified": float(npz["source_mtime"]),
+                    "sha256": str(npz["source_sha256"]),
+                },
+            }
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile) as e:
+        logging.error(f"Failed to load complaint index '{index_path}': {e}; rebuilding from the dataset.")
+        return None
+
+
+def save_key_index(index_path, index):
+    """
+    Save the key index as an uncompressed .npz (loads without inflating),
+    atomically so an interrupted save keeps the previous index.
+    """
+    try:
+        save_npz(index_path, {
+            "version": np.array(KEY_INDEX_VERSION),
+            "complaints": index["complaints"],
+            "source_size": np.array(index["source"]["file_size"]),
+            "source_mtime": np.array(index["source"]["last_modified"]),
+            "source_sha256": np.array(index["source"]["sha256"]),
+        })
+    except OSError as e:
+        logging.error(f"Failed to save complaint index '{index_path}': {e}")
+
+
+def dataset_signature(dataset_path, known=None):
+    """
+    Size, mtime and SHA-256 of the dataset file.
+
+    The digest is only computed when the size or mtime differs from
+    `known`, so an unchanged dataset costs one stat.
+
+    Args:
+        dataset_path (Path): Dataset file (zip or csv).
+        known (dict): Signature recorded earlier, if any.
+
+    Returns:
+        dict: {"file_size", "last_modified", "sha256"}
+    """
+    stat = Path(dataset_path).stat()
+    signature = {"file_size": stat.st_size, "last_modified": stat.st_mtime}
+    if known and known["sha256"] and (known["file_size"], known["last_modified"]) == (
+            signature["file_size"], signature["last_modified"]):
+        signature["sha256"] = known["sha256"]
+    else:
+        signature["sha256"] = file_sha256(dataset_path)
+    return signature
+
+
+def build_key_index(dataset_path):
+    """
+    Build the key index from the dataset, reading only the complaint column.
+
+    Args:
+        dataset_path (Path): summary_report.zip or summary_report.csv.
+
+    Returns:
+        dict: Key index.
+    """
+    import pandas as pd
+
+    dataset_path = Path(dataset_path)
+    df = pd.read_csv(
+        dataset_path,
+        compression='zip' if dataset_path.suffix == '.zip' else None,
+        encoding="cp1252",
+        encoding_errors='replace',
+        usecols=["Complaint #"],
+        dtype=str
+    )
+    index = empty_key_index()
+    add_complaints(index, df["Complaint #"])
+    index["source"] = dataset_signature(dataset_path)
+    return index
+
+
+def add_complaints(index, complaints):
+    """
+    Merge complaint numbers into the index in place (empty values ignored).
+
+    Args:
+        index (dict): Key index.
+        complaints (iterable of str): Complaint numbers.
+
+    Returns:
+        int: Number of complaint numbers not already indexed.
+    """
+    new = np.array(sorted({c for c in complaints if isinstance(c, str) and c}), dtype=str)
+    if not len(new):
+        return 0
+    added = len(np.setdiff1d(new, index["complaints"], assume_unique=True))
+    index["complaints"] = np.union1d(index["complaints"], new)
+    return added
+
+
+def load_complaint_numbers(index_path, dataset_path):
+    """
+    Complaint numbers in the dataset, from the key index.
+
+    The index is rebuilt (reading only the complaint column) when it is missing,
+    outdated, or was recorded for different dataset contents; otherwise the
+    dataset file is only stat'ed, or hashed if its mtime moved.
+
+    Args:
+        index_path (Path): Path to complaint_index.npz.
+        dataset_path (Path): summary_report.zip or .csv (may not exist).
+
+    Returns:
+        tuple: (set of complaint numbers, key index)
+    """
+    dataset_path = Path(dataset_path)
+    if not dataset_path.exists():
+        return set(), empty_key_index()
+
+    index = load_key_index(index_path)
+    if index is not None:
+        signature = dataset_signature(dataset_path, index["source"])
+        if signature["sha256"] == index["source"]["sha256"]:
+            if signature != index["source"]:
+                # Same contents under a new mtime: record it to skip the hash next time
+                index["source"] = signature
+                save_key_index(index_path, index)
+            return set(index["complaints"].tolist()), index
+        logging.info(f"'{dataset_path}' changed since the complaint index was saved; rebuilding.")
+
+    start = time.perf_counter()
+    index = build_key_index(dataset_path)
+    save_key_index(index_path, index)
+    logging.info(f"Built complaint index with {len(index['complaints'])} complaints "
+                 f"in {time.perf_counter() - start:.2f}s.")
+    print(f"Built complaint index with {len(index['complaints'])} complaints.")
+    return set(index["complaints"].tolist()), index
+
+
+def update_key_index(index_path, index, rows, dataset_path):
+    """
+    Add newly written rows to the index and record the dataset's new signature.
+
+    Call after the dataset file has been rewritten with the rows.
+
+    Args:
+        index_path (Path): Path to complaint_index.npz.
+        index (dict): Key index from load_complaint_numbers.
+        rows (list of dict): Rows with 'Complaint #'.
+        dataset_path (Path): The rewritten dataset file.
+
+    Returns:
+        int: Number of complaint numbers added.
+    """
+    added = add_complaints(index, [r.get("Complaint #") for r in rows])
+    index["source"] = dataset_signature(dataset_path)
+    save_key_index(index_path, index)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the complaint-key index.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from the dataset.")
+    parser.add_argument("complaint", nargs="*", help="Complaint numbers to look up.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    index_path = script_dir / 'cache' / 'complaint_index.npz'
+    data_dir = script_dir / 'data'
+    dataset_path = data_dir / 'summary_report.zip'
+    if not dataset_path.exists():
+        dataset_path = data_dir / 'summary_report.csv'
+
+    if args.rebuild:
+        Path(index_path).unlink(missing_ok=True)
+    start = time.perf_counter()
+    complaints, index = load_complaint_numbers(index_path, dataset_path)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(complaints)} complaints loaded in {elapsed_ms:.1f} ms.")
+    for complaint in args.complaint:
+        print(f"{complaint}: {'present' if complaint in complaints else 'absent'}")
+
+
+if __name__ == "__main__":
+    main()
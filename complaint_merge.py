@@ -0,0 +1,136 @@
+# complaint_merge.py
+
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Fields filled together from one row: the best row's values unless they are
+# missing, else the next-best row's that has them all
+MERGE_FIELD_GROUPS = [
+    ("Lat", "Long", "Loc", "Geofence"),
+    ("Offense",),
+    ("Time",),
+    ("Location",),
+    ("Victim/Address",),
+    ("Narrative", "NLP_Text"),
+]
+# The extractor's placeholder for a field it could not read
+MISSING_TEXT = "N/A"
+INVALID_DATE = "1900-01-01"
+
+
+def present(values):
+    """
+    Mask of values that are neither NaN nor the "N/A" placeholder.
+    """
+    values = np.asarray(values, dtype=object)
+    return pd.notna(values) & (values != MISSING_TEXT)
+
+
+def merge_complaints(df):
+    """
+    Collapse the dataset to one canonical row per complaint number.
+
+    Rows are grouped by a 64-bit hash of the complaint number and ranked
+    within each group: error-free first, then latest valid date, then
+    geocoded. The best row is kept, field groups it is missing (see
+    MERGE_FIELD_GROUPS) are taken from the next-best row that has them,
+    and 'Source Files' lists every file the complaint appeared in, ordered
+    by the date each one reported.
+
+    Args:
+        df (DataFrame): Dataset rows (summary_report columns).
+
+    Returns:
+        DataFrame: One row per complaint, in the input's row order of each
+        complaint's best row, plus a 'Source Files' column.
+    """
+    df = df.dropna(subset=["Complaint #"]).reset_index(drop=True)
+    if df.empty:
+        return df.assign(**{"Source Files": pd.Series(dtype=object)})
+
+    hashes = pd.util.hash_array(df["Complaint #"].astype(str).to_numpy(dtype=object))
+    error_free = pd.to_numeric(df.get("Error Free"), errors="coerce").fillna(0).to_numpy() > 0
+    dates = pd.to_datetime(df["Date"].where(df["Date"] != INVALID_DATE), errors="coerce")
+    days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    days[dates.isna().to_numpy()] = np.iinfo(np.int64).min
+    geocoded = present(df["Lat"]) & present(df["Long"]) if "Lat" in df and "Long" in df else np.zeros(len(df), bool)
+
+    # Sort by hash, then best first within each hash (lexsort's last key is primary)
+    order = np.lexsort((~geocoded, -days, ~error_free, hashes))
+    sorted_hashes = hashes[order]
+    starts = np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]]
+    group = np.cumsum(starts) - 1
+    best = order[starts]
+
+    merged = df.iloc[best].reset_index(drop=True)
+    for fields in MERGE_FIELD_GROUPS:
+        fields = [f for f in fields if f in df.columns]
+        if not fields:
+            continue
+        has_all = np.logical_and.reduce([present(df[f].to_numpy()[order]) for f in fields])
+        missing = ~has_all[starts]
+        if not missing.any():
+            continue
+        # First row (in rank order) of each group that has every field
+        ranked = np.where(has_all, np.arange(len(order)), len(order))
+        donor_rank = np.minimum.reduceat(ranked, np.flatnonzero(starts))
+        fill = missing & (donor_rank < len(order))
+        donors = order[donor_rank[fill]]
+        for f in fields:
+            merged.loc[fill, f] = df[f].to_numpy()[donors]
+
+    # Provenance: each group's files by the date they reported, earliest
+    # first; only groups with several rows need joining
+    files = df["File Name"].astype(str).to_numpy()
+    sources = files[best].astype(object)
+    sizes = np.diff(np.r_[np.flatnonzero(starts), len(order)])
+    repeated = np.isin(group, np.flatnonzero(sizes > 1))
+    if repeated.any():
+        rows = order[repeated]
+        by_date = np.lexsort((days[rows], group[repeated]))
+        joined = pd.Series(files[rows][by_date]).groupby(group[repeated][by_date], sort=True).agg(
+            lambda names: "; ".join(dict.fromkeys(names))
+        )
+        sources[joined.index.to_numpy()] = joined.to_numpy()
+    merged["Source Files"] = sources
+
+    # Restore dataset order (by each complaint's best row)
+    return merged.iloc[np.argsort(best, kind="stable")].reset_index(drop=True)
+
+
+def main():
+    from utils import load_csv_data
+
+    parser = argparse.ArgumentParser(description="Collapse the dataset to one row per complaint.")
+    parser.add_argument("--output", type=Path, help="Write the merged rows to this CSV.")
+    parser.add_argument("--show", type=int, default=5, help="Print this many merged duplicates.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    data_dir = Path(__file__).parent.resolve() / 'data'
+    df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+    start = time.perf_counter()
+    merged = merge_complaints(df)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(df)} rows -> {len(merged)} complaints in {elapsed_ms:.1f} ms.")
+
+    multi = merged[merged["Source Files"].str.contains("; ", regex=False)]
+    print(f"{len(multi)} complaint(s) appeared in more than one report.")
+    for _, row in multi.head(args.show).iterrows():
+        print(f"{row['Complaint #']}  {row['Date']}  {row['Offense']}  @ {row['Location']}")
+        for source in row["Source Files"].split("; "):
+            print(f"    {source.rsplit('/', 1)[-1]}")
+
+    if args.output:
+        merged.to_csv(args.output, index=False, encoding="cp1252", errors="replace")
+        print(f"Wrote '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ from utils import (
     synchronize_repository,
     upload_files
 )
+from complaint_merge import merge_complaints
 import os
 
 def load_data():
@@ -18,6 +19,8 @@ def load_data():
     Converts 'Date' to 'YYYY-MM-DD' strings, drops missing lat/long/dates.
     """
     df = pd.read_csv("data/summary_report.zip", compression="zip", encoding="cp1252")
+    # One row per complaint, even when several reports listed it
+    df = merge_complaints(df)
     df = df.dropna(subset=["Lat", "Long", "Date"])
     df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.strftime("%Y-%m-%d")
     df = df.dropna(subset=["Date"])
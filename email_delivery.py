@@ -0,0 +1,218 @@
+# email_delivery.py
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from googleapiclient.errors import HttpError
+
+# Keep each message well under Gmail's per-message recipient limit
+DEFAULT_BATCH_SIZE = 50
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def chunk_recipients(recipients, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Split recipients into de-duplicated, order-preserving batches.
+
+    Args:
+        recipients (list of str): Email addresses.
+        batch_size (int): Maximum recipients per batch.
+
+    Returns:
+        list of list: Recipient batches.
+    """
+    seen = set()
+    unique = []
+    for email in recipients:
+        key = email.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(email.strip())
+    return [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+
+
+def load_delivery_ledger(ledger_path):
+    """
+    Load the last recorded delivery status per recipient.
+
+    The ledger is an append-only JSON-lines file, so a crash can at worst
+    leave a truncated final line, which is ignored.
+
+    Args:
+        ledger_path (str or Path): Path to the ledger file.
+
+    Returns:
+        dict: {lowercased email: status} where status is 'sending', 'sent',
+        'uncertain' or 'failed'.
+    """
+    statuses = {}
+    ledger_file = Path(ledger_path)
+    if not ledger_file.exists():
+        return statuses
+    with ledger_file.open('r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"Ignoring malformed line in delivery ledger '{ledger_path}'.")
+                continue
+            statuses[record["recipient"].lower()] = record["status"]
+    return statuses
+
+
+def is_retryable(error):
+    """
+    Decide whether a send error is transient and the send known to have failed.
+
+    Args:
+        error (Exception): Error raised by the Gmail client.
+
+    Returns:
+        bool: True for rate limiting and 5xx responses only.
+    """
+    return isinstance(error, HttpError) and error.resp.status in RETRYABLE_STATUS
+
+
+def is_uncertain(error):
+    """
+    Decide whether a send error leaves the outcome unknown.
+
+    After a timeout or dropped connection Gmail may already have accepted
+    the batch, so resending could email the recipients twice.
+
+    Args:
+        error (Exception): Error raised by the Gmail client.
+
+    Returns:
+        bool: True for transport failures (connection errors, timeouts).
+    """
+    return not isinstance(error, HttpError) and isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def deliver_in_batches(
+    send_batch,
+    recipients,
+    ledger_path,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_workers=4,
+    max_retries=5,
+    base_delay=1.0,
+    resend_unknown=False
+):
+    """
+    Deliver a message to recipients in batches with a resumable ledger.
+
+    Every recipient is marked 'sending' before its batch is handed to Gmail
+    and 'sent' once Gmail accepts it. Only 429/5xx responses are retried
+    in-run; a transport failure (timeout, dropped connection) is recorded
+    as 'uncertain' because Gmail may have accepted the batch anyway. On
+    restart, 'sent' recipients are skipped, 'failed' ones are retried, and
+    'sending' ones (the process died mid-send) and 'uncertain' ones are
+    skipped unless resend_unknown is set, so neither a crash nor a timeout
+    causes a double send.
+
+    Args:
+        send_batch (callable): send_batch(batch) -> Gmail message id. Called
+            from worker threads; it must not share a Gmail service object.
+        recipients (list of str): Email addresses.
+        ledger_path (str or Path): JSON-lines ledger for this delivery.
+        batch_size (int): Recipients per message.
+        max_workers (int): Concurrent send threads.
+        max_retries (int): Attempts per batch for 429/5xx responses.
+        base_delay (float): Initial backoff in seconds (doubles per attempt).
+        resend_unknown (bool): Retry recipients left in the 'sending' or
+            'uncertain' state.
+
+    Returns:
+        dict: Counts of 'sent', 'failed', 'skipped' and 'unknown' recipients.
+    """
+    ledger_file = Path(ledger_path)
+    ledger_file.parent.mkdir(parents=True, exist_ok=True)
+    statuses = load_delivery_ledger(ledger_file)
+
+    summary = {"sent": 0, "failed": 0, "skipped": 0, "unknown": 0}
+    pending = []
+    for email in recipients:
+        status = statuses.get(email.strip().lower())
+        if status == "sent":
+            summary["skipped"] += 1
+        elif status in ("sending", "uncertain") and not resend_unknown:
+            summary["unknown"] += 1
+        else:
+            pending.append(email)
+
+    if summary["unknown"]:
+        logging.warning(
+            f"{summary['unknown']} recipient(s) have an unknown delivery outcome from a previous "
+            f"run and will not be resent (see '{ledger_file}')."
+        )
+
+    batches = chunk_recipients(pending, batch_size)
+    if not batches:
+        logging.info(f"Nothing left to deliver; {summary['skipped']} recipient(s) already sent.")
+        return summary
+
+    ledger_lock = threading.Lock()
+
+    def record(emails, status, **extra):
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        lines = "".join(
+            json.dumps({"recipient": email, "status": status, "ts": timestamp, **extra}) + "\n"
+            for email in emails
+        )
+        with ledger_lock:
+            with ledger_file.open('a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def deliver(batch_index, batch):
+        record(batch, "sending", batch=batch_index)
+        delay = base_delay
+        for attempt in range(1, max_retries + 1):
+            try:
+                message_id = send_batch(batch)
+                record(batch, "sent", batch=batch_index, message_id=message_id)
+                return len(batch), 0, 0
+            except Exception as e:
+                if is_uncertain(e):
+                    logging.error(
+                        f"Batch {batch_index} of {len(batch)} recipient(s) has an unknown outcome: {e}. "
+                        f"Not resending automatically."
+                    )
+                    record(batch, "uncertain", batch=batch_index, error=str(e))
+                    return 0, 0, len(batch)
+                if attempt < max_retries and is_retryable(e):
+                    sleep_for = delay * (1 + random.random())
+                    logging.warning(
+                        f"Batch {batch_index} failed (attempt {attempt}/{max_retries}): {e}. "
+                        f"Retrying in {sleep_for:.1f}s."
+                    )
+                    time.sleep(sleep_for)
+                    delay *= 2
+                    continue
+                logging.error(f"Batch {batch_index} of {len(batch)} recipient(s) failed: {e}")
+                record(batch, "failed", batch=batch_index, error=str(e))
+                return 0, len(batch), 0
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(deliver, i, batch) for i, batch in enumerate(batches)]
+        for future in as_completed(futures):
+            sent, failed, unknown = future.result()
+            summary["sent"] += sent
+            summary["failed"] += failed
+            summary["unknown"] += unknown
+
+    logging.info(
+        f"Delivery finished: {summary['sent']} sent, {summary['failed']} failed, "
+        f"{summary['skipped']} already sent, {summary['unknown']} unknown "
+        f"across {len(batches)} batch(es)."
+    )
+    return summary
@@ -0,0 +1,126 @@
+# ingest_checkpoint.py
+
+import os
+import json
+import time
+import logging
+from pathlib import Path
+
+from utils import save_json_cache
+
+CHECKPOINT_EVERY_PDFS = 25
+CHECKPOINT_EVERY_SEC = 300
+
+
+class IngestCheckpoint:
+    """
+    Periodic crash-safe checkpoints of an ingestion run.
+
+    Each processed PDF's result (its file info, rows and log lines) is
+    journaled as one JSON line; every `every_pdfs` PDFs or `every_sec`
+    seconds the pending lines are appended and fsynced, then the caches are
+    saved atomically. A torn last line from a crash is dropped on load, so
+    the journal always replays to a consistent set of finished PDFs.
+    """
+
+    def __init__(self, journal_path, cache_paths, every_pdfs=CHECKPOINT_EVERY_PDFS,
+                 every_sec=CHECKPOINT_EVERY_SEC):
+        """
+        Args:
+            journal_path (Path): Path to the checkpoint .jsonl file.
+            cache_paths (dict): {Path: cache dict} saved at every checkpoint.
+            every_pdfs (int): Checkpoint after this many new PDFs (None = never).
+            every_sec (float): Checkpoint after this many seconds (None = never).
+        """
+        self.journal_path = Path(journal_path)
+        self.cache_paths = cache_paths
+        self.every_pdfs = every_pdfs
+        self.every_sec = every_sec
+        self.pending = []
+        self.last_saved = time.monotonic()
+
+    def load(self):
+        """
+        Read PDF results journaled by an interrupted run.
+
+        Returns:
+            list of tuple: (pdf_path, file_info, report_data, log_entries)
+        """
+        if not self.journal_path.exists():
+            return []
+        try:
+            data = self.journal_path.read_bytes()
+        except OSError as e:
+            logging.error(f"Failed to read checkpoint '{self.journal_path}': {e}")
+            return []
+
+        # Drop a torn last line so the next append starts on a fresh line
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            logging.warning(f"Ignoring torn last line in checkpoint '{self.journal_path}'.")
+            try:
+                os.truncate(self.journal_path, complete)
+            except OSError as e:
+                logging.error(f"Failed to truncate checkpoint '{self.journal_path}': {e}")
+
+        results = []
+        for line in data[:complete].decode('utf-8', errors='replace').splitlines():
+            try:
+                record = json.loads(line)
+                results.append((record["pdf"], record["file_info"], record["rows"], record["log_entries"]))
+            except (json.JSONDecodeError, KeyError):
+                logging.warning(f"Ignoring unreadable checkpoint line in '{self.journal_path}'.")
+        return results
+
+    def add(self, pdf_path, file_info, report_data, log_entries):
+        """
+        Queue one finished PDF and checkpoint if due.
+        """
+        self.pending.append(json.dumps({
+            "pdf": str(pdf_path),
+            "file_info": file_info,
+            "rows": report_data,
+            "log_entries": log_entries,
+        }, default=str))
+        elapsed = time.monotonic() - self.last_saved
+        if (self.every_pdfs and len(self.pending) >= self.every_pdfs) or (self.every_sec and elapsed >= self.every_sec):
+            self.save()
+
+    def save(self, save_caches=True):
+        """
+        Append pending results to the journal, then save the caches.
+
+        Args:
+            save_caches (bool): Also save the caches (False when the caller
+                saves them itself).
+
+        Returns:
+            bool: True if the journal was written.
+        """
+        if self.pending:
+            try:
+                with self.journal_path.open('a', encoding='utf-8') as f:
+                    f.write("\n".join(self.pending) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                logging.error(f"Failed to write checkpoint '{self.journal_path}': {e}")
+                return False
+            logging.info(f"Checkpointed {len(self.pending)} PDF(s) to '{self.journal_path}'.")
+            self.pending = []
+        if save_caches:
+            for cache_path, cache in self.cache_paths.items():
+                # Copy first: the pipeline may be adding geocodes from other threads
+                save_json_cache(cache_path, dict(cache))
+        self.last_saved = time.monotonic()
+        return True
+
+    def clear(self):
+        """
+        Remove the journal once the run's rows are safely in the dataset.
+        """
+        self.pending = []
+        try:
+            self.journal_path.unlink(missing_ok=True)
+        except OSError as e:
+            logging.error(f"Failed to remove checkpoint '{self.journal_path}': {e}")
@@ -0,0 +1,267 @@
+# ingest_pipeline.py
+
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import utils
+import text_repair
+from utils import (
+    download_pdf,
+    check_pdf_cache,
+    extract_data_from_pdf,
+    normalize_location,
+    cached_location_coords,
+    geocode_location,
+    set_pdf_text_backend
+)
+from text_repair import set_narrative_merges
+from pipeline_metrics import (
+    add_timing,
+    increment,
+    merge_metrics,
+    metrics_snapshot,
+    record_pdf_duration,
+    reset_metrics
+)
+
+# Stage concurrency; override any of these through run_ingest_pipeline kwargs
+DEFAULT_PIPELINE_SETTINGS = {
+    "download_concurrency": 4,               # concurrent HTTP downloads
+    "parse_workers": max(1, (os.cpu_count() or 2) - 1),  # parse processes
+    "geocode_concurrency": 2,                # concurrent geocoding calls
+    "geocode_rate": 5.0,                     # max geocoding calls per second (None = unlimited)
+    "queue_size": 8,                         # max PDFs waiting between two stages
+}
+
+# Marks the end of a stage's input
+STAGE_DONE = None
+
+# Complaint numbers already in the dataset, set once per parse process
+worker_existing_complaint_numbers = set()
+
+
+def init_parse_worker(pdf_text_backend, narrative_merges, existing_complaint_numbers, log_level):
+    """
+    Set up a parse process with the run's backend, merge table and known complaints.
+    """
+    global worker_existing_complaint_numbers
+    # A forked worker inherits the parent's QueueHandler, whose queue no
+    # listener drains in this process; replace it so records reach stderr
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+    set_pdf_text_backend(pdf_text_backend)
+    set_narrative_merges(narrative_merges)
+    worker_existing_complaint_numbers = existing_complaint_numbers
+
+
+def parse_pdf_worker(pdf_path, pdf_url):
+    """
+    Extract one PDF in a parse process, leaving geocoding to the parent.
+
+    Returns:
+        tuple: (report, log_entries, seconds, metrics snapshot)
+    """
+    reset_metrics()
+    start = time.perf_counter()
+    report, log_entries = extract_data_from_pdf(
+        pdf_path, None, {}, False, worker_existing_complaint_numbers, pdf_url
+    )
+    return report, log_entries, time.perf_counter() - start, metrics_snapshot()
+
+
+class RateLimiter:
+    """
+    Spaces out call starts to at most `rate` per second across tasks.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            if self.next_start > now:
+                await asyncio.sleep(self.next_start - now)
+                now = self.next_start
+            self.next_start = now + self.interval
+
+
+class IngestPipeline:
+    """
+    Download -> parse -> geocode -> write stages joined by bounded queues.
+
+    Downloads and geocoding calls run on threads driven by the event loop,
+    parsing runs in a process pool, and a single writer task hands each
+    finished PDF to on_pdf, so caches and accumulated rows are only touched
+    from the event loop. A full queue blocks the stage feeding it, which
+    keeps the number of PDFs in flight bounded.
+    """
+
+    def __init__(self, download_dir, gmaps_client, location_cache, pdf_cache, existing_complaint_numbers,
+                 on_pdf, redownload=False, reprocess_locs=False, **settings):
+        unknown = set(settings) - set(DEFAULT_PIPELINE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown pipeline setting(s): {', '.join(sorted(unknown))}")
+        self.settings = {**DEFAULT_PIPELINE_SETTINGS, **settings}
+        self.download_dir = download_dir
+        self.gmaps_client = gmaps_client
+        self.location_cache = location_cache
+        self.pdf_cache = pdf_cache
+        self.existing_complaint_numbers = existing_complaint_numbers
+        self.on_pdf = on_pdf
+        self.redownload = redownload
+        self.reprocess_locs = reprocess_locs
+        # One lookup per location per run, shared by rows waiting on it
+        self.lookups = {}
+
+    async def run(self, pdf_links):
+        size = self.settings["queue_size"]
+        self.links = asyncio.Queue()
+        self.to_parse = asyncio.Queue(maxsize=size)
+        self.to_geocode = asyncio.Queue(maxsize=size)
+        self.to_write = asyncio.Queue(maxsize=size)
+        self.rate_limiter = RateLimiter(self.settings["geocode_rate"])
+        for link in pdf_links:
+            self.links.put_nowait(link)
+        for _ in range(self.settings["download_concurrency"]):
+            self.links.put_nowait(STAGE_DONE)
+
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.settings["parse_workers"],
+            initializer=init_parse_worker,
+            initargs=(
+                utils.pdf_text_backend,
+                text_repair.narrative_merges,
+                set(self.existing_complaint_numbers),
+                logging.getLogger().getEffectiveLevel(),
+            ),
+        )
+        try:
+            await asyncio.gather(
+                self.stage(self.download_worker, self.settings["download_concurrency"],
+                           self.to_parse, self.settings["parse_workers"]),
+                self.stage(self.parse_worker, self.settings["parse_workers"],
+                           self.to_geocode, self.settings["geocode_concurrency"]),
+                self.stage(self.geocode_worker, self.settings["geocode_concurrency"], self.to_write, 1),
+                self.stage(self.write_worker, 1),
+            )
+        finally:
+            await loop.run_in_executor(None, self.pool.shutdown)
+
+    async def stage(self, worker, count, downstream=None, downstream_count=0):
+        """
+        Run `count` copies of a stage worker; once all finish, send one end
+        marker per worker of the next stage.
+        """
+        await asyncio.gather(*(worker() for _ in range(count)))
+        for _ in range(downstream_count):
+            await downstream.put(STAGE_DONE)
+
+    async def download_worker(self):
+        while (pdf_url := await self.links.get()) is not STAGE_DONE:
+            start = time.perf_counter()
+            pdf_path = await asyncio.to_thread(download_pdf, pdf_url, self.download_dir, self.redownload)
+            add_timing("download", time.perf_counter() - start)
+            if not pdf_path:
+                continue
+            # Hashing a changed PDF is blocking file I/O; keep it off the event loop
+            process_pdf, file_info = await asyncio.to_thread(
+                check_pdf_cache, pdf_path, self.pdf_cache, self.existing_complaint_numbers
+            )
+            if process_pdf:
+                await self.to_parse.put((pdf_url, pdf_path, file_info))
+
+    async def parse_worker(self):
+        loop = asyncio.get_running_loop()
+        while (item := await self.to_parse.get()) is not STAGE_DONE:
+            pdf_url, pdf_path, file_info = item
+            try:
+                report, log_entries, seconds, worker_metrics = await loop.run_in_executor(
+                    self.pool, parse_pdf_worker, pdf_path, pdf_url
+                )
+            except Exception as e:
+                logging.error(f"Parse worker failed on '{pdf_path}': {e}")
+                print(f"Parse worker failed on '{pdf_path}': {e}")
+                continue
+            merge_metrics(worker_metrics)
+            record_pdf_duration(Path(pdf_path).name, seconds, len(report))
+            increment("pdfs_processed")
+            await self.to_geocode.put((pdf_path, file_info, report, log_entries))
+
+    async def geocode_worker(self):
+        while (item := await self.to_geocode.get()) is not STAGE_DONE:
+            pdf_path, file_info, report, log_entries = item
+            for row in report:
+                lat, lng = await self.resolve(row["Location"])
+                row["Lat"], row["Long"] = lat, lng
+                row["Loc"] = 1 if (lat is not None and lng is not None) else 0
+            await self.to_write.put(item)
+
+    async def resolve(self, loc_str):
+        """
+        Coordinates for one location: from the cache, from a lookup already
+        made (or in flight) this run, or from a rate-limited API call.
+        """
+        normalized_loc_str = normalize_location(loc_str)
+        if normalized_loc_str not in self.lookups:
+            cached_coords = cached_location_coords(normalized_loc_str, self.location_cache, self.reprocess_locs)
+            if cached_coords is not None:
+                increment("geocode_cache_hits")
+                return cached_coords
+            self.lookups[normalized_loc_str] = asyncio.ensure_future(self.lookup(loc_str, normalized_loc_str))
+        else:
+            increment("geocode_cache_hits")
+        return await self.lookups[normalized_loc_str]
+
+    async def lookup(self, loc_str, normalized_loc_str):
+        increment("geocode_cache_misses")
+        await self.rate_limiter.wait()
+        start = time.perf_counter()
+        lat, lng = await asyncio.to_thread(
+            geocode_location, loc_str, normalized_loc_str, self.gmaps_client, self.location_cache
+        )
+        add_timing("geocoding", time.perf_counter() - start)
+        return lat, lng
+
+    async def write_worker(self):
+        while (item := await self.to_write.get()) is not STAGE_DONE:
+            self.on_pdf(*item)
+
+
+def run_ingest_pipeline(pdf_links, download_dir, gmaps_client, location_cache, pdf_cache,
+                        existing_complaint_numbers, on_pdf, redownload=False, reprocess_locs=False, **settings):
+    """
+    Process PDF links through the staged pipeline.
+
+    Each PDF needing work is downloaded, parsed, geocoded and then passed
+    to on_pdf(pdf_path, file_info, report_data, log_entries) from a single
+    task, in completion order.
+
+    Args:
+        pdf_links (list of str): PDF URLs.
+        download_dir (Path): Directory for downloaded PDFs.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client.
+        location_cache (dict): Location cache; updated in place.
+        pdf_cache (dict): PDF cache (read for the skip check; on_pdf updates it).
+        existing_complaint_numbers (set): Complaint numbers already processed.
+        on_pdf (callable): Receives each finished PDF.
+        redownload (bool): Re-download PDFs that already exist.
+        reprocess_locs (bool): Flag to force reprocessing of locations.
+        **settings: Overrides for DEFAULT_PIPELINE_SETTINGS.
+    """
+    pipeline = IngestPipeline(
+        download_dir, gmaps_client, location_cache, pdf_cache, existing_complaint_numbers,
+        on_pdf, redownload=redownload, reprocess_locs=reprocess_locs, **settings
+    )
+    start = time.perf_counter()
+    asyncio.run(pipeline.run(pdf_links))
+    logging.info(f"Ingest pipeline finished {len(pdf_links)} link(s) in {time.perf_counter() - start:.2f}s "
+                 f"with settings {pipeline.settings}.")
@@ -0,0 +1,77 @@
+# log_config.py
+
+import os
+import queue
+import atexit
+import logging
+from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Logging profiles. "quiet" is the production default: the per-complaint
+# debug lines are never formatted, and only warnings and errors are written.
+LOG_PROFILES = {
+    "debug": logging.DEBUG,
+    "verbose": logging.INFO,
+    "quiet": logging.WARNING,
+}
+DEFAULT_LOG_PROFILE = "quiet"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+def configure_logging(log_path, profile=None, max_bytes=5 * 1024 * 1024, backup_count=5):
+    """
+    Configure root logging with a queue handler and a size-rotated file.
+
+    Callers only enqueue records; a background QueueListener thread formats
+    them and writes to the file, so disk I/O stays off the hot path.
+
+    Args:
+        log_path (str or Path): Log file path (rotated as .1, .2, ...).
+        profile (str): One of LOG_PROFILES; defaults to the OP_CRIME_LOG_PROFILE
+            environment variable, then DEFAULT_LOG_PROFILE.
+        max_bytes (int): Rotate once the file reaches this size.
+        backup_count (int): Number of rotated files to keep.
+
+    Returns:
+        QueueListener: The running listener (stopped automatically at exit).
+    """
+    global _listener
+
+    profile = (profile or os.getenv("OP_CRIME_LOG_PROFILE") or DEFAULT_LOG_PROFILE).lower()
+    if profile not in LOG_PROFILES:
+        raise ValueError(f"Unknown log profile '{profile}'. Expected one of {sorted(LOG_PROFILES)}.")
+    level = LOG_PROFILES[profile]
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=False)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """
+    Flush queued records and stop the background listener.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
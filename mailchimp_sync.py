@@ -0,0 +1,222 @@
+# mailchimp_sync.py
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils import load_json_cache, save_json_cache
+
+# Mailchimp allows at most 10 simultaneous connections per API key.
+MAILCHIMP_MAX_CONNECTIONS = 10
+MAILCHIMP_PAGE_SIZE = 1000  # Max allowed by Mailchimp
+MEMBER_FIELDS = "total_items,members.email_address,members.status,members.last_changed"
+
+
+def mailchimp_api_url():
+    """
+    Build the Mailchimp API base URL from environment variables.
+
+    MAILCHIMP_API_URL overrides the data-center URL, which lets the sync run
+    against a local HTTP stub.
+
+    Returns:
+        str: Base URL of the Mailchimp 3.0 API.
+    """
+    override = os.getenv("MAILCHIMP_API_URL")
+    if override:
+        return override.rstrip("/")
+    data_center = os.getenv("MAILCHIMP_DATA_CENTER")  # e.g., 'us1', 'us2'
+    if not data_center:
+        raise ValueError("Missing Mailchimp API configuration in environment variables.")
+    return f"https://{data_center}.api.mailchimp.com/3.0"
+
+
+def fetch_members_page(session, url, api_key, params, max_retries=5):
+    """
+    Fetch a single page of list members, backing off on 429/5xx responses.
+
+    Args:
+        session (requests.Session): HTTP session to use.
+        url (str): Members endpoint URL.
+        api_key (str): Mailchimp API key.
+        params (dict): Query parameters (offset, count, since_last_changed...).
+        max_retries (int): Attempts before giving up on a page.
+
+    Returns:
+        dict: Decoded JSON response.
+    """
+    delay = 1.0
+    for attempt in range(1, max_retries + 1):
+        response = session.get(url, auth=("anystring", api_key), params=params, timeout=30)
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 429 or response.status_code >= 500:
+            logging.warning(
+                f"Mailchimp returned {response.status_code} for offset {params.get('offset')} "
+                f"(attempt {attempt}/{max_retries}); retrying in {delay:.1f}s."
+            )
+            time.sleep(delay)
+            delay *= 2
+            continue
+        break
+    logging.error(f"Failed to fetch subscribers: {response.status_code} - {response.text}")
+    raise Exception(f"Mailchimp API Error: {response.status_code} - {response.text}")
+
+
+def sync_mailchimp_subscribers(
+    cache_path,
+    api_url=None,
+    audience_id=None,
+    api_key=None,
+    max_workers=4,
+    page_size=MAILCHIMP_PAGE_SIZE,
+    full_refresh=False
+):
+    """
+    Synchronize the local subscriber cache with the Mailchimp audience.
+
+    The cache keeps every known member with its status and a
+    `since_last_changed` watermark. Subsequent runs only request members
+    changed after the watermark, so unsubscribes are picked up without
+    re-downloading the whole list. The first page is fetched to learn
+    `total_items`; the remaining pages are fetched concurrently, each pool
+    thread on its own requests.Session (sessions are not thread-safe).
+
+    Args:
+        cache_path (str or Path): Path to the subscriber cache JSON.
+        api_url (str): Base API URL (defaults to mailchimp_api_url()).
+        audience_id (str): Audience/list id (defaults to MAILCHIMP_AUDIENCE_ID).
+        api_key (str): API key (defaults to MAILCHIMP_API_KEY).
+        max_workers (int): Concurrent page requests, capped by the API limit.
+        page_size (int): Members per page.
+        full_refresh (bool): Ignore the watermark and refetch everything.
+
+    Returns:
+        list: Email addresses with status 'subscribed'.
+    """
+    api_url = api_url or mailchimp_api_url()
+    audience_id = audience_id or os.getenv("MAILCHIMP_AUDIENCE_ID")
+    api_key = api_key or os.getenv("MAILCHIMP_API_KEY")
+    if not all([api_url, audience_id, api_key]):
+        raise ValueError("Missing Mailchimp API configuration in environment variables.")
+
+    cache = {} if full_refresh else load_json_cache(cache_path)
+    members = cache.get("members", {})
+    watermark = cache.get("since_last_changed")
+
+    # Record the new watermark before fetching so changes made mid-sync are seen next run
+    sync_started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+    url = f"{api_url}/lists/{audience_id}/members"
+    base_params = {"count": page_size, "fields": MEMBER_FIELDS}
+    if watermark:
+        # Deltas must include every status so unsubscribes/cleans are applied
+        base_params["since_last_changed"] = watermark
+    else:
+        base_params["status"] = "subscribed"
+
+    max_workers = max(1, min(max_workers, MAILCHIMP_MAX_CONNECTIONS))
+    with requests.Session() as session:
+        first_page = fetch_members_page(session, url, api_key, {**base_params, "offset": 0})
+    pages = [first_page]
+    total_items = first_page.get("total_items", 0)
+    offsets = list(range(page_size, total_items, page_size))
+    if offsets:
+        thread_state = threading.local()
+        sessions = []
+        sessions_lock = threading.Lock()
+
+        def fetch_offset(offset):
+            if not hasattr(thread_state, "session"):
+                thread_state.session = requests.Session()
+                with sessions_lock:
+                    sessions.append(thread_state.session)
+            return fetch_members_page(thread_state.session, url, api_key, {**base_params, "offset": offset})
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages.extend(executor.map(fetch_offset, offsets))
+        finally:
+            for worker_session in sessions:
+                worker_session.close()
+
+    changed = 0
+    for page in pages:
+        for member in page.get("members", []):
+            email = member.get("email_address")
+            if not email:
+                continue
+            members[email.lower()] = {
+                "email_address": email,
+                "status": member.get("status", "subscribed"),
+                "last_changed": member.get("last_changed")
+            }
+            changed += 1
+
+    cache = {"since_last_changed": sync_started, "members": members}
+    save_json_cache(cache_path, cache)
+
+    subscribers = [m["email_address"] for m in members.values() if m.get("status") == "subscribed"]
+    mode = "delta" if watermark else "full"
+    logging.info(
+        f"Mailchimp {mode} sync: {changed} member(s) changed across {len(pages)} page(s); "
+        f"{len(subscribers)} subscribed."
+    )
+    return subscribers
+
+
+def wait_for_url(url, timeout=300, interval=5, not_before=None):
+    """
+    Poll a published URL until it is served, instead of sleeping a fixed time.
+
+    Args:
+        url (str): URL to poll (e.g., the freshly pushed GitHub Pages map).
+        timeout (float): Seconds to wait before giving up.
+        interval (float): Seconds between polls.
+        not_before (datetime): If given, also require the Last-Modified header
+            (when present) to be at or after this time.
+
+    Returns:
+        bool: True if the URL became ready within the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=10)
+            if response.status_code == 200:
+                last_modified = response.headers.get("Last-Modified")
+                if not_before is None or not last_modified:
+                    return True
+                served_at = datetime.strptime(last_modified, "%a, %d %b %Y %H:%M:%S %Z").replace(tzinfo=timezone.utc)
+                if served_at >= not_before.astimezone(timezone.utc).replace(microsecond=0):
+                    return True
+            logging.debug(f"'{url}' not ready yet (status {response.status_code}).")
+        except (requests.RequestException, ValueError) as e:
+            logging.debug(f"Polling '{url}' failed: {e}")
+
+        if time.monotonic() >= deadline:
+            logging.warning(f"Timed out after {timeout}s waiting for '{url}'.")
+            return False
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Manual sync: python mailchimp_sync.py [--full]
+    import sys
+    from utils import load_env_vars
+
+    script_dir = Path(__file__).parent.resolve()
+    load_env_vars(script_dir / "env_vars.txt")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    emails = sync_mailchimp_subscribers(
+        script_dir / "cache" / "mailchimp_subscribers.json",
+        full_refresh="--full" in sys.argv
+    )
+    print(json.dumps({"subscribed": len(emails)}))
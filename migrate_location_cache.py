@@ -0,0 +1,292 @@
+# migrate_location_cache.py
+
+import math
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+
+from utils import (
+    LOCATION_KEY_VERSION,
+    normalize_location,
+    load_json_cache,
+    save_json_cache,
+    load_csv_data,
+    upgrade_location_entry,
+    location_entry_coords,
+    points_in_boundary
+)
+
+DEFAULT_TOMBSTONE_TTL_DAYS = 30
+
+
+def location_cache_meta_path(location_cache_path):
+    """
+    Path of the sidecar file holding location-cache metadata.
+
+    Args:
+        location_cache_path (Path): Path to location_cache.json.
+
+    Returns:
+        Path: Path to location_cache_meta.json in the same directory.
+    """
+    return Path(location_cache_path).with_name('location_cache_meta.json')
+
+
+def is_tombstone(value):
+    """
+    True for a cached failed geocode ([null, null] or a failed entry).
+    """
+    lat, lng = location_entry_coords(value)
+    return lat is None or lng is None
+
+
+def distance_m(a, b):
+    """
+    Approximate distance in meters between two (lat, lng) pairs.
+    Equirectangular is plenty at village scale.
+    """
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    x = (lng2 - lng1) * math.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return 6371000 * math.hypot(x, y)
+
+
+def migrate_location_cache(location_cache, meta, tombstone_ttl_days=DEFAULT_TOMBSTONE_TTL_DAYS, now=None):
+    """
+    Rewrite a location cache into the current canonical key space.
+
+    - Every key is re-normalized with normalize_location (LOCATION_KEY_VERSION).
+    - Keys that collapse to the same canonical key are merged. Geocoded
+      coordinates win over failures; between geocoded candidates, one inside
+      the village boundary wins, then the most recently updated. Candidates
+      more than 50 m from the winner are logged as conflicts.
+    - Failed entries are dropped once their last attempt is older than the
+      TTL so they start over with a fresh attempt count. Legacy [null, null]
+      tombstones have no timestamp, so the first migration that sees one
+      records it in the metadata.
+    - Legacy [lat, lng] values are upgraded to entry dicts.
+
+    Args:
+        location_cache (dict): {key: entry} as stored on disk.
+        meta (dict): Contents of location_cache_meta.json (may be empty).
+        tombstone_ttl_days (float): Age after which failed entries are dropped.
+        now (float): Current UNIX time (defaults to time.time()).
+
+    Returns:
+        tuple: (migrated cache dict, updated meta dict, stats dict)
+    """
+    now = time.time() if now is None else now
+    ttl_sec = tombstone_ttl_days * 86400
+    tombstones_seen = dict(meta.get("tombstones_seen", {}))
+
+    groups = defaultdict(list)
+    for key, value in location_cache.items():
+        canonical = normalize_location(key)
+        if canonical:
+            groups[canonical].append((key, value))
+
+    migrated = {}
+    new_tombstones_seen = {}
+    stats = {
+        "keys_before": len(location_cache),
+        "merged_keys": 0,
+        "conflicts": 0,
+        "tombstones_dropped": 0,
+    }
+    for canonical, candidates in groups.items():
+        stats["merged_keys"] += len(candidates) - 1
+        geocoded = [(key, value) for key, value in candidates if not is_tombstone(value)]
+
+        if geocoded:
+            # Prefer a candidate inside the village, then the newest; a key
+            # that was already canonical is no more trustworthy than a variant
+            coords = [location_entry_coords(value) for _, value in geocoded]
+            inside = points_in_boundary([c[0] for c in coords], [c[1] for c in coords])
+            order = sorted(
+                range(len(geocoded)),
+                key=lambda i: (not inside[i], -(upgrade_location_entry(geocoded[i][1]).get("updated") or 0))
+            )
+            best_key, best = geocoded[order[0]][0], upgrade_location_entry(geocoded[order[0]][1])
+            best_coords = coords[order[0]]
+            for i in order[1:]:
+                if distance_m(best_coords, coords[i]) > 50:
+                    stats["conflicts"] += 1
+                    logging.warning(
+                        f"Conflicting coordinates for '{canonical}': kept {best_coords} from '{best_key}' "
+                        f"({'inside' if inside[order[0]] else 'outside'} the village), dropped {coords[i]} "
+                        f"from '{geocoded[i][0]}' ({'inside' if inside[i] else 'outside'} the village)."
+                    )
+            migrated[canonical] = best
+            continue
+
+        # Only failures: merge attempt counts and age by the most recent attempt
+        entries = [upgrade_location_entry(value) for _, value in candidates]
+        last_attempt = max((e["updated"] for e in entries if e.get("updated") is not None), default=None)
+        if last_attempt is None:
+            age_from = min((tombstones_seen.get(key, now) for key, _ in candidates), default=now)
+        else:
+            age_from = last_attempt
+        if now - age_from > ttl_sec:
+            stats["tombstones_dropped"] += 1
+            continue
+        merged = max(entries, key=lambda e: e.get("attempts", 0))
+        migrated[canonical] = dict(merged, updated=last_attempt)
+        if last_attempt is None:
+            new_tombstones_seen[canonical] = age_from
+
+    stats["keys_after"] = len(migrated)
+    new_meta = {
+        "normalizer_version": LOCATION_KEY_VERSION,
+        "migrated_at": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+        "tombstones_seen": new_tombstones_seen,
+    }
+    return migrated, new_meta, stats
+
+
+def expire_tombstones(location_cache, meta, tombstone_ttl_days=DEFAULT_TOMBSTONE_TTL_DAYS, now=None):
+    """
+    Drop failed entries older than the TTL from a cache already in the
+    current key space (the same rule migrate_location_cache applies).
+
+    Args:
+        location_cache (dict): {key: entry}; updated in place.
+        meta (dict): Contents of location_cache_meta.json.
+        tombstone_ttl_days (float): Age after which failed entries are dropped.
+        now (float): Current UNIX time (defaults to time.time()).
+
+    Returns:
+        tuple: (number of entries dropped, updated meta dict)
+    """
+    now = time.time() if now is None else now
+    ttl_sec = tombstone_ttl_days * 86400
+    tombstones_seen = meta.get("tombstones_seen", {})
+    new_tombstones_seen = {}
+    expired = []
+    for key, value in location_cache.items():
+        if not is_tombstone(value):
+            continue
+        last_attempt = upgrade_location_entry(value).get("updated")
+        age_from = last_attempt if last_attempt is not None else tombstones_seen.get(key, now)
+        if now - age_from > ttl_sec:
+            expired.append(key)
+        elif last_attempt is None:
+            new_tombstones_seen[key] = age_from
+    for key in expired:
+        del location_cache[key]
+    return len(expired), dict(meta, tombstones_seen=new_tombstones_seen)
+
+
+def cache_hit_rate(locations, location_cache, version=LOCATION_KEY_VERSION):
+    """
+    Fraction of location strings that would be served from the cache.
+
+    Args:
+        locations (iterable of str): Raw location strings (one per complaint).
+        location_cache (dict): Cache to look up against.
+        version (int): Normalizer version used for the lookups.
+
+    Returns:
+        float: Hit rate in [0, 1] (0 when there are no locations).
+    """
+    keys = [normalize_location(loc, version=version) for loc in locations]
+    keys = [key for key in keys if key]
+    if not keys:
+        return 0.0
+    hits = sum(1 for key in keys if key in location_cache and not is_tombstone(location_cache[key]))
+    return hits / len(keys)
+
+
+def ensure_location_cache_current(location_cache_path, location_cache, tombstone_ttl_days=DEFAULT_TOMBSTONE_TTL_DAYS):
+    """
+    Migrate the loaded cache in place if it predates LOCATION_KEY_VERSION,
+    otherwise expire failed entries past the tombstone TTL.
+
+    Called at the start of ingestion so a normalizer bump never turns every
+    lookup into a paid geocoding call, and so stale failures are retried
+    from scratch on every run, not only at the next migration.
+
+    Args:
+        location_cache_path (Path): Path to location_cache.json.
+        location_cache (dict): The loaded cache; updated in place.
+        tombstone_ttl_days (float): Age after which tombstones are dropped.
+
+    Returns:
+        bool: True if a migration was performed.
+    """
+    meta_path = location_cache_meta_path(location_cache_path)
+    meta = load_json_cache(meta_path)
+    if meta.get("normalizer_version", 1) >= LOCATION_KEY_VERSION:
+        dropped, new_meta = expire_tombstones(location_cache, meta, tombstone_ttl_days)
+        if dropped:
+            save_json_cache(location_cache_path, location_cache)
+            logging.info(f"Dropped {dropped} failed location(s) older than {tombstone_ttl_days} days.")
+        if new_meta != meta:
+            save_json_cache(meta_path, new_meta)
+        return False
+
+    migrated, new_meta, stats = migrate_location_cache(location_cache, meta, tombstone_ttl_days)
+    location_cache.clear()
+    location_cache.update(migrated)
+    save_json_cache(location_cache_path, location_cache)
+    save_json_cache(meta_path, new_meta)
+    logging.info(f"Migrated location cache to key version {LOCATION_KEY_VERSION}: {stats}")
+    print(f"Migrated location cache to key version {LOCATION_KEY_VERSION}: {stats}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rewrite cache/location_cache.json into the canonical key space."
+    )
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TOMBSTONE_TTL_DAYS,
+                        help="Drop failed entries whose last attempt is older than this many days.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report the effect without writing the cache.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    location_cache_path = script_dir / 'cache' / 'location_cache.json'
+    meta_path = location_cache_meta_path(location_cache_path)
+
+    location_cache = load_json_cache(location_cache_path)
+    meta = load_json_cache(meta_path)
+    old_version = meta.get("normalizer_version", 1)
+
+    migrated, new_meta, stats = migrate_location_cache(location_cache, meta, args.ttl_days)
+
+    csv_df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+    locations = csv_df["Location"].dropna().tolist() if "Location" in csv_df.columns else []
+    hit_before = cache_hit_rate(locations, location_cache, version=old_version)
+    hit_after = cache_hit_rate(locations, migrated)
+    distinct_before = len({normalize_location(loc, version=old_version) for loc in locations})
+    distinct_after = len({normalize_location(loc) for loc in locations})
+
+    report = [
+        f"Normalizer version: {old_version} -> {LOCATION_KEY_VERSION}",
+        f"Cache keys: {stats['keys_before']} -> {stats['keys_after']} "
+        f"({stats['merged_keys']} merged, {stats['tombstones_dropped']} tombstones dropped, "
+        f"{stats['conflicts']} coordinate conflicts)",
+        f"Distinct lookup keys in CSV: {distinct_before} -> {distinct_after}",
+        f"Expected cache hit rate on {len(locations)} CSV locations: "
+        f"{hit_before:.2%} -> {hit_after:.2%} ({hit_after - hit_before:+.2%})",
+    ]
+    print("\n".join(report))
+
+    if args.dry_run:
+        print("Dry run: cache not written.")
+        return
+
+    save_json_cache(location_cache_path, migrated)
+    save_json_cache(meta_path, new_meta)
+    print(f"Location cache written to '{location_cache_path}'.")
+
+
+if __name__ == "__main__":
+    main()
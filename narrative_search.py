@@ -0,0 +1,330 @@
+# narrative_search.py
+
+import re
+import time
+import sqlite3
+import string
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from nltk.corpus import stopwords
+    STOP_WORDS = set(stopwords.words('english'))
+except (ImportError, LookupError):  # corpus not downloaded
+    STOP_WORDS = set()
+
+# Bump when the schema or tokenizer changes; older indexes are rebuilt
+INDEX_VERSION = 1
+
+# Dataset column -> incidents column
+INDEX_COLUMNS = {
+    "Complaint #": "complaint",
+    "File Name": "file_name",
+    "Date": "date",
+    "Offense": "offense",
+    "Location": "location",
+    "NLP_Text": "nlp_text",
+}
+
+# Quoted phrases or bare terms (an optional trailing * makes a prefix term)
+QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+PUNCT_TABLE = str.maketrans('', '', string.punctuation.replace("*", ""))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    complaint TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    date TEXT,
+    offense TEXT,
+    location TEXT,
+    nlp_text TEXT,
+    UNIQUE (complaint, file_name)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS narrative_fts USING fts5(
+    nlp_text, content='incidents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS incidents_ai AFTER INSERT ON incidents BEGIN
+    INSERT INTO narrative_fts(rowid, nlp_text) VALUES (new.id, new.nlp_text);
+END;
+CREATE TRIGGER IF NOT EXISTS incidents_ad AFTER DELETE ON incidents BEGIN
+    INSERT INTO narrative_fts(narrative_fts, rowid, nlp_text) VALUES ('delete', old.id, old.nlp_text);
+END;
+CREATE TRIGGER IF NOT EXISTS incidents_au AFTER UPDATE ON incidents BEGIN
+    INSERT INTO narrative_fts(narrative_fts, rowid, nlp_text) VALUES ('delete', old.id, old.nlp_text);
+    INSERT INTO narrative_fts(rowid, nlp_text) VALUES (new.id, new.nlp_text);
+END;
+"""
+
+# Insert new (complaint, file) rows; rewrite existing ones only if a field changed
+UPSERT_SQL = """
+INSERT INTO incidents (complaint, file_name, date, offense, location, nlp_text)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (complaint, file_name) DO UPDATE SET
+    date = excluded.date, offense = excluded.offense,
+    location = excluded.location, nlp_text = excluded.nlp_text
+WHERE incidents.date IS NOT excluded.date
+   OR incidents.offense IS NOT excluded.offense
+   OR incidents.location IS NOT excluded.location
+   OR incidents.nlp_text IS NOT excluded.nlp_text
+"""
+
+
+def open_index(index_path):
+    """
+    Open (creating if needed) the narrative search index.
+
+    An index built with an older INDEX_VERSION is dropped so the next
+    update_index call rebuilds it.
+
+    Args:
+        index_path (Path or str): SQLite file, or ":memory:".
+
+    Returns:
+        sqlite3.Connection: Open connection.
+    """
+    conn = sqlite3.connect(str(index_path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL" if str(index_path) != ":memory:" else "PRAGMA journal_mode=MEMORY")
+    version = None
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'meta'").fetchone():
+        row = conn.execute("SELECT value FROM meta WHERE key = 'index_version'").fetchone()
+        version = int(row[0]) if row else None
+    if version is not None and version != INDEX_VERSION:
+        logging.info(f"Narrative index version {version} is stale; rebuilding.")
+        drop_index(conn)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('index_version', ?)", (str(INDEX_VERSION),))
+    conn.commit()
+    return conn
+
+
+def drop_index(conn):
+    """
+    Drop every index table so it can be rebuilt from scratch.
+    """
+    conn.executescript("""
+        DROP TRIGGER IF EXISTS incidents_ai;
+        DROP TRIGGER IF EXISTS incidents_ad;
+        DROP TRIGGER IF EXISTS incidents_au;
+        DROP TABLE IF EXISTS narrative_fts;
+        DROP TABLE IF EXISTS incidents;
+        DROP TABLE IF EXISTS meta;
+    """)
+
+
+def index_rows(df):
+    """
+    Yield upsert parameters for dataset rows with a complaint number and file name.
+    """
+    present = [col for col in INDEX_COLUMNS if col in df.columns]
+    subset = df[present].dropna(subset=["Complaint #", "File Name"])
+    for values in subset.itertuples(index=False, name=None):
+        row = dict(zip(present, values))
+        yield tuple(
+            None if pd.isna(row.get(col)) else str(row[col])
+            for col in INDEX_COLUMNS
+        )
+
+
+def update_index(conn, df):
+    """
+    Add new dataset rows to the index and refresh rows whose text changed.
+
+    Rows are keyed by (Complaint #, File Name), the dataset's de-duplication
+    key, so passing the whole dataset again only writes what is new.
+
+    Args:
+        conn (sqlite3.Connection): Connection from open_index.
+        df (DataFrame): Dataset rows (summary_report columns).
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    with conn:
+        cursor = conn.executemany(UPSERT_SQL, index_rows(df))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('updated_at', ?)",
+                     (datetime.now().isoformat(timespec="seconds"),))
+    return max(cursor.rowcount, 0)
+
+
+def update_narrative_index(index_path, df):
+    """
+    Open the on-disk index, apply update_index and close it.
+
+    Args:
+        index_path (Path): Path to narrative_index.sqlite.
+        df (DataFrame): Dataset rows.
+
+    Returns:
+        int: Number of rows inserted or updated (None on failure).
+    """
+    try:
+        conn = open_index(index_path)
+        try:
+            return update_index(conn, df)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Failed to update narrative index '{index_path}': {e}")
+        print(f"Failed to update narrative index '{index_path}': {e}")
+        return None
+
+
+def normalize_terms(text):
+    """
+    Normalize query words the way process_narrative_nlp normalizes NLP_Text.
+    """
+    words = text.translate(PUNCT_TABLE).lower().split()
+    return [w for w in words if w.rstrip("*") and w.rstrip("*") not in STOP_WORDS]
+
+
+def build_match_query(query):
+    """
+    Translate a user query into an FTS5 MATCH expression.
+
+    Bare words are ANDed, "quoted phrases" must appear in order and a
+    trailing * matches a prefix (burg*). Stopwords are dropped since
+    NLP_Text has none.
+
+    Args:
+        query (str): User query.
+
+    Returns:
+        str: MATCH expression ('' if nothing searchable remains).
+    """
+    parts = []
+    for phrase, word in QUERY_TOKEN_RE.findall(query):
+        terms = normalize_terms(phrase if phrase else word)
+        if not terms:
+            continue
+        if phrase:
+            parts.append('"' + " ".join(t.rstrip("*") for t in terms) + '"')
+        else:
+            parts.extend(
+                f'"{t.rstrip("*")}"*' if t.endswith("*") else f'"{t}"'
+                for t in terms
+            )
+    return " ".join(parts)
+
+
+def search(conn, query, limit=50, start_date=None, end_date=None, offenses=None):
+    """
+    Ranked (BM25) full-text search over narratives.
+
+    The index holds one row per (Complaint #, File Name), since each report
+    may word a narrative differently; a complaint listed in several reports
+    is returned once, with its best-matching row.
+
+    Args:
+        conn (sqlite3.Connection): Connection from open_index.
+        query (str): Keywords and/or "quoted phrases".
+        limit (int): Maximum results (None = all).
+        start_date (str): Inclusive YYYY-MM-DD lower bound.
+        end_date (str): Inclusive YYYY-MM-DD upper bound.
+        offenses (list of str): Restrict to these offenses.
+
+    Returns:
+        DataFrame: Complaint #, File Name, Date, Offense, Location, Snippet,
+        Score (lower is a better match), best first.
+    """
+    columns = ["Complaint #", "File Name", "Date", "Offense", "Location", "Snippet", "Score"]
+    match = build_match_query(query)
+    if not match:
+        return pd.DataFrame(columns=columns)
+
+    sql = """
+        SELECT i.complaint, i.file_name, i.date, i.offense, i.location,
+               snippet(narrative_fts, 0, '[', ']', '...', 12) AS snippet, bm25(narrative_fts) AS score
+        FROM narrative_fts JOIN incidents i ON i.id = narrative_fts.rowid
+        WHERE narrative_fts MATCH ?
+    """
+    params = [match]
+    if start_date:
+        sql += " AND i.date >= ?"
+        params.append(str(start_date))
+    if end_date:
+        sql += " AND i.date <= ?"
+        params.append(str(end_date))
+    if offenses:
+        sql += f" AND i.offense IN ({', '.join('?' * len(offenses))})"
+        params.extend(offenses)
+    # Best-scoring row of each complaint
+    sql = f"""
+        SELECT complaint, file_name, date, offense, location, snippet, score FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY complaint ORDER BY score) AS complaint_rank
+            FROM ({sql})
+        )
+        WHERE complaint_rank = 1
+        ORDER BY score
+    """
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        logging.warning(f"Narrative search failed for {query!r}: {e}")
+        rows = []
+    return pd.DataFrame(rows, columns=columns)
+
+
+def index_size(conn):
+    """
+    Number of indexed rows.
+    """
+    return conn.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+
+
+def main():
+    from utils import load_csv_data
+
+    parser = argparse.ArgumentParser(description="Full-text search over incident narratives.")
+    parser.add_argument("query", nargs="?", help='Keywords and/or "quoted phrases"; burg* matches a prefix.')
+    parser.add_argument("--limit", type=int, default=20, help="Maximum results.")
+    parser.add_argument("--since", help="Only incidents on or after this date (YYYY-MM-DD).")
+    parser.add_argument("--until", help="Only incidents on or before this date (YYYY-MM-DD).")
+    parser.add_argument("--offense", action="append", help="Restrict to an offense (repeatable).")
+    parser.add_argument("--update", action="store_true",
+                        help="Index new or changed rows from data/summary_report.zip first.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch first.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    index_path = script_dir / 'cache' / 'narrative_index.sqlite'
+
+    conn = open_index(index_path)
+    if args.rebuild:
+        drop_index(conn)
+        conn.close()
+        conn = open_index(index_path)
+    if args.update or args.rebuild or index_size(conn) == 0:
+        df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+        start = time.perf_counter()
+        changed = update_index(conn, df)
+        print(f"Indexed {changed} new or changed rows in {time.perf_counter() - start:.2f}s "
+              f"({index_size(conn)} total).")
+
+    if not args.query:
+        return
+
+    start = time.perf_counter()
+    results = search(conn, args.query, args.limit, args.since, args.until, args.offense)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(results)} result(s) for {build_match_query(args.query)!r} in {elapsed_ms:.1f} ms")
+    for _, row in results.iterrows():
+        print(f"{row['Date']}  {row['Complaint #']:10s} {row['Offense']}  @ {row['Location']}")
+        print(f"    {row['Snippet']}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+# offense_taxonomy.py
+
+import re
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+# Bump whenever OFFENSE_TAXONOMY or the matching rules change; saved maps
+# from another version are rebuilt
+TAXONOMY_VERSION = 2
+
+# Category -> offense type -> variants seen in the reports (besides the type
+# itself). Variants are matched after clean_offense, ignoring spaces. A
+# variant is another spelling of its type, never a related offense: related
+# offenses are separate types in the same category, and attempted or
+# aggravated forms are types of their own (OffenseMatcher enforces this).
+OFFENSE_TAXONOMY = {
+    "Violent": {
+        "BATTERY": ["BATTERY AND ASSAULT", "BATTERY AND DISORDERLY CONDUCT"],
+        "DOMESTIC BATTERY": [],
+        "AGGRAVATED BATTERY": ["AGGRAVATED BATTERY TO POLICE OFFICER", "AGGRAVATED BATTERY TO A PEACE OFFICER",
+                               "AGGRAVATED BATTERY DEADLY WEAPON"],
+        "AGGRAVATED BATTERY WITH A FIREARM": ["AGGRAVATED BATTERY FIREARM"],
+        "AGGRAVATED DOMESTIC BATTERY": [],
+        "ASSAULT": [],
+        "AGGRAVATED ASSAULT": ["AGG ASSAULT"],
+        "ROBBERY": ["STRONG ARMED ROBBERY"],
+        "ARMED ROBBERY": [],
+        "AGGRAVATED ROBBERY": [],
+        "ATTEMPT ROBBERY": [],
+        "ATTEMPT ARMED ROBBERY": ["ATTEMPTED ARMED ROBBERY"],
+        "ATTEMPT AGGRAVATED ROBBERY": [],
+        "VEHICULAR HIJACKING": [],
+        "AGGRAVATED VEHICULAR HIJACKING": ["AGGRAVATED VEHICULAR HIGHJACKING"],
+        "ATTEMPT VEHICULAR HIJACKING": [],
+        "ATTEMPT AGGRAVATED VEHICULAR HIJACKING": [],
+        "VEHICULAR INVASION": [],
+        "HOME INVASION": [],
+        "HOMICIDE": ["FIRST DEGREE MURDER"],
+        "RECKLESS HOMICIDE": [],
+        "ATTEMPT MURDER": ["ATTEMPTED MURDER", "ATTEMPT FIRST DEGREE MURDER"],
+        "CRIMINAL SEXUAL ASSAULT": [],
+        "AGGRAVATED CRIMINAL SEXUAL ASSAULT": [],
+        "CRIMINAL SEXUAL ABUSE": [],
+        "AGGRAVATED CRIMINAL SEXUAL ABUSE": [],
+        "KIDNAPPING": [],
+        "AGGRAVATED KIDNAPPING": [],
+        "CHILD ABDUCTION": [],
+    },
+    "Vehicle": {
+        "MOTOR VEHICLE THEFT": ["THEFT OF MOTOR VEHICLE", "STOLEN MOTOR VEHICLE", "MOTOR VEHICLE THEFT AND RECOVERY",
+                                "MOTOR VEHICLE THEFT AND RECOVERED", "MOTOR VEHICLE THEFT RECOVERY",
+                                "THEFT OF MOTOR VEHICLE AND RECOVERY"],
+        "ATTEMPT MOTOR VEHICLE THEFT": ["ATTEMPT THEFT OF MOTOR VEHICLE", "ATTEMPTED MOTOR VEHICLE THEFT",
+                                        "ATT MOTOR VEHICLE THEFT", "MOTOR VEHICLE THEFT ATTEMPT",
+                                        "ATTEMPT THEFT OF AUTO"],
+        "RECOVERED STOLEN MOTOR VEHICLE": ["RECOVERED STOLEN AUTO", "RECOVERED STOLEN VEHICLE",
+                                           "RECOVER STOLEN MOTOR VEHICLE", "RECOVERED STOLEN MOTOR VEHICLE THEFT"],
+        "POSSESSION OF STOLEN MOTOR VEHICLE": ["POSSESSION OF A STOLEN MOTOR VEHICLE", "PSMV"],
+        "ATTEMPT POSSESSION OF STOLEN MOTOR VEHICLE": ["ATT PSMV"],
+        "AGGRAVATED POSSESSION OF STOLEN MOTOR VEHICLE": ["AGGRAVATED POSSESSION OF A STOLEN VEHICLE"],
+        "BURGLARY TO MOTOR VEHICLE": ["BURGLARY MOTOR VEHICLE", "BURGLARY FROM MOTOR VEHICLE", "BURGLARY TO AUTO",
+                                      "BURGLARY FROM AUTO"],
+        "ATTEMPT BURGLARY TO MOTOR VEHICLE": ["ATTEMPT BURGLARY MOTOR VEHICLE"],
+        "THEFT FROM MOTOR VEHICLE": ["THEFT FROM AUTO"],
+        "ATTEMPT THEFT FROM MOTOR VEHICLE": ["ATTEMPT THEFT FROM AUTO"],
+        "THEFT OF MOTOR VEHICLE PARTS": ["THEFT OF MOTOR VEHICLE PART", "THEFT OF MOTOR VEHICLE PARTS OR ACCESSORIES",
+                                         "THEFT OF MOTOR VEHICLE PARTS AND ACCESSORIES",
+                                         "THEFT OF MOTOR VEHICLE PART OR ACCESSORIES", "THEFT OF A MOTOR VEHICLE PART",
+                                         "THEFT OF MOTOR PARTS OR ACCESSORIES", "THEFT OF MV PARTS",
+                                         "THEFT FROM MV PARTS", "THEFT FROM MOTOR VEHICLE PARTS AND ACCESSORIES"],
+        "ATTEMPT THEFT OF MOTOR VEHICLE PARTS": [],
+        "THEFT OF LICENSE PLATE": [],
+        "CRIMINAL DAMAGE TO VEHICLE": ["CRIMINAL DAMAGE TO MOTOR VEHICLE", "CRIMINAL DAMAGE TO AUTO"],
+        "CRIMINAL TRESPASS TO VEHICLE": ["CRIMINAL TRESPASS TO MOTOR VEHICLE", "CRIMINAL TRESPASS TO VEHICLES",
+                                         "CRIMINAL TRESPASS TO MV"],
+    },
+    "Property": {
+        "THEFT": ["THEFT UNDER", "THEFT OVER", "THEFT UNDER $500", "THEFT OVER $500", "THEFT OVER $500 00",
+                  "THEFT 3X", "THEFT OF MERCHANDISE", "THEFT BY POSSESSION"],
+        "ATTEMPT THEFT": [],
+        "RETAIL THEFT": ["RETAIL THEFT 2 CTS"],
+        "ATTEMPT RETAIL THEFT": [],
+        "THEFT FROM PERSON": [],
+        "ATTEMPT THEFT FROM PERSON": [],
+        "BICYCLE THEFT": ["BIKE THEFT", "THEFT OF BICYCLE", "THEFT OF BICYCLES"],
+        "THEFT OF SERVICES": ["THEFT OF SERVICE", "THEFT OF LABOR", "THEFT OF LABOR OR SERVICE"],
+        "ATTEMPT THEFT OF SERVICES": [],
+        "THEFT OF LOST PROPERTY": ["THEFT OF LOST OR MISLAID PROPERTY", "THEFT OF MISLAID PROPERTY",
+                                   "THEFT MISLAID PROPERTY", "POSS OF LOST"],
+        "IDENTITY THEFT": [],
+        "DECEPTIVE PRACTICE": [],
+        "FORGERY": [],
+        "UNLAWFUL USE OF CREDIT CARD": [],
+        "BURGLARY": ["BURGLARY BUILDING", "BURGLARY TO BUSINESS", "BURLGARY"],
+        "ATTEMPT BURGLARY": ["BURGLARY ATTEMPT"],
+        "BURGLARY TO GARAGE": [],
+        "ATTEMPT BURGLARY TO GARAGE": [],
+        "RESIDENTIAL BURGLARY": ["BURGLARY TO RESIDENCE", "RESIDENTIAL BURGLARY AND THEFT",
+                                 "RESIDENTIAL BURGLARY AND BURGLARY"],
+        "ATTEMPT RESIDENTIAL BURGLARY": ["RESIDENTIAL BURGLARY ATTEMPT", "ATTEMPTED RESIDENTIAL BURGLARY"],
+        "CRIMINAL DAMAGE TO PROPERTY": ["CRIMINAL DAMAGE", "DAMAGE TO PROPERTY", "FELONY CRIMINAL DAMAGE TO PROPERTY"],
+        "ATTEMPT CRIMINAL DAMAGE TO PROPERTY": [],
+        "CRIMINAL DAMAGE TO GOVERNMENT PROPERTY": ["CRIMINAL DAMAGE TO GOVERNMENT SUPPORTED PROPERTY",
+                                                  "CRIMINAL DAMAGE TO GOV PROPERTY", "DAMAGE TO VILLAGE PROPERTY"],
+        "CRIMINAL DEFACEMENT": ["CRIMINAL DEFACEMENT OF PROPERTY", "CRIMINAL DEFACEMENT TO PROPERTY", "GRAFFITI"],
+        "CRIMINAL TRESPASS TO PROPERTY": ["CRIMINAL TRESPASS TO REAL PROPERTY", "CRIMINAL TRESPASS",
+                                          "CRIMINAL TRESPASS TO LAND", "CRIMINAL TRESPASS TO STATE SUPPORTED LAND",
+                                          "CRIMINAL TRESPASS TO RAILROAD PROPERTY"],
+        "CRIMINAL TRESPASS TO RESIDENCE": [],
+        "ATTEMPT CRIMINAL TRESPASS TO RESIDENCE": ["ATTEMPTED CRIMINAL TRESPASS TO RESIDENCE"],
+        "POSSESSION OF STOLEN PROPERTY": [],
+        "RECOVERED PROPERTY": [],
+        "ARSON": [],
+        "AGGRAVATED ARSON": [],
+        "ATTEMPT ARSON": [],
+    },
+    "Weapons": {
+        "UNLAWFUL USE OF A WEAPON": ["UUW", "UNLAWFUL USE OF WEAPON", "UNLAWFUL POSSESSION OF A WEAPON",
+                                     "UNLAWFUL USE OR POSS OF WEAPON", "POSSESSION OF CONCEALED FIREARM"],
+        "AGGRAVATED UNLAWFUL USE OF A WEAPON": ["AGGRAVATED UUW", "AGG UUW", "AGG UUW BY FELON",
+                                                "AGGRAVATED UNLAWFUL USE OF WEAPON"],
+        "POSSESSION OF A FIREARM WITHOUT FOID": ["FOID REQUIRED AQUIRE OR POSSESS"],
+        "ARMED HABITUAL CRIMINAL": [],
+        "RECKLESS DISCHARGE OF A FIREARM": ["RECKLESS DISCHARGE OF FIREARM"],
+        "AGGRAVATED DISCHARGE OF A FIREARM": [],
+    },
+    "Drugs": {
+        "POSSESSION OF CONTROLLED SUBSTANCE": ["PCS", "POSSESSION OF A CONTROLLED SUBSTANCE",
+                                               "UNLAWFUL POSS OF A CONTROLLED SUBSTANCE", "POSS OF CONTROL SUBSTANCE"],
+        "ATTEMPT POSSESSION OF CONTROLLED SUBSTANCE": [],
+        "UNLAWFUL POSSESSION OF PRESCRIPTION FORM": [],
+        "POSSESSION WITH INTENT TO DELIVER": ["POSSESSION WITH THE INTENT TO DELIVER",
+                                              "POSSESSION OF A CONTROLLED SUBSTANCE WITH INTENT TO DELIVER"],
+        "MANUFACTURE OR DELIVERY OF CONTROLLED SUBSTANCE": ["MANUFACTURE", "MANUFACTURING"],
+        "POSSESSION OF CANNABIS": ["UNLAWFUL POSSESSION OF CANNABIS", "CANNABIS POSSESSION", "POSS OF CANNABIS IN MV"],
+        "POSSESSION OF DRUG PARAPHERNALIA": ["POSS OF DRUG PARAPHERNALIA"],
+    },
+    "Traffic": {
+        "DUI": ["DRIVING UNDER THE INFLUENCE", "DRIVING WHILE UNDER THE INFLUENCE DUI",
+                "DRIVING UNDER THE INFLUENCE DUI", "DUI AND OBSTRUCTING"],
+        "AGGRAVATED DUI": ["AGGRAVATED DRIVING UNDER THE INFLUENCE", "AGGRAVATED DRIVING WHILE UNDER THE INFLUENCE"],
+        "TRAFFIC": [],
+        "DRIVING WHILE LICENSE SUSPENDED": ["DWLS", "DRIVING WHILE LICENSE REVOKED"],
+        "AGGRAVATED DRIVING WHILE LICENSE REVOKED": ["AGGRAVATED DWLR", "AGG DRIVING WHILE LICENSE REVOKED"],
+        "NO VALID DRIVER S LICENSE": [],
+        "LEAVING THE SCENE OF AN ACCIDENT": ["LEAVING THE SCENE OF ACCIDENT", "LEAVING SCENE PROPERTY DAMAGE ACCIDENT",
+                                             "LEAVING THE SCENE PERSONAL INJURY ACCIDENT"],
+        "FLEEING AND ELUDING": ["FLEEING", "FLEEING AND ELUDING A PEACE OFFICER"],
+        "AGGRAVATED FLEEING AND ELUDING": ["AGGRAVATED FLEEING AND ELUDING POLICE", "AGG FLEEING"],
+        "RECKLESS DRIVING": [],
+        "AGGRAVATED RECKLESS DRIVING": ["AGG RECKLESS DRIVING"],
+    },
+    "Public Order": {
+        "DISORDERLY CONDUCT": [],
+        "VIOLATION OF ORDER OF PROTECTION": ["VIOLATION OF AN ORDER OF PROTECTION", "VIOLATION ORDER OF PROTECTION",
+                                             "VIOLATIONS OF ORDER PROTECTION", "VOOP"],
+        "HARASSMENT": ["HARASSMENT THROUGH ELECTRONIC COMMUNICATION", "HARASSMENT VIA ELECTRONIC COMMUNICATIONS"],
+        "TRANSMISSION OF OBSCENE MESSAGES": [],
+        "STALKING": ["VIOLATION STALKING"],
+        "PUBLIC INDECENCY": [],
+        "MOB ACTION": [],
+        "RESISTING A PEACE OFFICER": ["RESISTING PEACE OFFICER", "RESISTING"],
+        "OBSTRUCTING IDENTIFICATION": [],
+        "OBSTRUCTION": ["OBSTRUCTION POSSESSION OF CANNABIS AND WARRANT"],
+        "SOLICITING ON ROADWAY": ["SOLICITING ON THE ROADWAY", "SOLICITING IN THE ROADWAY", "SOLICITATION"],
+        "PROSTITUTION": [],
+        "RECKLESS CONDUCT": [],
+        "CHILD ENDANGERMENT": ["ENDANGERING THE LIFE"],
+        "CHILD ENDANGERMENT DEATH": [],
+        "AGGRAVATED CRUELTY TO ANIMAL": [],
+        "SEX OFFENDER FAILURE TO REGISTER": ["FAILURE TO REGISTER", "FAILURE TO REGISTER AS SEX OFFENDER",
+                                             "FAILURE TO REGISTER AS A SEX OFFENDER"],
+        "CONTRIBUTING TO THE DELINQUENCY OF A MINOR": ["CONTRIBUTING TO THE DELINQ OF A MINOR"],
+        "HARBORING A RUNAWAY": [],
+        "GROOMING": [],
+        "SEXUAL EXPLOITATION OF A CHILD": [],
+        "CURFEW VIOLATION": [],
+        "FALSE POLICE REPORT": [],
+        "IMPERSONATING A POLICE OFFICER": [],
+        "CONTEMPT OF COURT": [],
+    },
+    "Warrant": {
+        "WARRANT": ["OUTSIDE WARRANT", "OAK PARK WARRANT", "INSIDE WARRANT", "WARRANT OUTSIDE",
+                    "WARRANT 2 COUNTS", "BFW"],
+        "FUGITIVE FROM JUSTICE": [],
+    },
+    "Other": {
+        "MISSING PERSON": ["MISSING ADULT", "MISSING JUVENILE", "MISSING ADULT LOCATED"],
+        "DEATH INVESTIGATION": [],
+        "STRUCTURE FIRE": [],
+    },
+}
+UNKNOWN_TYPE = "UNKNOWN"
+OTHER_CATEGORY = "Other"
+
+# Minimum trigram similarity (Dice) for a fuzzy match to a known variant
+DEFAULT_MIN_SIMILARITY = 0.7
+
+# Text the extractor sometimes runs on past the offense ("... DATE (S): 16-AUG-23 ...")
+TRAILING_FIELDS_RE = re.compile(r"\s+DAT\s?E\s*\(?\s*S\s*\).*$", re.IGNORECASE | re.DOTALL)
+ABBREVIATION_DOT_RE = re.compile(r"(?<=\b[A-Z])\.")
+# Slashed abbreviations that are not offense separators
+SLASH_ABBREVIATIONS = [(re.compile(r"\bM/V\b"), "MV"), (re.compile(r"\bW/O\b"), "WITHOUT"),
+                       (re.compile(r"\bW/"), "WITH ")]
+NON_WORD_RE = re.compile(r"[^A-Z0-9$/&,() ]+")
+# "ARREST", also when the PDF split it ("A RREST", "ARRES T")
+ARREST_RE = re.compile(r"\bA\s?R\s?R+\s?E\s?S\s?T\s?S?\b")
+# Separators between several offenses in one entry ("RETAIL THEFT / WARRANT")
+COMPOUND_RE = re.compile(r"\s*(?:[/&,()]|\bAND\b)\s*")
+COMPACT_RE = re.compile(r"[\s/&,()]+")
+# Qualifiers that make a different offense ("ATTEMPT THEFT" is not "THEFT"),
+# matched on compact keys: "ATT PSMV", "ATT EMPT", "AGG RAVATED", "AGG UUW"
+QUALIFIER_RES = {
+    "ATTEMPT": re.compile(r"^ATT|ATTEMPT"),
+    "AGGRAVATED": re.compile(r"^AGG|AGGRAVATED"),
+}
+
+
+def clean_offense(offense):
+    """
+    Uppercase an offense and drop run-on text, punctuation and ARREST.
+
+    Args:
+        offense (str): Offense text from a report.
+
+    Returns:
+        tuple: (cleaned text, arrest flag)
+    """
+    text = TRAILING_FIELDS_RE.sub("", str(offense)).upper()
+    text = ABBREVIATION_DOT_RE.sub("", text)
+    for pattern, replacement in SLASH_ABBREVIATIONS:
+        text = pattern.sub(replacement, text)
+    text = NON_WORD_RE.sub(" ", text.replace("–", " ").replace("-", " "))
+    arrest = bool(ARREST_RE.search(text))
+    text = ARREST_RE.sub(" ", text)
+    # Drop separators left dangling by the removed words
+    text = " ".join(text.split()).strip(" /&,")
+    return text, arrest
+
+
+def compact(text):
+    """
+    Matching key: the text without spaces or separators, so split words
+    ("MOT OR") match.
+    """
+    return COMPACT_RE.sub("", text)
+
+
+def qualifiers(key):
+    """
+    ATTEMPT / AGGRAVATED qualifiers present in a matching key.
+    """
+    return frozenset(name for name, pattern in QUALIFIER_RES.items() if pattern.search(key))
+
+
+def trigrams(key):
+    """
+    Character trigrams of a padded matching key.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class OffenseMatcher:
+    """
+    Maps offense text to an offense type and category.
+
+    Known variants match exactly on their compact key; anything else is
+    looked up in a trigram index over the variants and takes the most
+    similar one with the same ATTEMPT / AGGRAVATED qualifiers if it clears
+    min_similarity. Entries listing several offenses are typed by their
+    first one.
+
+    Raises:
+        ValueError: If a variant's qualifiers differ from its type's.
+    """
+
+    def __init__(self, taxonomy=OFFENSE_TAXONOMY, min_similarity=DEFAULT_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self.categories = {}
+        self.variants = {}
+        for category, types in taxonomy.items():
+            for offense_type, aliases in types.items():
+                self.categories[offense_type] = category
+                type_qualifiers = qualifiers(compact(clean_offense(offense_type)[0]))
+                for variant in [offense_type, *aliases]:
+                    key = compact(clean_offense(variant)[0])
+                    if qualifiers(key) != type_qualifiers:
+                        raise ValueError(f"Variant '{variant}' of '{offense_type}' differs in ATTEMPT/AGGRAVATED.")
+                    self.variants[key] = offense_type
+        self.keys = list(self.variants)
+        self.key_qualifiers = [qualifiers(k) for k in self.keys]
+        self.key_trigrams = [trigrams(k) for k in self.keys]
+        self.index = defaultdict(list)
+        for i, grams in enumerate(self.key_trigrams):
+            for gram in grams:
+                self.index[gram].append(i)
+
+    def fuzzy(self, key):
+        """
+        Most similar known variant with the same qualifiers, by trigram
+        Dice coefficient.
+
+        Returns:
+            tuple: (offense type or None, similarity)
+        """
+        grams = trigrams(key)
+        key_qualifiers = qualifiers(key)
+        shared = Counter(i for gram in grams for i in self.index.get(gram, ()))
+        best_type, best_score = None, 0.0
+        for i, count in shared.items():
+            if self.key_qualifiers[i] != key_qualifiers:
+                continue
+            score = 2 * count / (len(grams) + len(self.key_trigrams[i]))
+            if score > best_score:
+                best_type, best_score = self.variants[self.keys[i]], score
+        return best_type, best_score
+
+    def match(self, offense):
+        """
+        Offense type for one offense text.
+
+        Returns:
+            tuple: (offense type, arrest flag, similarity; 1.0 for exact)
+        """
+        if not isinstance(offense, str) or not offense.strip():
+            return UNKNOWN_TYPE, False, 0.0
+        text, arrest = clean_offense(offense)
+        first = next((part for part in COMPOUND_RE.split(text) if part), "")
+        for candidate in (text, first):
+            offense_type = self.variants.get(compact(candidate))
+            if offense_type:
+                return offense_type, arrest, 1.0
+        offense_type, score = max(
+            (self.fuzzy(compact(candidate)) for candidate in {text, first} if candidate),
+            key=lambda result: result[1],
+            default=(None, 0.0)
+        )
+        if offense_type and score >= self.min_similarity:
+            return offense_type, arrest, score
+        # Unmatched offenses keep their own (cleaned) name
+        return first or text or UNKNOWN_TYPE, arrest, score
+
+    def category(self, offense_type):
+        return self.categories.get(offense_type, OTHER_CATEGORY)
+
+
+def load_offense_map(map_path):
+    """
+    Load the saved offense -> type map (empty if missing, unreadable or
+    built with another TAXONOMY_VERSION).
+
+    Args:
+        map_path (Path): Path to offense_map.json.
+
+    Returns:
+        dict: {offense text: [offense type, arrest flag]}
+    """
+    from utils import load_json_cache
+
+    saved = load_json_cache(map_path)
+    if saved.get("version") != TAXONOMY_VERSION:
+        if saved:
+            logging.info(f"Offense map '{map_path}' is from another taxonomy version; rebuilding.")
+        return {}
+    return saved.get("offenses", {})
+
+
+def save_offense_map(map_path, offense_map):
+    """
+    Save the offense -> type map with the taxonomy version it was built with.
+    """
+    from utils import save_json_cache
+
+    save_json_cache(map_path, {
+        "version": TAXONOMY_VERSION,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "offenses": dict(sorted(offense_map.items())),
+    })
+
+
+def update_offense_map(offense_map, offenses, matcher=None):
+    """
+    Type any offense texts not in the map yet (in place).
+
+    Returns:
+        int: Number of offense texts added.
+    """
+    new = [o for o in pd.unique(pd.Series(offenses).dropna()) if o not in offense_map]
+    if not new:
+        return 0
+    matcher = matcher or OffenseMatcher()
+    for offense in new:
+        offense_type, arrest, _ = matcher.match(offense)
+        offense_map[offense] = [offense_type, arrest]
+    return len(new)
+
+
+def update_offense_map_file(map_path, offenses):
+    """
+    Load the saved map, type new offense texts, and save it if any were added.
+
+    Returns:
+        int: Number of offense texts added.
+    """
+    offense_map = load_offense_map(map_path)
+    added = update_offense_map(offense_map, offenses)
+    if added:
+        save_offense_map(map_path, offense_map)
+    return added
+
+
+def add_offense_columns(df, offense_map=None):
+    """
+    Add categorical 'Offense Type' and 'Offense Category' columns and an
+    'Arrest' flag, typing each distinct offense text once.
+
+    Both columns are pandas Categoricals, so filters and groupbys on them
+    compare integer codes. Their categories are every type/category in the
+    taxonomy (plus any unmatched names), keeping codes stable across data
+    subsets.
+
+    Args:
+        df (DataFrame): Rows with an 'Offense' column.
+        offense_map (dict): Saved map from load_offense_map (optional;
+            offenses missing from it are typed on the fly).
+
+    Returns:
+        DataFrame: df with the three columns added (modified in place).
+    """
+    offense_map = dict(offense_map or {})
+    matcher = OffenseMatcher()
+    update_offense_map(offense_map, df["Offense"], matcher)
+
+    codes, uniques = pd.factorize(df["Offense"])
+    typed = [offense_map[o] for o in uniques]
+    unique_types = [t for t, _ in typed]
+    unique_arrests = [bool(a) for _, a in typed]
+
+    types = list(matcher.categories)
+    types += sorted(set(unique_types) - set(types) - {UNKNOWN_TYPE}) + [UNKNOWN_TYPE]
+    categories = list(OFFENSE_TAXONOMY)
+    type_codes = pd.Categorical(unique_types, categories=types).codes
+    category_codes = pd.Categorical(
+        [matcher.category(t) for t in unique_types], categories=categories
+    ).codes
+
+    missing = codes < 0
+    row_types = type_codes[codes]
+    row_types[missing] = types.index(UNKNOWN_TYPE)
+    row_categories = category_codes[codes]
+    row_categories[missing] = categories.index(OTHER_CATEGORY)
+    arrests = pd.array(unique_arrests, dtype=bool)[codes] if len(uniques) else []
+
+    df["Offense Type"] = pd.Categorical.from_codes(row_types, categories=types)
+    df["Offense Category"] = pd.Categorical.from_codes(row_categories, categories=categories)
+    df["Arrest"] = pd.Series(arrests, index=df.index, dtype=bool) & ~missing
+    return df
+
+
+def main():
+    from utils import load_csv_data
+
+    parser = argparse.ArgumentParser(description="Normalize offenses to the offense taxonomy.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-type every offense (ignore the saved map).")
+    parser.add_argument("--unmatched", type=int, default=20,
+                        help="Print this many offense texts that matched no known type.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    map_path = script_dir / 'cache' / 'offense_map.json'
+    df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+
+    if args.rebuild:
+        Path(map_path).unlink(missing_ok=True)
+    start = time.perf_counter()
+    added = update_offense_map_file(map_path, df["Offense"])
+    print(f"Typed {added} new offense text(s) in {time.perf_counter() - start:.2f}s.")
+
+    start = time.perf_counter()
+    add_offense_columns(df, load_offense_map(map_path))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{df['Offense'].nunique()} offense texts -> {df['Offense Type'].nunique()} types "
+          f"in {df['Offense Category'].nunique()} categories ({elapsed_ms:.1f} ms).")
+    print(df["Offense Category"].value_counts().to_string())
+
+    known = set(OffenseMatcher().categories)
+    unmatched = df.loc[~df["Offense Type"].isin(known), "Offense"].value_counts()
+    if len(unmatched):
+        print(f"{len(unmatched)} offense text(s) matched no known type:")
+        print(unmatched.head(args.unmatched).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# pipeline_metrics.py
+
+import json
+import time
+import logging
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from collections import defaultdict
+
+# Module-level registries for the current run (reset with reset_metrics)
+counters = defaultdict(int)
+timers = defaultdict(lambda: {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+pdf_durations = []
+
+
+def reset_metrics():
+    """
+    Clear all counters, timers and per-PDF durations.
+    """
+    counters.clear()
+    timers.clear()
+    pdf_durations.clear()
+
+
+def increment(name, amount=1):
+    """
+    Increment a named counter.
+
+    Args:
+        name (str): Counter name (e.g., 'geocode_cache_hits').
+        amount (int): Amount to add.
+    """
+    counters[name] += amount
+
+
+def add_timing(stage, seconds):
+    """
+    Add one measured duration to a stage timer.
+
+    Args:
+        stage (str): Stage name (e.g., 'pdf_text_extraction').
+        seconds (float): Elapsed wall time.
+    """
+    timer = timers[stage]
+    timer["count"] += 1
+    timer["total_sec"] += seconds
+    if seconds > timer["max_sec"]:
+        timer["max_sec"] = seconds
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Time the enclosed block and add it to the stage timer.
+
+    Args:
+        stage (str): Stage name.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(stage, time.perf_counter() - start)
+
+
+def record_pdf_duration(filename, seconds, complaints):
+    """
+    Record the end-to-end processing time of one PDF.
+
+    Args:
+        filename (str): PDF file name.
+        seconds (float): Processing time.
+        complaints (int): Number of complaints extracted.
+    """
+    pdf_durations.append({"file": filename, "sec": round(seconds, 4), "complaints": complaints})
+
+
+def metrics_snapshot():
+    """
+    Return the current metrics as a JSON-serializable dict.
+
+    Returns:
+        dict: {'stages': {...}, 'counters': {...}, 'pdfs': [...]}
+    """
+    stages = {}
+    for stage, timer in timers.items():
+        stages[stage] = {
+            "count": timer["count"],
+            "total_sec": round(timer["total_sec"], 4),
+            "mean_ms": round(1000 * timer["total_sec"] / timer["count"], 3) if timer["count"] else 0.0,
+            "max_ms": round(1000 * timer["max_sec"], 3),
+        }
+    return {"stages": stages, "counters": dict(counters), "pdfs": list(pdf_durations)}
+
+
+def merge_metrics(snapshot):
+    """
+    Add counters and stage timings from another process's metrics_snapshot.
+
+    Args:
+        snapshot (dict): Result of metrics_snapshot() in a worker.
+    """
+    for name, amount in snapshot.get("counters", {}).items():
+        counters[name] += amount
+    for stage, stats in snapshot.get("stages", {}).items():
+        timer = timers[stage]
+        timer["count"] += stats["count"]
+        timer["total_sec"] += stats["total_sec"]
+        timer["max_sec"] = max(timer["max_sec"], stats["max_ms"] / 1000)
+
+
+def write_run_record(record_path, **fields):
+    """
+    Append one JSON-lines run record with the current metrics.
+
+    Args:
+        record_path (str or Path): Path to the .jsonl file.
+        **fields: Extra top-level fields (start/end time, totals...).
+
+    Returns:
+        bool: True if the record was written.
+    """
+    record = {"recorded_at": datetime.now().isoformat(timespec="seconds"), **fields, **metrics_snapshot()}
+    try:
+        with Path(record_path).open('a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        return True
+    except OSError as e:
+        logging.error(f"Failed to write run record to '{record_path}': {e}")
+        return False
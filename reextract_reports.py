@@ -0,0 +1,198 @@
+# reextract_reports.py
+
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from utils import (
+    LOCATION_KEY_VERSION,
+    extract_data_from_pdf,
+    load_csv_data,
+    load_json_cache,
+    save_zip,
+    backfill_coordinates
+)
+from text_repair import load_merge_table, set_narrative_merges
+from migrate_location_cache import location_cache_meta_path, migrate_location_cache
+
+# Fields that identify which complaint a row was read from; a row whose
+# values here belong to the complaint printed next to it in the PDF took
+# them from that neighbour (pre-streaming extractor)
+ALIGNMENT_FIELDS = ["Date", "Offense", "Time", "Location"]
+
+
+def pdf_name(file_name):
+    """
+    Base PDF name from a 'File Name' value (a URL or a bare file name).
+    """
+    return str(file_name).rsplit("/", 1)[-1]
+
+
+def squash(value):
+    """
+    Field value with whitespace removed (PDF text differs in mid-word spaces).
+    The extractor's "N/A" reads back from the CSV as NaN, so both are empty.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value == "N/A":
+        return ""
+    return "".join(str(value).split())
+
+
+def extract_pdf_rows(pdf_path, location_cache):
+    """
+    Extract every complaint from one PDF without calling the geocoding API.
+
+    Returns:
+        dict: {complaint #: row}, first occurrence of each complaint, in
+        the order the PDF lists them.
+    """
+    report, _ = extract_data_from_pdf(pdf_path, None, location_cache, False, set(), pdf_path.name)
+    rows = {}
+    for row in report:
+        rows.setdefault(str(row["Complaint #"]), row)
+    return rows
+
+
+def shifted_from_neighbour(old_row, fresh, complaint, fields):
+    """
+    Whether a dataset row's differing fields all come from the complaint
+    just before or after it in a fresh extraction of the same PDF.
+
+    Args:
+        old_row (Series): Dataset row.
+        fresh (dict): extract_pdf_rows output for the row's PDF.
+        complaint (str): The row's complaint number.
+        fields (list of str): ALIGNMENT_FIELDS that differ from the fresh row.
+
+    Returns:
+        bool: True if a neighbour holds every one of the old values.
+    """
+    order = list(fresh)
+    position = order.index(complaint)
+    neighbours = [fresh[order[i]] for i in (position - 1, position + 1) if 0 <= i < len(order)]
+    return any(
+        all(squash(old_row[field]) == squash(neighbour.get(field)) for field in fields)
+        for neighbour in neighbours
+    )
+
+
+def reextract_misaligned(df, pdf_dir, location_cache, pdf_names=None):
+    """
+    Replace dataset rows whose fields belong to a neighbouring complaint.
+
+    Every PDF that owns rows in the dataset (and is downloaded) is extracted
+    again. A row is only replaced when the ALIGNMENT_FIELDS values that
+    differ from the fresh extraction of its complaint are exactly those of
+    the complaint listed before or after it, which proves the shift. Other
+    differences keep the dataset's value, so the dataset stays an independent
+    reference for the extractor. Replaced rows take every extracted field
+    except 'File Name'; coordinates come from the location cache only, and
+    rows left without them are backfilled.
+
+    Args:
+        df (DataFrame): The summary_report dataset.
+        pdf_dir (Path): Directory with downloaded PDFs.
+        location_cache (dict): Location cache used for coordinates.
+        pdf_names (iterable of str): Only re-extract these PDFs (default all).
+
+    Returns:
+        tuple: (repaired copy of df, list of (index, {field: (old, new)}) for
+        the replaced rows, the same list for differing rows that were kept,
+        number of PDFs extracted)
+    """
+    df = df.copy()
+    names = df["File Name"].map(pdf_name)
+    wanted = set(names) if pdf_names is None else set(pdf_names) & set(names)
+    changes = []
+    unproven = []
+    extracted = 0
+    for name in sorted(wanted):
+        pdf_path = Path(pdf_dir) / name
+        if not pdf_path.exists():
+            logging.warning(f"PDF '{name}' not downloaded; its rows were not checked.")
+            continue
+        fresh = extract_pdf_rows(pdf_path, location_cache)
+        extracted += 1
+        for index in df.index[names == name]:
+            complaint = str(df.at[index, "Complaint #"])
+            row = fresh.get(complaint)
+            if row is None:
+                continue
+            diff = {
+                field: (df.at[index, field], row.get(field))
+                for field in ALIGNMENT_FIELDS
+                if squash(df.at[index, field]) != squash(row.get(field))
+            }
+            if not diff:
+                continue
+            if not shifted_from_neighbour(df.loc[index], fresh, complaint, list(diff)):
+                unproven.append((index, diff))
+                continue
+            for field, value in row.items():
+                if field != "File Name" and field in df.columns:
+                    df.at[index, field] = np.nan if value is None else value
+            if "Error Reasons" in df.columns and "Error Reasons" not in row:
+                df.at[index, "Error Reasons"] = np.nan
+            changes.append((index, diff))
+
+    if changes and {"Lat", "Long", "Loc"} <= set(df.columns):
+        backfill_coordinates(df, location_cache)
+    return df, changes, unproven, extracted
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-extract dataset rows whose fields were shifted from a neighbouring complaint."
+    )
+    parser.add_argument("--pdf", action="append",
+                        help="Only check this PDF (file name; may be repeated).")
+    parser.add_argument("--show", type=int, default=10,
+                        help="Number of replaced rows to print.")
+    parser.add_argument("--apply", action="store_true",
+                        help="Rewrite data/summary_report.zip with the re-extracted rows.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    cache_dir = script_dir / 'cache'
+    pdf_dir = script_dir / 'downloaded_pdfs'
+    output_csv_path = data_dir / 'summary_report.csv'
+    output_zip_path = data_dir / 'summary_report.zip'
+
+    df = load_csv_data(output_csv_path, output_zip_path)
+    if df.empty:
+        print("No data found.")
+        return
+
+    set_narrative_merges(load_merge_table(cache_dir / 'narrative_merges.json'))
+    location_cache_path = cache_dir / 'location_cache.json'
+    location_cache = load_json_cache(location_cache_path)
+    # Migrate an outdated cache in memory only; ingestion rewrites it on disk
+    meta = load_json_cache(location_cache_meta_path(location_cache_path))
+    if meta.get("normalizer_version", 1) < LOCATION_KEY_VERSION:
+        location_cache, _, _ = migrate_location_cache(location_cache, meta)
+    repaired, changes, unproven, extracted = reextract_misaligned(df, pdf_dir, location_cache, args.pdf)
+    print(f"Checked {extracted} PDFs: {len(changes)} of {len(df)} rows are misaligned; "
+          f"{len(unproven)} more differ from the extractor without a neighbour's values and were kept.")
+    for index, diff in changes[:args.show]:
+        print(f"  {df.at[index, 'Complaint #']} ({pdf_name(df.at[index, 'File Name'])})")
+        for field, (old, new) in diff.items():
+            print(f"    {field}: {old!r} -> {new!r}")
+
+    if not args.apply:
+        print("Run with --apply to rewrite the dataset.")
+        return
+    if not changes:
+        return
+
+    repaired.to_csv(output_csv_path, index=False, encoding="cp1252", errors="replace")
+    save_zip(output_zip_path, output_csv_path, 'summary_report.csv')
+    print(f"Rewrote '{output_zip_path}' with {len(changes)} re-extracted rows.")
+
+
+if __name__ == "__main__":
+    main()
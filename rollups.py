@@ -0,0 +1,332 @@
+# rollups.py
+
+import time
+import zipfile
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils import save_npz
+from complaint_merge import merge_complaints
+from spatial_index import METERS_PER_DEGREE
+
+# Bump when the cell grid or record layout changes; older stores are rebuilt
+ROLLUP_VERSION = 2
+GRANULARITIES = ("day", "week", "month")
+
+# Fixed grid so a cell keeps its id across runs (about 500 m square in Oak Park)
+ROLLUP_CELL_SIZE_M = 500
+ROLLUP_REF_LAT = 41.88
+CELL_LAT = ROLLUP_CELL_SIZE_M / METERS_PER_DEGREE
+CELL_LNG = ROLLUP_CELL_SIZE_M / (METERS_PER_DEGREE * np.cos(np.radians(ROLLUP_REF_LAT)))
+# Cell row/col of incidents without coordinates
+NO_CELL = np.iinfo(np.int32).min
+
+# Columns of one rollup level, all the same length
+LEVEL_FIELDS = ("period", "offense", "cell_row", "cell_col", "count")
+
+
+def empty_rollups():
+    """
+    An empty rollup store.
+
+    Each level holds sparse (period, offense, cell_row, cell_col, count)
+    records: period is the first day of the day/week/month as days since
+    1970-01-01, offense indexes the 'offenses' vocabulary. 'seen' holds the
+    sorted complaint-number hashes already counted.
+    """
+    rollups = {
+        "version": ROLLUP_VERSION,
+        "offenses": np.array([], dtype=object),
+        "seen": np.array([], dtype=np.uint64),
+    }
+    for level in GRANULARITIES:
+        rollups[level] = {field: np.array([], dtype=np.int32) for field in LEVEL_FIELDS}
+    return rollups
+
+
+def load_rollups(rollups_path):
+    """
+    Load the rollup store (empty if missing, unreadable, corrupt or outdated,
+    so the next update recounts the whole dataset).
+
+    Args:
+        rollups_path (Path): Path to rollups.npz.
+
+    Returns:
+        dict: Rollup store (see empty_rollups).
+    """
+    rollups_path = Path(rollups_path)
+    if not rollups_path.exists():
+        return empty_rollups()
+    try:
+        with np.load(rollups_path, allow_pickle=False) as npz:
+            if int(npz["version"]) != ROLLUP_VERSION:
+                logging.info(f"Rollup store '{rollups_path}' is outdated; rebuilding.")
+                return empty_rollups()
+            rollups = {
+                "version": ROLLUP_VERSION,
+                "offenses": npz["offenses"].astype(object),
+                "seen": npz["seen"],
+            }
+            for level in GRANULARITIES:
+                rollups[level] = {field: npz[f"{level}_{field}"] for field in LEVEL_FIELDS}
+        return rollups
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile) as e:
+        logging.error(f"Failed to load rollups '{rollups_path}': {e}; rebuilding from the dataset.")
+        return empty_rollups()
+
+
+def save_rollups(rollups_path, rollups):
+    """
+    Save the rollup store as a compressed .npz, atomically so an
+    interrupted save keeps the previous store.
+    """
+    arrays = {
+        "version": np.array(ROLLUP_VERSION),
+        "offenses": rollups["offenses"].astype(str),
+        "seen": rollups["seen"],
+    }
+    for level in GRANULARITIES:
+        for field in LEVEL_FIELDS:
+            arrays[f"{level}_{field}"] = rollups[level][field]
+    try:
+        save_npz(rollups_path, arrays, compressed=True)
+    except OSError as e:
+        logging.error(f"Failed to save rollups '{rollups_path}': {e}")
+
+
+def complaint_key_hashes(df):
+    """
+    64-bit hash of each row's complaint number.
+    """
+    keys = df["Complaint #"].astype(str)
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(k.encode(), digest_size=8).digest(), "little") for k in keys),
+        dtype=np.uint64,
+        count=len(keys)
+    )
+
+
+def cell_of(lats, lngs):
+    """
+    Rollup grid (row, col) of each coordinate; NO_CELL where missing.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    valid = ~(np.isnan(lats) | np.isnan(lngs))
+    rows = np.full(len(lats), NO_CELL, dtype=np.int32)
+    cols = np.full(len(lats), NO_CELL, dtype=np.int32)
+    rows[valid] = np.floor(lats[valid] / CELL_LAT).astype(np.int32)
+    cols[valid] = np.floor(lngs[valid] / CELL_LNG).astype(np.int32)
+    return rows, cols
+
+
+def cell_center(rows, cols):
+    """
+    Latitude/longitude of the centre of rollup cells (NaN for NO_CELL).
+    """
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+    valid = rows != NO_CELL
+    lats = np.where(valid, (rows + 0.5) * CELL_LAT, np.nan)
+    lngs = np.where(valid, (cols + 0.5) * CELL_LNG, np.nan)
+    return lats, lngs
+
+
+def period_start(days, level):
+    """
+    First day (days since epoch) of the day/week/month containing each day.
+    Weeks start on Monday.
+    """
+    days = np.asarray(days, dtype="datetime64[D]")
+    if level == "day":
+        starts = days
+    elif level == "week":
+        # 1970-01-01 was a Thursday
+        starts = days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    elif level == "month":
+        starts = days.astype("datetime64[M]").astype("datetime64[D]")
+    else:
+        raise ValueError(f"Unknown granularity '{level}'; use one of {', '.join(GRANULARITIES)}.")
+    return starts.astype(np.int64).astype(np.int32)
+
+
+def aggregate(records):
+    """
+    Sum counts of records sharing (period, offense, cell_row, cell_col).
+    """
+    if len(records["count"]) == 0:
+        return records
+    keys = np.stack([records[f] for f in LEVEL_FIELDS[:-1]], axis=1)
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=records["count"], minlength=len(unique))
+    aggregated = {f: unique[:, i].astype(np.int32) for i, f in enumerate(LEVEL_FIELDS[:-1])}
+    aggregated["count"] = counts.astype(np.int32)
+    return aggregated
+
+
+def update_rollups(rollups, df):
+    """
+    Count complaints not yet in the store into every level.
+
+    An incident listed in several reports (e.g. a daily and a weekend
+    summary) is counted once: rows are first merged to one canonical row
+    per complaint (see merge_complaints) and identified by a hash of the
+    complaint number. Complaints without a valid date are left out (and
+    retried next time). A complaint that gains coordinates later (backfill
+    or a later report) keeps its original cell until a rebuild.
+
+    Args:
+        rollups (dict): Rollup store (updated in place).
+        df (DataFrame): Dataset rows.
+
+    Returns:
+        int: Number of newly counted complaints.
+    """
+    df = merge_complaints(df)
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    valid = dates.notna() & (dates != pd.Timestamp("1900-01-01"))
+    df, dates = df[valid], dates[valid]
+    if df.empty:
+        return 0
+
+    hashes = complaint_key_hashes(df)
+    hashes, first = np.unique(hashes, return_index=True)
+    new = ~np.isin(hashes, rollups["seen"])
+    if not new.any():
+        return 0
+    positions = first[new]
+    new_df = df.iloc[positions]
+    days = dates.iloc[positions].to_numpy(dtype="datetime64[D]")
+
+    offenses = new_df["Offense"].fillna("N/A").astype(str).str.strip().to_numpy()
+    vocab = {name: i for i, name in enumerate(rollups["offenses"])}
+    for name in offenses:
+        if name not in vocab:
+            vocab[name] = len(vocab)
+    rollups["offenses"] = np.array(list(vocab), dtype=object)
+    offense_ids = np.array([vocab[name] for name in offenses], dtype=np.int32)
+    cell_rows, cell_cols = cell_of(new_df["Lat"], new_df["Long"])
+
+    for level in GRANULARITIES:
+        additions = {
+            "period": period_start(days, level),
+            "offense": offense_ids,
+            "cell_row": cell_rows,
+            "cell_col": cell_cols,
+            "count": np.ones(len(positions), dtype=np.int32),
+        }
+        current = rollups[level]
+        combined = {f: np.concatenate([current[f], additions[f]]) for f in LEVEL_FIELDS}
+        rollups[level] = aggregate(combined)
+
+    rollups["seen"] = np.union1d(rollups["seen"], hashes[new])
+    return int(new.sum())
+
+
+def update_rollup_store(rollups_path, df):
+    """
+    Load the store, count new complaints, and save it if anything changed.
+
+    Returns:
+        int: Number of newly counted complaints.
+    """
+    rollups = load_rollups(rollups_path)
+    added = update_rollups(rollups, df)
+    if added:
+        save_rollups(rollups_path, rollups)
+    return added
+
+
+def query_counts(rollups, level="week", start_date=None, end_date=None, offenses=None,
+                 bbox=None, by=("period",)):
+    """
+    Incident counts from the store, grouped by any of period/offense/cell.
+
+    Args:
+        rollups (dict): Rollup store.
+        level (str): 'day', 'week' or 'month'.
+        start_date (str or date): Keep periods starting on or after this date.
+        end_date (str or date): Keep periods starting on or before this date.
+        offenses (list of str): Restrict to these offenses.
+        bbox (tuple): (south, west, north, east); keeps cells whose centre is inside.
+        by (tuple of str): Grouping columns among 'period', 'offense', 'cell'.
+
+    Returns:
+        DataFrame: One row per group with a Count column ('Period' as
+        datetime, 'Offense', and 'Cell Lat'/'Cell Long' for cells).
+    """
+    records = rollups[level]
+    mask = np.ones(len(records["count"]), dtype=bool)
+    if start_date is not None:
+        mask &= records["period"] >= period_start([np.datetime64(pd.Timestamp(start_date).date())], level)[0]
+    if end_date is not None:
+        mask &= records["period"] <= np.datetime64(pd.Timestamp(end_date).date(), "D").astype(np.int64)
+    if offenses:
+        wanted = np.flatnonzero(np.isin(rollups["offenses"].astype(str), list(offenses)))
+        mask &= np.isin(records["offense"], wanted)
+    if bbox is not None:
+        south, west, north, east = bbox
+        lats, lngs = cell_center(records["cell_row"], records["cell_col"])
+        mask &= (lats >= south) & (lats <= north) & (lngs >= west) & (lngs <= east)
+
+    selected = pd.DataFrame({f: records[f][mask] for f in LEVEL_FIELDS})
+    columns = []
+    if "period" in by:
+        selected["Period"] = selected["period"].to_numpy().astype("datetime64[D]").astype("datetime64[ns]")
+        columns.append("Period")
+    if "offense" in by:
+        selected["Offense"] = rollups["offenses"][selected["offense"].to_numpy()] if len(selected) else []
+        columns.append("Offense")
+    if "cell" in by:
+        selected["Cell Lat"], selected["Cell Long"] = cell_center(selected["cell_row"], selected["cell_col"])
+        columns.extend(["Cell Lat", "Cell Long"])
+    if not columns:
+        return pd.DataFrame({"Count": [int(selected["count"].sum())]})
+    grouped = selected.groupby(columns, dropna=False)["count"].sum().reset_index(name="Count")
+    return grouped.sort_values(columns).reset_index(drop=True)
+
+
+def main():
+    from utils import load_csv_data
+
+    parser = argparse.ArgumentParser(description="Offense x time x area rollups of the incident dataset.")
+    parser.add_argument("--rebuild", action="store_true", help="Recount every complaint from scratch.")
+    parser.add_argument("--level", choices=GRANULARITIES, default="month", help="Time granularity to show.")
+    parser.add_argument("--since", help="First period (YYYY-MM-DD).")
+    parser.add_argument("--until", help="Last period (YYYY-MM-DD).")
+    parser.add_argument("--offense", action="append", help="Restrict to an offense (repeatable).")
+    parser.add_argument("--by", default="period",
+                        help="Comma-separated grouping: period, offense, cell (default: period).")
+    parser.add_argument("--limit", type=int, default=24, help="Maximum rows to print (latest first).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    rollups_path = script_dir / 'cache' / 'rollups.npz'
+
+    rollups = empty_rollups() if args.rebuild else load_rollups(rollups_path)
+    df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+    start = time.perf_counter()
+    added = update_rollups(rollups, df)
+    if added or args.rebuild:
+        save_rollups(rollups_path, rollups)
+    print(f"Counted {added} new complaint(s) in {time.perf_counter() - start:.2f}s; "
+          f"{len(rollups['seen'])} complaints, {len(rollups['day']['count'])} daily records.")
+
+    by = tuple(b.strip() for b in args.by.split(",") if b.strip())
+    start = time.perf_counter()
+    counts = query_counts(rollups, args.level, args.since, args.until, args.offense, by=by)
+    print(f"Query took {(time.perf_counter() - start) * 1000:.1f} ms ({len(counts)} groups).")
+    print(counts.tail(args.limit).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# spatial_index.py
+
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6371008.8
+# Metres per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111320.0
+DEFAULT_CELL_SIZE_M = 250
+
+
+def haversine_m(lat, lng, lats, lngs):
+    """
+    Great-circle distance in metres from one point to many (vectorized).
+
+    Args:
+        lat (float): Latitude of the origin (degrees).
+        lng (float): Longitude of the origin (degrees).
+        lats (ndarray): Latitudes (degrees).
+        lngs (ndarray): Longitudes (degrees).
+
+    Returns:
+        ndarray: Distances in metres.
+    """
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Grid-hash index over geocoded incidents.
+
+    Points are bucketed into square cells of roughly cell_size_m and sorted
+    by cell key, so the points of any run of cells along one grid row are a
+    contiguous slice. A query only computes distances for the points in the
+    cells its bounding box overlaps, then applies the date/offense predicate
+    and the exact haversine test.
+    """
+
+    def __init__(self, df, cell_size_m=DEFAULT_CELL_SIZE_M):
+        """
+        Build the index from dataset rows (rows without Lat/Long are skipped).
+
+        Args:
+            df (DataFrame): Dataset with Lat, Long, Date and Offense columns.
+            cell_size_m (float): Approximate grid cell edge in metres.
+        """
+        df = df.dropna(subset=["Lat", "Long"])
+        df = df[(df["Lat"].abs() <= 90) & (df["Long"].abs() <= 180)]
+        self.df = df.reset_index(drop=True)
+        self.lats = self.df["Lat"].to_numpy(dtype=np.float64)
+        self.lngs = self.df["Long"].to_numpy(dtype=np.float64)
+        dates = pd.to_datetime(self.df.get("Date"), errors="coerce")
+        self.dates = dates.to_numpy(dtype="datetime64[D]") if dates is not None else None
+        self.offenses = self.df["Offense"].to_numpy(dtype=object) if "Offense" in self.df else None
+
+        ref_lat = float(np.median(self.lats)) if len(self.lats) else 0.0
+        self.cell_lat = cell_size_m / METERS_PER_DEGREE
+        self.cell_lng = cell_size_m / (METERS_PER_DEGREE * np.cos(np.radians(ref_lat)))
+        rows, cols = self._cells(self.lats, self.lngs)
+        self.row0 = int(rows.min()) if len(rows) else 0
+        self.col0 = int(cols.min()) if len(cols) else 0
+        self.n_cols = int(cols.max()) - self.col0 + 1 if len(cols) else 1
+        self.n_rows = int(rows.max()) - self.row0 + 1 if len(rows) else 1
+        keys = (rows - self.row0) * self.n_cols + (cols - self.col0)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _cells(self, lats, lngs):
+        """
+        Grid (row, col) of each point.
+        """
+        rows = np.floor(np.asarray(lats) / self.cell_lat).astype(np.int64)
+        cols = np.floor(np.asarray(lngs) / self.cell_lng).astype(np.int64)
+        return rows, cols
+
+    def _bbox_candidates(self, south, west, north, east):
+        """
+        Positions of the points in every cell overlapping a bounding box.
+        """
+        (r0, r1), (c0, c1) = self._cells([south, north], [west, east])
+        r0, r1 = max(r0 - self.row0, 0), min(r1 - self.row0, self.n_rows - 1)
+        c0, c1 = max(c0 - self.col0, 0), min(c1 - self.col0, self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.int64)
+        row_starts = np.arange(r0, r1 + 1) * self.n_cols
+        lo = np.searchsorted(self.sorted_keys, row_starts + c0, side="left")
+        hi = np.searchsorted(self.sorted_keys, row_starts + c1, side="right")
+        slices = [self.order[a:b] for a, b in zip(lo, hi) if b > a]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _filter(self, positions, start_date=None, end_date=None, offenses=None):
+        """
+        Keep positions matching the date range (inclusive) and offenses.
+        """
+        if len(positions) == 0:
+            return positions
+        mask = np.ones(len(positions), dtype=bool)
+        if self.dates is not None and (start_date is not None or end_date is not None):
+            dates = self.dates[positions]
+            valid = ~np.isnat(dates)
+            if start_date is not None:
+                valid &= dates >= np.datetime64(pd.Timestamp(start_date).date(), "D")
+            if end_date is not None:
+                valid &= dates <= np.datetime64(pd.Timestamp(end_date).date(), "D")
+            mask &= valid
+        if offenses and self.offenses is not None:
+            mask &= np.isin(self.offenses[positions], list(offenses))
+        return positions[mask]
+
+    def _rows(self, positions, distances=None):
+        """
+        Dataset rows for positions, with an optional Distance (m) column.
+        """
+        rows = self.df.iloc[positions].copy()
+        if distances is not None:
+            rows["Distance (m)"] = np.round(distances, 1)
+        return rows
+
+    def within_radius(self, lat, lng, radius_m, start_date=None, end_date=None, offenses=None):
+        """
+        Incidents within radius_m of a point, nearest first.
+
+        Args:
+            lat (float): Latitude of the centre.
+            lng (float): Longitude of the centre.
+            radius_m (float): Radius in metres.
+            start_date (str or date): Inclusive lower date bound.
+            end_date (str or date): Inclusive upper date bound.
+            offenses (list of str): Restrict to these offenses.
+
+        Returns:
+            DataFrame: Matching rows plus 'Distance (m)'.
+        """
+        dlat = radius_m / METERS_PER_DEGREE
+        # Widest longitude span is at the poleward edge of the circle
+        dlng = radius_m / (METERS_PER_DEGREE * np.cos(np.radians(min(abs(lat) + dlat, 89.9))))
+        positions = self._bbox_candidates(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        positions = self._filter(positions, start_date, end_date, offenses)
+        distances = haversine_m(lat, lng, self.lats[positions], self.lngs[positions])
+        inside = distances <= radius_m
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self._rows(positions[order], distances[order])
+
+    def within_bbox(self, south, west, north, east, start_date=None, end_date=None, offenses=None):
+        """
+        Incidents inside a latitude/longitude bounding box.
+
+        Returns:
+            DataFrame: Matching rows in dataset order.
+        """
+        positions = self._bbox_candidates(south, west, north, east)
+        positions = self._filter(positions, start_date, end_date, offenses)
+        lats, lngs = self.lats[positions], self.lngs[positions]
+        inside = (lats >= south) & (lats <= north) & (lngs >= west) & (lngs <= east)
+        return self._rows(np.sort(positions[inside]))
+
+    def nearest(self, lat, lng, k=10, start_date=None, end_date=None, offenses=None):
+        """
+        The k incidents nearest to a point.
+
+        The search radius doubles from one cell until k matches are found
+        (or the whole grid is covered); the radius query is exact, so the k
+        closest within it are the k closest overall.
+
+        Returns:
+            DataFrame: Up to k rows plus 'Distance (m)', nearest first.
+        """
+        if len(self) == 0:
+            return self._rows(np.empty(0, dtype=np.int64), np.empty(0))
+        # Distance to the farthest corner of the data's extent covers every point
+        corner_lats = np.array([self.lats.min(), self.lats.min(), self.lats.max(), self.lats.max()])
+        corner_lngs = np.array([self.lngs.min(), self.lngs.max(), self.lngs.min(), self.lngs.max()])
+        max_radius_m = haversine_m(lat, lng, corner_lats, corner_lngs).max()
+        radius_m = self.cell_lat * METERS_PER_DEGREE
+        while True:
+            rows = self.within_radius(lat, lng, radius_m, start_date, end_date, offenses)
+            if len(rows) >= k or radius_m >= max_radius_m:
+                return rows.head(k)
+            radius_m *= 2
+
+
+def location_center(df, location):
+    """
+    Mean coordinates of the dataset rows reported at a location.
+
+    Args:
+        df (DataFrame): Dataset with Location, Lat and Long.
+        location (str): Location text (e.g. "900 BLOCK OF WISCONSIN").
+
+    Returns:
+        tuple: (lat, lng), or (None, None) if no geocoded row matches.
+    """
+    from utils import normalize_location
+
+    target = normalize_location(location)
+    located = df.dropna(subset=["Location", "Lat", "Long"])
+    keys = located["Location"].astype(str).map(normalize_location)
+    matches = located[keys == target]
+    if matches.empty:
+        return None, None
+    return float(matches["Lat"].mean()), float(matches["Long"].mean())
+
+
+def main():
+    from utils import load_csv_data
+
+    parser = argparse.ArgumentParser(description="Spatial queries over geocoded incidents.")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--point", nargs=2, type=float, metavar=("LAT", "LNG"), help="Query centre.")
+    where.add_argument("--address", help='Centre on a reported location, e.g. "900 BLOCK OF WISCONSIN".')
+    where.add_argument("--bbox", nargs=4, type=float, metavar=("SOUTH", "WEST", "NORTH", "EAST"),
+                       help="Bounding-box query.")
+    parser.add_argument("--radius", type=float, default=300, help="Radius in metres (default 300).")
+    parser.add_argument("--nearest", type=int, help="Return the k nearest incidents instead of a radius.")
+    parser.add_argument("--since", help="Only incidents on or after this date (YYYY-MM-DD).")
+    parser.add_argument("--until", help="Only incidents on or before this date (YYYY-MM-DD).")
+    parser.add_argument("--offense", action="append", help="Restrict to an offense (repeatable).")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum rows to print.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    data_dir = Path(__file__).parent.resolve() / 'data'
+    df = load_csv_data(data_dir / 'summary_report.csv', data_dir / 'summary_report.zip')
+    start = time.perf_counter()
+    index = SpatialIndex(df)
+    print(f"Indexed {len(index)} geocoded incidents in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+    if args.address:
+        lat, lng = location_center(df, args.address)
+        if lat is None:
+            print(f"No geocoded incidents reported at '{args.address}'.")
+            return
+    elif args.point:
+        lat, lng = args.point
+
+    filters = dict(start_date=args.since, end_date=args.until, offenses=args.offense)
+    start = time.perf_counter()
+    if args.bbox:
+        results = index.within_bbox(*args.bbox, **filters)
+        described = f"inside {args.bbox}"
+    else:
+        if args.nearest:
+            results = index.nearest(lat, lng, args.nearest, **filters)
+            described = f"nearest to ({lat:.6f}, {lng:.6f})"
+        else:
+            results = index.within_radius(lat, lng, args.radius, **filters)
+            described = f"within {args.radius:g} m of ({lat:.6f}, {lng:.6f})"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(results)} incident(s) {described} in {elapsed_ms:.2f} ms")
+    for _, row in results.head(args.limit).iterrows():
+        distance = f"{row['Distance (m)']:>7.0f} m  " if "Distance (m)" in row else ""
+        print(f"{distance}{row['Date']}  {row['Complaint #']:10s} {row['Offense']}  @ {row['Location']}")
+
+
+if __name__ == "__main__":
+    main()
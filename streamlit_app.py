@@ -8,6 +8,13 @@ import re
 import hashlib
 import requests
 from folium.plugins import MarkerCluster
+from pathlib import Path
+
+from narrative_search import open_index, update_index, search
+from spatial_index import SpatialIndex
+from rollups import load_rollups, update_rollups, query_counts
+from complaint_merge import merge_complaints
+from offense_taxonomy import add_offense_columns, load_offense_map
 
 # Define Mailchimp API details from secrets
 MAILCHIMP_API_KEY = st.secrets["mailchimp"]["api_key"]
@@ -32,7 +39,76 @@ def load_data():
     This prevents re-reading the file on every app rerun.
     """
     df = pd.read_csv("data/summary_report.zip", compression="zip", encoding="cp1252")
-    return df
+    # One row per complaint, even when several reports listed it
+    df = merge_complaints(df)
+    # Categorical offense type/category columns for integer filtering
+    return add_offense_columns(df, load_offense_map(Path("cache/offense_map.json")))
+
+@st.cache_resource
+def load_narrative_index():
+    """
+    Opens the narrative search index built by the ingestion job, or builds
+    one in memory from the dataset when the index file is not present.
+    """
+    index_path = Path("cache/narrative_index.sqlite")
+    if index_path.exists():
+        return open_index(index_path)
+    conn = open_index(":memory:")
+    update_index(conn, load_data())
+    return conn
+
+@st.cache_resource
+def load_spatial_index():
+    """
+    Builds the grid index over geocoded incidents once per app process.
+    """
+    return SpatialIndex(load_data())
+
+@st.cache_resource
+def load_rollup_store():
+    """
+    Loads the rollups written by the ingestion job and counts any rows of
+    the dataset they are missing (all of them when the store is absent).
+    """
+    rollups = load_rollups(Path("cache/rollups.npz"))
+    update_rollups(rollups, load_data())
+    return rollups
+
+def show_trends(selected_types, df):
+    """
+    Incident counts over the full history, from the precomputed rollups.
+
+    The rollups count raw offense texts; they are summed per offense type
+    using the texts' types in df.
+    """
+    st.subheader("Trends")
+    rollups = load_rollup_store()
+    type_of_offense = df.drop_duplicates("Offense").set_index("Offense")["Offense Type"]
+    selected_texts = type_of_offense[type_of_offense.isin(selected_types)].index.tolist()
+    level = st.radio("Granularity", options=["month", "week", "day"], index=0, horizontal=True)
+    counts = query_counts(
+        rollups,
+        level,
+        end_date=datetime.now().date(),
+        offenses=selected_texts or None,
+        by=("period", "offense") if selected_types else ("period",)
+    )
+    if counts.empty:
+        st.write("No incidents to chart.")
+        return
+    if selected_types:
+        counts["Offense Type"] = counts["Offense"].map(type_of_offense)
+        chart_df = counts.pivot_table(index="Period", columns="Offense Type", values="Count",
+                                      aggfunc="sum", fill_value=0, observed=True)
+    else:
+        chart_df = counts.set_index("Period")[["Count"]]
+    st.line_chart(chart_df)
+
+    top = query_counts(rollups, "month", end_date=datetime.now().date(), by=("offense",))
+    top["Offense Type"] = top["Offense"].map(type_of_offense)
+    top = top.groupby("Offense Type", observed=True)["Count"].sum()
+    st.write("**Most reported offense types (all time)**")
+    st.bar_chart(top.nlargest(10))
 
 # def add_footer(crime_map):
 #     """
@@ -309,8 +385,8 @@ def main_app():
             st.info("No records found for the selected date range.")
             st.stop()
 
-        # Dynamically gather offenses from partial_df
-        unique_offenses = sorted(partial_df['Offense'].dropna().unique())
+        # Dynamically gather offense types from partial_df
+        unique_offenses = sorted(partial_df['Offense Type'].unique())
 
         st.subheader("Offense Filter")
         with st.expander("Select Offenses (scrollable)", expanded=False):
@@ -320,22 +396,76 @@ def main_app():
             else:
                 # By default, no offenses => show all
                 selected_offenses = st.multiselect(
-                    "Offense(s)",
+                    "Offense type(s)",
                     options=unique_offenses,
                     default=[],  # empty => show all
                     help="Scroll to find more offenses. If empty => show all."
                 )
 
+        st.subheader("Narrative Search")
+        search_query = st.text_input(
+            "Keywords or \"exact phrase\"",
+            value="",
+            help="Matches words in the incident narratives; burg* matches a prefix. If empty => no filter."
+        )
+
+        st.subheader("Near a Location")
+        # Centre of each reported location = mean of its geocoded rows
+        location_centers = df.groupby("Location")[["Lat", "Long"]].mean()
+        near_location = st.selectbox(
+            "Location",
+            options=[""] + sorted(location_centers.index),
+            index=0,
+            help="Type to search reported locations. If empty => no filter."
+        )
+        radius_m = st.slider("Radius (meters)", min_value=100, max_value=2000, value=300, step=50)
+
     # If user picks no offense => show all
     if selected_offenses:
-        final_df = partial_df[partial_df['Offense'].isin(selected_offenses)]
+        final_df = partial_df[partial_df['Offense Type'].isin(selected_offenses)]
     else:
         final_df = partial_df
+    # Raw offense texts of the selected types, for the search and spatial filters
+    selected_texts = final_df['Offense'].dropna().unique().tolist() if selected_offenses else None
 
     if final_df.empty:
         st.info("No records found for the selected offense(s).")
         st.stop()
 
+    # Keep only rows whose narrative matches, using the full-text index
+    if search_query.strip():
+        matches = search(
+            load_narrative_index(),
+            search_query,
+            limit=None,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            offenses=selected_texts
+        )
+        # Rows are merged per complaint; a match in any report's narrative counts
+        final_df = final_df[final_df["Complaint #"].isin(matches["Complaint #"])]
+        if final_df.empty:
+            st.info("No narratives match the search.")
+            st.stop()
+
+    # Keep only rows within the radius of the chosen location
+    if near_location:
+        near_lat, near_long = location_centers.loc[near_location]
+        nearby = load_spatial_index().within_radius(
+            near_lat,
+            near_long,
+            radius_m,
+            start_date=start_date,
+            end_date=end_date,
+            offenses=selected_texts
+        )
+        nearby_keys = set(zip(nearby["Complaint #"], nearby["File Name"]))
+        row_keys = pd.Series(list(zip(final_df["Complaint #"], final_df["File Name"])), index=final_df.index)
+        final_df = final_df[row_keys.isin(nearby_keys)]
+        if final_df.empty:
+            st.info(f"No incidents within {radius_m} m of {near_location}.")
+            st.stop()
+
     # Truncate to 2,000
     total_recs = len(final_df)
     if total_recs > 2000:
@@ -356,6 +486,15 @@ def main_app():
             zoomToBoundsOnClick=True,
         ).add_to(crime_map)
 
+        if near_location:
+            folium.Circle(
+                location=[near_lat, near_long],
+                radius=radius_m,
+                color="blue",
+                fill=False,
+                tooltip=f"{radius_m} m around {near_location}"
+            ).add_to(crime_map)
+
         for _, row in final_df.iterrows():
             complaint   = safe_field(row.get('Complaint #'))
             offense_val = safe_field(row.get('Offense'))
@@ -417,6 +556,7 @@ def main_app():
 """
 
         st_folium(crime_map, use_container_width=True)
+        show_trends(selected_offenses, df)
         # **Insert the Footer Below the Map**
         st.markdown(footer_html, unsafe_allow_html=True)
 
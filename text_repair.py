@@ -0,0 +1,346 @@
+# text_repair.py
+
+import re
+import json
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+
+# Tokens in the lowercased narrative corpus
+WORD_RE = re.compile(r"[a-z0-9’']+")
+# A split fragment: letters only on the left; on the right, leading letters
+# optionally after an apostrophe ("victim ’s")
+LEFT_FRAGMENT_RE = re.compile(r"[A-Za-z]+")
+RIGHT_FRAGMENT_RE = re.compile(r"[’']?[A-Za-z]+")
+
+# Single-letter words; a fragment after one of these is usually the start
+# of the next word ("a t-shirt", "a l oud"), so merging needs care
+ONE_LETTER_WORDS = {"a", "i"}
+# Punctuation that may close a merged word ("a t," -> "at,")
+CLOSING_PUNCTUATION = set(",;:!?)\"'”’")
+
+DEFAULT_MIN_COUNT = 3
+DEFAULT_MIN_RATIO = 3.0
+
+# Active merge table used by repair_text: "left right" -> joined (lowercase)
+narrative_merges = {}
+
+
+def runs_on(left, right_token, fragment, next_token, merges=None):
+    """
+    Whether a fragment after a single-letter word continues into more text.
+
+    After "a" or "i" the fragment is only a word end when its token stops
+    there (or at closing punctuation) and the next token is not a fragment
+    too: a single letter, or the rest of a split the merge table knows
+    ("l oud"). "a t-shirt", "a l.e.a.d.s" and "a l oud" run on.
+
+    Args:
+        left (str): Lowercased token before the fragment.
+        right_token (str): Token holding the fragment.
+        fragment (str): Leading letters of right_token.
+        next_token (str or None): Token after right_token.
+        merges (dict): Merge table to recognize split continuations.
+
+    Returns:
+        bool: True if merging left with fragment could break a word apart.
+    """
+    if left not in ONE_LETTER_WORDS:
+        return False
+    rest = right_token[len(fragment):]
+    if rest and rest[0] not in CLOSING_PUNCTUATION:
+        return True
+    if rest or next_token is None:
+        return False
+    match = RIGHT_FRAGMENT_RE.match(next_token)
+    if not match:
+        return False
+    if len(match.group(0)) == 1 and match.group(0).lower() not in ONE_LETTER_WORDS:
+        return True
+    return bool(merges) and f"{fragment.lower()} {match.group(0).lower()}" in merges
+
+
+def build_vocabulary(texts):
+    """
+    Count words and adjacent word-fragment pairs over a narrative corpus.
+
+    Pairs whose fragment runs on into more text (see runs_on) are not counted.
+
+    Args:
+        texts (iterable of str): Lowercased narratives.
+
+    Returns:
+        tuple: (Counter of words, Counter of (left, right) fragment pairs)
+    """
+    vocab = Counter()
+    pairs = Counter()
+    for text in texts:
+        vocab.update(WORD_RE.findall(text))
+        tokens = text.split()
+        for i, (left, right) in enumerate(zip(tokens, tokens[1:])):
+            if LEFT_FRAGMENT_RE.fullmatch(left):
+                match = RIGHT_FRAGMENT_RE.match(right)
+                next_token = tokens[i + 2] if i + 2 < len(tokens) else None
+                if match and not runs_on(left, right, match.group(0), next_token):
+                    pairs[(left, match.group(0))] += 1
+    return vocab, pairs
+
+
+def build_merge_table(texts, min_count=DEFAULT_MIN_COUNT, min_ratio=DEFAULT_MIN_RATIO):
+    """
+    Find split tokens ("fo otage", "t he") whose joined form is far more common.
+
+    A pair is merged when the joined word occurs at least min_count times,
+    at least min_ratio times as often as the split pair, and more often
+    than one of the two fragments, so two common words ("in to", "may be")
+    are left alone.
+
+    Args:
+        texts (iterable of str): Lowercased narratives.
+        min_count (int): Minimum occurrences of the joined word.
+        min_ratio (float): Minimum joined/split frequency ratio.
+
+    Returns:
+        dict: {"left right": "joined"} lookup table.
+    """
+    vocab, pairs = build_vocabulary(texts)
+    merges = {}
+    for (left, right), pair_count in pairs.items():
+        joined = left + right
+        joined_count = vocab.get(joined, 0)
+        if (
+            joined_count >= min_count
+            and joined_count >= min_ratio * pair_count
+            and joined_count > min(vocab[left], vocab[right])
+        ):
+            merges[f"{left} {right}"] = joined
+    return merges
+
+
+def repair_text(text, merges=None):
+    """
+    Merge split tokens in one text in a single left-to-right pass.
+
+    Case and trailing punctuation of the original fragments are kept
+    ("LOS S." -> "LOSS."), and a merged token can merge again with the next
+    fragment ("es ti mated" -> "estimated"). A fragment after a single-letter
+    word is left alone when it runs on into more text ("a t-shirt").
+
+    Args:
+        text (str): Narrative text (any case).
+        merges (dict): Merge table (defaults to the active table).
+
+    Returns:
+        str: Repaired text.
+    """
+    merges = narrative_merges if merges is None else merges
+    if not merges or not isinstance(text, str):
+        return text
+    out = []
+    tokens = text.split()
+    for i, token in enumerate(tokens):
+        if out and LEFT_FRAGMENT_RE.fullmatch(out[-1]):
+            match = RIGHT_FRAGMENT_RE.match(token)
+            if (
+                match
+                and f"{out[-1].lower()} {match.group(0).lower()}" in merges
+                and not runs_on(out[-1].lower(), token, match.group(0), tokens[i + 1] if i + 1 < len(tokens) else None, merges)
+            ):
+                out[-1] += token
+                continue
+        out.append(token)
+    return " ".join(out)
+
+
+def repair_series(texts, merges=None):
+    """
+    Batch-repair a column, running repair_text once per distinct value.
+
+    Args:
+        texts (Series): Narrative column.
+        merges (dict): Merge table (defaults to the active table).
+
+    Returns:
+        Series: Repaired column (same index).
+    """
+    unique = texts.dropna().unique()
+    repaired = {text: repair_text(text, merges) for text in unique}
+    return texts.map(repaired).where(texts.notna(), texts)
+
+
+def check_repairs(originals, repaired, vocab):
+    """
+    Check repaired narratives against their originals before rewriting them.
+
+    A repair may only remove spaces. Where it joined a single-letter word
+    with the next fragment, the joined token (without closing punctuation)
+    must be a word of the corpus and must not be followed by a stray letter
+    of the same split ("a re d head" must not become "are d head").
+
+    Args:
+        originals (iterable of str): Narratives before repair.
+        repaired (iterable of str): The same narratives after repair.
+        vocab (Counter): Word counts of the lowercased corpus.
+
+    Returns:
+        list of tuple: (original, repaired, reason) for each failed repair.
+    """
+    failures = []
+    for before, after in zip(originals, repaired):
+        if "".join(before.split()) != "".join(after.split()):
+            failures.append((before, after, "changed more than spacing"))
+            continue
+        tokens = before.split()
+        position = 0
+        for token in after.split():
+            group = [tokens[position]]
+            while "".join(group) != token:
+                group.append(tokens[position + len(group)])
+            position += len(group)
+            if len(group) == 1 or group[0].lower() not in ONE_LETTER_WORDS:
+                continue
+            word = token.lower().rstrip("".join(CLOSING_PUNCTUATION))
+            next_token = tokens[position] if position < len(tokens) else ""
+            if not WORD_RE.fullmatch(word) or vocab.get(word, 0) == 0:
+                failures.append((before, after, f"joined {' '.join(group)!r} into non-word {token!r}"))
+                break
+            if LEFT_FRAGMENT_RE.fullmatch(next_token) and len(next_token) == 1 \
+                    and next_token.lower() not in ONE_LETTER_WORDS:
+                failures.append((before, after, f"joined {' '.join(group)!r} before stray {next_token!r}"))
+                break
+    return failures
+
+
+def set_narrative_merges(merges):
+    """
+    Set the merge table used by repair_text for this run.
+
+    Args:
+        merges (dict): {"left right": "joined"} table.
+    """
+    global narrative_merges
+    narrative_merges = merges or {}
+
+
+def load_merge_table(merges_path):
+    """
+    Load a saved merge table (empty if missing or unreadable).
+
+    Args:
+        merges_path (Path): Path to narrative_merges.json.
+
+    Returns:
+        dict: {"left right": "joined"} table.
+    """
+    merges_file = Path(merges_path)
+    if not merges_file.exists():
+        return {}
+    try:
+        with merges_file.open('r', encoding='utf-8') as f:
+            return json.load(f).get("merges", {})
+    except (json.JSONDecodeError, OSError) as e:
+        logging.warning(f"Failed to load merge table '{merges_path}': {e}")
+        return {}
+
+
+def save_merge_table(merges_path, merges, narratives_count):
+    """
+    Save a merge table with the size of the corpus it was built from.
+    """
+    payload = {
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "narratives": narratives_count,
+        "min_count": DEFAULT_MIN_COUNT,
+        "min_ratio": DEFAULT_MIN_RATIO,
+        "merges": dict(sorted(merges.items())),
+    }
+    try:
+        with Path(merges_path).open('w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=1, ensure_ascii=False)
+    except OSError as e:
+        logging.error(f"Failed to save merge table '{merges_path}': {e}")
+
+
+def ensure_merge_table(merges_path, narratives):
+    """
+    Load the merge table, building and saving it first if it does not exist.
+
+    Args:
+        merges_path (Path): Path to narrative_merges.json.
+        narratives (Series): Narrative column to build from when needed.
+
+    Returns:
+        dict: {"left right": "joined"} table.
+    """
+    if Path(merges_path).exists():
+        return load_merge_table(merges_path)
+    texts = narratives.dropna().astype(str).str.lower()
+    merges = build_merge_table(texts)
+    save_merge_table(merges_path, merges, len(texts))
+    logging.info(f"Built narrative merge table with {len(merges)} entries from {len(texts)} narratives.")
+    print(f"Built narrative merge table with {len(merges)} entries from {len(texts)} narratives.")
+    return merges
+
+
+def main():
+    from utils import load_csv_data, process_narrative_nlp, save_zip
+
+    parser = argparse.ArgumentParser(
+        description="Build the narrative merge table and repair split words in the dataset."
+    )
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild cache/narrative_merges.json from the dataset's narratives.")
+    parser.add_argument("--apply", action="store_true",
+                        help="Re-clean the Narrative and NLP_Text columns and rewrite data/summary_report.zip.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    script_dir = Path(__file__).parent.resolve()
+    data_dir = script_dir / 'data'
+    merges_path = script_dir / 'cache' / 'narrative_merges.json'
+    output_csv_path = data_dir / 'summary_report.csv'
+    output_zip_path = data_dir / 'summary_report.zip'
+
+    df = load_csv_data(output_csv_path, output_zip_path)
+    if df.empty or "Narrative" not in df.columns:
+        print("No narratives found.")
+        return
+
+    if args.rebuild and merges_path.exists():
+        merges_path.unlink()
+    merges = ensure_merge_table(merges_path, df["Narrative"])
+
+    repaired = repair_series(df["Narrative"], merges)
+    changed = (repaired != df["Narrative"]) & df["Narrative"].notna()
+    print(f"Merge table: {len(merges)} entries. Narratives changed: {int(changed.sum())} of {int(df['Narrative'].notna().sum())}.")
+
+    vocab, _ = build_vocabulary(df["Narrative"].dropna().astype(str).str.lower())
+    broken = check_repairs(df.loc[changed, "Narrative"], repaired[changed], vocab)
+    for before, after, reason in broken[:10]:
+        print(f"  Check failed ({reason}):\n  - {before[:100]}\n  + {after[:100]}")
+
+    if not args.apply:
+        for before, after in list(zip(df.loc[changed, "Narrative"], repaired[changed]))[:3]:
+            print(f"  - {before[:100]}\n  + {after[:100]}")
+        print("Run with --apply to rewrite the dataset.")
+        return
+    if broken:
+        print(f"Not rewriting the dataset: {len(broken)} repaired narrative(s) failed the check.")
+        return
+
+    df.loc[changed, "Narrative"] = repaired[changed]
+    # NLP_Text is derived from the narrative, so rebuild it for changed rows only
+    unique = df.loc[changed, "Narrative"].unique()
+    nlp_by_narrative = {text: process_narrative_nlp(text) for text in unique}
+    df.loc[changed, "NLP_Text"] = df.loc[changed, "Narrative"].map(nlp_by_narrative)
+
+    df.to_csv(output_csv_path, index=False, encoding="cp1252", errors="replace")
+    save_zip(output_zip_path, output_csv_path, 'summary_report.csv')
+    print(f"Rewrote '{output_zip_path}' with {int(changed.sum())} repaired narratives.")
+
+
+if __name__ == "__main__":
+    main()
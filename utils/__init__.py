@@ -0,0 +1,96 @@
+# utils/__init__.py
+"""
+Shared helpers for the ingestion, map and report scripts.
+
+The helpers live in submodules that are imported on first use, so a script
+that only needs the git or env helpers does not pay for pandas, PDF, NLP
+or Google Maps imports:
+
+    from utils import load_env_vars        # loads utils.env only
+    from utils.git import upload_files     # loads utils.git only
+
+Module-level settings (pdf_text_backend, geocode_budget, ...) are read live
+from their submodule; change them with the matching set_* function.
+"""
+
+import importlib
+
+# Submodule -> names it provides
+SUBMODULE_EXPORTS = {
+    "env": (
+        "load_env_vars",
+    ),
+    "locations": (
+        "LOCATION_KEY_VERSION", "normalize_location", "standardize_directions",
+        "standardize_suffix",
+    ),
+    "io": (
+        "load_json_cache", "save_json_cache", "save_npz", "save_zip", "load_csv_data", "fetch_pdf_links",
+        "download_pdf", "file_sha256", "check_pdf_cache",
+    ),
+    "nlp": (
+        "clean_narrative_basic", "process_narrative_nlp",
+    ),
+    "parsing": (
+        "clean_text", "parse_date", "COMPLAINT_MARKER", "COMPLAINT_PATTERN", "OFFENSE_PATTERN",
+        "DATE_PATTERN", "TIME_PATTERN", "LOCATION_PATTERN", "VICTIM_PATTERN",
+        "NARRATIVE_PATTERN", "pypdf2_page_texts", "pdfminer_page_texts", "pdfium_page_texts",
+        "PDF_TEXT_BACKENDS", "DEFAULT_PDF_TEXT_BACKEND", "pdf_text_backend",
+        "register_pdf_text_backend", "available_pdf_text_backends", "set_pdf_text_backend",
+        "iter_pdf_pages", "iter_complaint_blocks", "extract_data_from_pdf",
+        "parse_complaint_block",
+    ),
+    "geocode": (
+        "api_call_count", "get_lat_long", "get_api_call_count", "GEOCODE_SOURCE_API",
+        "GEOCODE_SOURCE_INTERPOLATED", "GEOCODE_SOURCE_CSV", "GEOCODE_SOURCE_FUZZY", "GEOCODE_STATUS_OK",
+        "GEOCODE_STATUS_FAILED", "GEOCODE_RETRY_BASE_HOURS", "GEOCODE_RETRY_MAX_DAYS",
+        "geocode_budget", "geocode_budget_lock", "GEOCODE_PAUSE_SEC", "set_geocode_pause", "make_location_entry",
+        "upgrade_location_entry", "location_entry_coords", "geocode_retry_due",
+        "schedule_geocode_retries", "cached_location_coords", "set_geocode_budget",
+        "consume_geocode_budget", "geocode_location", "retry_failed_geocodes",
+        "backfill_coordinates", "location_match_confidence", "location_match_log_path",
+        "set_location_match_confidence", "set_location_match_log", "sync_location_matcher",
+        "fuzzy_location_coords", "street_points", "intersection_location_coords",
+        "GEOFENCE_OUTSIDE", "reject_location_entry", "validate_location_cache",
+        "validate_dataset_coordinates",
+    ),
+    "location_match": (
+        "DEFAULT_MIN_MATCH_CONFIDENCE", "decompose_location", "split_street", "LocationMatcher",
+    ),
+    "geofence": (
+        "BOUNDARY_PATH", "GEOFENCE_BUFFER_M", "load_boundary", "get_boundary", "boundary_bounds",
+        "points_in_boundary", "names_other_town",
+    ),
+    "intersections": (
+        "parse_intersection", "fit_street", "StreetGeometry", "get_street_geometry",
+        "reset_street_geometry",
+    ),
+    "git": (
+        "extract_year", "get_file_sha", "abort_incomplete_rebase", "run_subprocess",
+        "git_commit_and_force_push", "upload_files_via_git", "upload_files",
+        "synchronize_repository",
+    ),
+}
+
+EXPORTS = {name: module for module, names in SUBMODULE_EXPORTS.items() for name in names}
+
+__all__ = sorted(EXPORTS)
+
+
+def __getattr__(name):
+    """
+    Resolve utils.<name> from its submodule, importing it on first use.
+
+    Values are not cached on the package, so settings changed through a
+    set_* function are always seen.
+    """
+    if name in SUBMODULE_EXPORTS:
+        return importlib.import_module(f"{__name__}.{name}")
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS) | set(SUBMODULE_EXPORTS))
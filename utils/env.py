@@ -0,0 +1,35 @@
+# utils/env.py
+
+import os
+from pathlib import Path
+
+def load_env_vars(file_path):
+    """
+    Load environment variables from a file and set them in os.environ.
+
+    Args:
+        file_path (str or Path): The path to the environment variables file.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+    """
+    env_file = Path(file_path)
+    if not env_file.exists():
+        raise FileNotFoundError(f"Environment file '{file_path}' not found.")
+    
+    with env_file.open('r') as f:
+        for line in f:
+            # Remove leading/trailing whitespace
+            line = line.strip()
+            # Skip empty lines and comments
+            if not line or line.startswith('#'):
+                continue
+            # Split into key and value
+            if '=' in line:
+                key, value = line.split('=', 1)
+                key = key.strip()
+                value = value.strip()
+                os.environ[key] = value
+                print(f"Loaded environment variable")  
+            else:
+                print(f"Ignoring invalid line in env file")  
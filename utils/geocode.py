@@ -0,0 +1,614 @@
+# utils/geocode.py
+
+import json
+import time
+import logging
+import threading
+
+import googlemaps
+import numpy as np
+
+from pipeline_metrics import stage_timer, increment
+from utils.locations import normalize_location
+from utils.location_match import DEFAULT_MIN_MATCH_CONFIDENCE, LocationMatcher
+from utils.intersections import parse_intersection, get_street_geometry
+from utils.geofence import points_in_boundary, names_other_town, boundary_bounds
+
+# Initialize the API call counter
+api_call_count = 0  # Global counter for API calls
+
+def get_lat_long(location_string, gmaps_client, bounds=None):
+    """
+    Attempt to geocode location string in Oak Park, IL, 60302.
+    Returns (lat, long) or (None, None).
+
+    Also increments the global api_call_count when an API call is made.
+
+    Args:
+        location_string (str): The location string to geocode.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client.
+        bounds (dict): Viewport to prefer results in ({"southwest": (lat, lng),
+            "northeast": (lat, lng)}), or None.
+
+    Returns:
+        tuple: (latitude, longitude) or (None, None) if geocoding fails.
+    """
+    global api_call_count  # Declare as global to modify the counter
+    
+    # Enhance address precision
+    location_string = location_string.lower().replace("block of", "").strip()
+    # Example: "1100 block of south grove" -> "1100 south grove st"
+    # Add "st", "ave", etc., if known. Otherwise, Google might infer.
+    
+    full_address = f"{location_string.title()} Street, Oak Park, IL, 60302"  # Title case for consistency
+    logging.debug("Attempting to geocode address: '%s'", full_address)
+    try:
+        increment("geocode_api_calls")
+        with stage_timer("geocode_api"):
+            if bounds is None:
+                geocode_result = gmaps_client.geocode(full_address)
+            else:
+                geocode_result = gmaps_client.geocode(full_address, bounds=bounds)
+        if geocode_result:
+            lat = geocode_result[0]['geometry']['location']['lat']
+            lng = geocode_result[0]['geometry']['location']['lng']
+            api_call_count += 1  # Increment API call counter
+            logging.info(f"Geocoded '{full_address}' to ({lat}, {lng})")
+            return (lat, lng)
+        else:
+            logging.warning(f"No geocode results for '{full_address}'")
+    except googlemaps.exceptions.ApiError as api_err:
+        logging.error(f"API Error for '{full_address}': {api_err}")
+    except googlemaps.exceptions.TransportError as transport_err:
+        logging.error(f"Transport Error for '{full_address}': {transport_err}")
+    except googlemaps.exceptions.Timeout as timeout_err:
+        logging.error(f"Timeout Error for '{full_address}': {timeout_err}")
+    except Exception as e:
+        logging.error(f"Unexpected error for '{full_address}': {e}")
+    return (None, None)
+
+def get_api_call_count():
+    """
+    Retrieve the current API call count.
+    
+    Returns:
+        int: Number of API calls made.
+    """
+    return api_call_count
+
+# Location-cache entries. Legacy entries are bare [lat, lng] lists; current
+# entries are dicts carrying how and when the coordinates were obtained.
+GEOCODE_SOURCE_API = "api"
+GEOCODE_SOURCE_INTERPOLATED = "interpolated"
+GEOCODE_SOURCE_CSV = "csv"
+GEOCODE_SOURCE_FUZZY = "fuzzy"
+
+GEOCODE_STATUS_OK = "ok"
+GEOCODE_STATUS_FAILED = "failed"
+
+# Entry "geofence" flag for coordinates outside the village boundary: on a
+# successful entry the location is accepted as out of town; on a failed
+# entry (with the "rejected" coordinates) it is queued for a re-geocode
+GEOFENCE_OUTSIDE = "outside"
+
+# Failed entries are retried after base * 2**(attempts - 1), capped at max
+GEOCODE_RETRY_BASE_HOURS = 24
+GEOCODE_RETRY_MAX_DAYS = 90
+
+# Remaining geocoding API calls allowed this run (None = unlimited)
+geocode_budget = None
+# Geocoding may run on several threads (ingest_pipeline)
+geocode_budget_lock = threading.Lock()
+
+# Respectful pause before each geocoding API call
+GEOCODE_PAUSE_SEC = 0.2
+
+# Cached locations matching a new variant this well are used instead of an
+# API call (None disables fuzzy matching)
+location_match_confidence = DEFAULT_MIN_MATCH_CONFIDENCE
+# JSONL file recording each fuzzy match for review (None = log only)
+location_match_log_path = None
+location_match_log_lock = threading.Lock()
+# Fuzzy index over the keys of the location cache it was built for
+location_matcher = None
+location_matcher_cache_id = None
+
+def make_location_entry(lat, lng, source=GEOCODE_SOURCE_API, attempts=0, now=None):
+    """
+    Build a location-cache entry.
+
+    Args:
+        lat (float or None): Latitude, or None if geocoding failed.
+        lng (float or None): Longitude, or None if geocoding failed.
+        source (str): One of GEOCODE_SOURCE_API, _INTERPOLATED or _CSV.
+        attempts (int): Consecutive failed API attempts so far.
+        now (float): UNIX timestamp (defaults to time.time()).
+
+    Returns:
+        dict: The cache entry.
+    """
+    ok = lat is not None and lng is not None
+    return {
+        "lat": lat,
+        "lng": lng,
+        "status": GEOCODE_STATUS_OK if ok else GEOCODE_STATUS_FAILED,
+        "source": source,
+        "updated": time.time() if now is None else now,
+        "attempts": 0 if ok else attempts,
+    }
+
+def upgrade_location_entry(entry):
+    """
+    Convert a legacy [lat, lng] cache value into an entry dict.
+
+    Legacy values carry no timestamp, so 'updated' is None (a failed legacy
+    entry is therefore due for a retry immediately).
+
+    Args:
+        entry (list, tuple or dict): Cached value.
+
+    Returns:
+        dict: The entry in the current format.
+    """
+    if isinstance(entry, dict):
+        return entry
+    lat, lng = (entry if entry else (None, None))
+    upgraded = make_location_entry(lat, lng, GEOCODE_SOURCE_API, attempts=1)
+    upgraded["updated"] = None
+    return upgraded
+
+def location_entry_coords(entry):
+    """
+    Return (lat, lng) from a cache entry in either format.
+    """
+    if isinstance(entry, dict):
+        return entry.get("lat"), entry.get("lng")
+    if not entry:
+        return None, None
+    return entry[0], entry[1]
+
+def reject_location_entry(lat, lng, attempts):
+    """
+    Build a failed entry for coordinates rejected by the geofence.
+
+    The entry is due for a retry immediately ('updated' is None); the retry
+    restricts the API to the village's bounds (see geocode_location).
+    """
+    entry = make_location_entry(None, None, GEOCODE_SOURCE_API, attempts=max(attempts, 1))
+    entry["updated"] = None
+    entry["geofence"] = GEOFENCE_OUTSIDE
+    entry["rejected"] = [lat, lng]
+    return entry
+
+def geocode_retry_due(entry, now=None):
+    """
+    Whether a failed cache entry is due for another geocoding attempt.
+
+    Args:
+        entry (list, tuple or dict): Cached value.
+        now (float): UNIX timestamp (defaults to time.time()).
+
+    Returns:
+        bool: False for successful entries; True once the backoff has elapsed.
+    """
+    entry = upgrade_location_entry(entry)
+    if entry["status"] == GEOCODE_STATUS_OK:
+        return False
+    if entry.get("updated") is None:
+        return True
+    now = time.time() if now is None else now
+    attempts = max(1, entry.get("attempts", 1))
+    delay_sec = min(
+        GEOCODE_RETRY_BASE_HOURS * 3600 * 2 ** (attempts - 1),
+        GEOCODE_RETRY_MAX_DAYS * 86400
+    )
+    return now - entry["updated"] >= delay_sec
+
+def schedule_geocode_retries(location_cache, limit=None, now=None):
+    """
+    Pick the failed cache entries to retry this run.
+
+    Due entries are ordered by fewest previous attempts (most likely to
+    succeed), then by oldest attempt.
+
+    Args:
+        location_cache (dict): Location cache.
+        limit (int): Maximum number of keys to return (None = all due).
+        now (float): UNIX timestamp (defaults to time.time()).
+
+    Returns:
+        list of str: Cache keys to retry, highest priority first.
+    """
+    due = []
+    for key, entry in location_cache.items():
+        if geocode_retry_due(entry, now):
+            entry = upgrade_location_entry(entry)
+            due.append((entry.get("attempts", 1), entry.get("updated") or 0, key))
+    due.sort()
+    keys = [key for _, _, key in due]
+    return keys if limit is None else keys[:limit]
+
+def cached_location_coords(normalized_loc_str, location_cache, reprocess_locs=False):
+    """
+    Coordinates to use from the cache without an API call.
+
+    Cached successes are final; cached failures are reused until their
+    retry backoff has elapsed.
+
+    Args:
+        normalized_loc_str (str): Cache key for the location.
+        location_cache (dict): Location cache.
+        reprocess_locs (bool): Flag to force reprocessing of locations.
+
+    Returns:
+        tuple or None: (lat, lng), possibly (None, None) for a failure still
+        in backoff, or None if the location should be looked up.
+    """
+    cached_entry = location_cache.get(normalized_loc_str)
+    if cached_entry is None or reprocess_locs or geocode_retry_due(cached_entry):
+        return None
+    return location_entry_coords(cached_entry)
+
+def set_geocode_budget(max_calls):
+    """
+    Set the number of geocoding API calls allowed for this run.
+
+    Args:
+        max_calls (int or None): Call budget; None removes the limit.
+    """
+    global geocode_budget
+    geocode_budget = max_calls
+
+def set_geocode_pause(seconds):
+    """
+    Set the pause before each geocoding API call (0 disables it, e.g. for
+    offline benchmarks against a fake client).
+
+    Args:
+        seconds (float): Pause in seconds.
+    """
+    global GEOCODE_PAUSE_SEC
+    GEOCODE_PAUSE_SEC = seconds
+
+def set_location_match_confidence(min_confidence):
+    """
+    Set the confidence a fuzzy cache match needs to replace an API call.
+
+    Args:
+        min_confidence (float or None): Threshold (0-1); None disables
+            fuzzy matching.
+    """
+    global location_match_confidence
+    location_match_confidence = min_confidence
+
+def set_location_match_log(log_path):
+    """
+    Set the JSONL file fuzzy matches are appended to for review.
+
+    Args:
+        log_path (str or Path or None): Review log; None only logs them.
+    """
+    global location_match_log_path
+    location_match_log_path = log_path
+
+def sync_location_matcher(location_cache):
+    """
+    The fuzzy index for this cache, with any new successful entries added.
+
+    Fuzzy-matched entries are not indexed, so matches never chain, and
+    neither are entries accepted as out of town.
+    """
+    global location_matcher, location_matcher_cache_id
+    if location_matcher is None or location_matcher_cache_id != id(location_cache):
+        location_matcher = LocationMatcher()
+        location_matcher_cache_id = id(location_cache)
+    matcher = location_matcher
+    # Snapshot first: other threads may be adding geocodes
+    for key, entry in list(location_cache.items()):
+        if key in matcher.keys:
+            continue
+        entry = upgrade_location_entry(entry)
+        if entry["status"] == GEOCODE_STATUS_OK and entry.get("source") != GEOCODE_SOURCE_FUZZY \
+                and entry.get("geofence") != GEOFENCE_OUTSIDE:
+            matcher.add(key, entry["lat"], entry["lng"])
+    return matcher
+
+def fuzzy_location_coords(loc_str, normalized_loc_str, location_cache):
+    """
+    Resolve a location from a near-identical cached one, without an API call.
+
+    A match is cached under the new key (source "fuzzy", with the matched
+    key and confidence) and appended to the review log.
+
+    Args:
+        loc_str (str): Raw location string from the PDF.
+        normalized_loc_str (str): Cache key for the location.
+        location_cache (dict): Location cache; updated in place on a match.
+
+    Returns:
+        tuple or None: (lat, lng), or None if nothing matched confidently.
+    """
+    if location_match_confidence is None:
+        return None
+    match = sync_location_matcher(location_cache).match(normalized_loc_str, location_match_confidence)
+    if match is None:
+        return None
+    matched_key, lat, lng, confidence = match
+    entry = make_location_entry(lat, lng, GEOCODE_SOURCE_FUZZY)
+    entry["matched"] = matched_key
+    entry["confidence"] = round(confidence, 3)
+    location_cache[normalized_loc_str] = entry
+    increment("geocode_fuzzy_hits")
+    logging.info(f"Matched '{loc_str}' to cached '{matched_key}' (confidence {confidence:.2f}).")
+    if location_match_log_path is not None:
+        record = {"location": loc_str, "key": normalized_loc_str, **entry}
+        try:
+            with location_match_log_lock, open(location_match_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logging.error(f"Failed to write location match log '{location_match_log_path}': {e}")
+    return lat, lng
+
+def street_points(location_cache):
+    """
+    (key, lat, lng) of the geocoded cache entries street geometry is fitted to.
+
+    Only API and CSV coordinates inside the village are used; fuzzy and
+    interpolated entries are derived from them.
+    """
+    points = []
+    for key, entry in list(location_cache.items()):
+        entry = upgrade_location_entry(entry)
+        if entry["status"] == GEOCODE_STATUS_OK and entry.get("source") in (GEOCODE_SOURCE_API, GEOCODE_SOURCE_CSV) \
+                and entry.get("geofence") != GEOFENCE_OUTSIDE:
+            points.append((key, entry["lat"], entry["lng"]))
+    return points
+
+def intersection_location_coords(loc_str, normalized_loc_str, location_cache):
+    """
+    Resolve an intersection ("harlem and lake") from cached street geometry,
+    without an API call.
+
+    Each street's centerline is fitted to the block-level points already in
+    the cache (see utils.intersections) and the crossing is cached under
+    the location's key with source "interpolated", so later runs resolve
+    it offline.
+
+    Args:
+        loc_str (str): Raw location string from the PDF.
+        normalized_loc_str (str): Cache key for the location.
+        location_cache (dict): Location cache; updated in place on success.
+
+    Returns:
+        tuple or None: (lat, lng), or None if the location is not an
+        intersection of two fitted streets.
+    """
+    streets = parse_intersection(loc_str)
+    if streets is None:
+        return None
+    geometry = get_street_geometry(lambda: street_points(location_cache), id(location_cache))
+    coords = geometry.intersect(*streets)
+    # Long streets (Harlem runs for miles) may cross outside the village
+    if coords is None or not points_in_boundary([coords[0]], [coords[1]])[0]:
+        return None
+    lat, lng = coords
+    entry = make_location_entry(lat, lng, GEOCODE_SOURCE_INTERPOLATED)
+    entry["streets"] = [name for name, _ in streets]
+    location_cache[normalized_loc_str] = entry
+    increment("geocode_intersections")
+    logging.info(f"Interpolated '{loc_str}' as the crossing of {' and '.join(entry['streets'])}: ({lat}, {lng}).")
+    return lat, lng
+
+def consume_geocode_budget():
+    """
+    Reserve one geocoding API call from the run budget.
+
+    Returns:
+        bool: True if the call may be made.
+    """
+    global geocode_budget
+    with geocode_budget_lock:
+        if geocode_budget is None:
+            return True
+        if geocode_budget <= 0:
+            return False
+        geocode_budget -= 1
+        return True
+
+def geocode_location(loc_str, normalized_loc_str, gmaps_client, location_cache):
+    """
+    Geocode via the API within the run budget and record the attempt.
+
+    Intersections of streets known from the cache (see
+    intersection_location_coords) and confident fuzzy matches against the
+    cache (see fuzzy_location_coords) are used instead of the API.
+
+    API results outside the village boundary are rejected and queued for a
+    retry restricted to the village's bounds, unless the location names
+    another town. If the restricted retry still lands outside, the result
+    is accepted and flagged as out of town.
+
+    Args:
+        loc_str (str): Raw location string from the PDF.
+        normalized_loc_str (str): Cache key for the location.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client.
+        location_cache (dict): Location cache; updated in place.
+
+    Returns:
+        tuple: (lat, lng), or the previously cached (possibly None) coordinates
+        when the budget is exhausted.
+    """
+    crossing = intersection_location_coords(loc_str, normalized_loc_str, location_cache)
+    if crossing is not None:
+        return crossing
+    matched = fuzzy_location_coords(loc_str, normalized_loc_str, location_cache)
+    if matched is not None:
+        return matched
+
+    previous = location_cache.get(normalized_loc_str)
+    if not consume_geocode_budget():
+        logging.info(f"Geocoding budget exhausted; not looking up '{loc_str}'.")
+        return location_entry_coords(previous)
+
+    if GEOCODE_PAUSE_SEC:
+        time.sleep(GEOCODE_PAUSE_SEC)
+    previous = upgrade_location_entry(previous) if previous is not None else {}
+    queued = "rejected" in previous
+    lat, lng = get_lat_long(loc_str, gmaps_client, bounds=boundary_bounds() if queued else None)
+    attempts = previous.get("attempts", 0) + 1
+    entry = make_location_entry(lat, lng, GEOCODE_SOURCE_API, attempts)
+    if lat is not None and lng is not None and not points_in_boundary([lat], [lng])[0]:
+        if queued or names_other_town(loc_str):
+            entry["geofence"] = GEOFENCE_OUTSIDE
+        else:
+            logging.warning(f"Geocode of '{loc_str}' ({lat}, {lng}) is outside Oak Park; queued for a retry.")
+            increment("geofence_rejected")
+            entry = reject_location_entry(lat, lng, attempts)
+            lat, lng = None, None
+    location_cache[normalized_loc_str] = entry
+    return lat, lng
+
+def retry_failed_geocodes(location_cache, gmaps_client, limit=None):
+    """
+    Spend the remaining run budget on due failed entries.
+
+    The cache key is the only location string available here, which is the
+    normalized form; get_lat_long handles it the same way as raw strings.
+
+    Args:
+        location_cache (dict): Location cache; updated in place.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client.
+        limit (int): Maximum retries (defaults to the remaining budget).
+
+    Returns:
+        int: Number of entries that now have coordinates.
+    """
+    if limit is None:
+        limit = geocode_budget
+    resolved = 0
+    for key in schedule_geocode_retries(location_cache, limit):
+        if geocode_budget is not None and geocode_budget <= 0:
+            break
+        lat, lng = geocode_location(key, key, gmaps_client, location_cache)
+        if lat is not None and lng is not None:
+            resolved += 1
+    return resolved
+
+def validate_location_cache(location_cache):
+    """
+    Check every successful cache entry against the village boundary.
+
+    All coordinates are tested in one vectorized call. Entries outside are
+    flagged as out of town when their key names another town, and
+    otherwise rejected and queued for a bounded re-geocode (see
+    reject_location_entry). Entries already flagged are skipped.
+
+    Args:
+        location_cache (dict): Location cache; updated in place.
+
+    Returns:
+        tuple: (entries queued for re-geocoding, entries accepted as out of town)
+    """
+    keys, lats, lngs = [], [], []
+    for key, entry in location_cache.items():
+        entry = upgrade_location_entry(entry)
+        if entry["status"] == GEOCODE_STATUS_OK and entry.get("geofence") != GEOFENCE_OUTSIDE:
+            keys.append(key)
+            lats.append(entry["lat"])
+            lngs.append(entry["lng"])
+    if not keys:
+        return 0, 0
+    inside = points_in_boundary(lats, lngs)
+    queued = accepted = 0
+    for key, lat, lng, ok in zip(keys, lats, lngs, inside):
+        if ok:
+            continue
+        entry = upgrade_location_entry(location_cache[key])
+        if names_other_town(key):
+            entry["geofence"] = GEOFENCE_OUTSIDE
+            location_cache[key] = entry
+            accepted += 1
+        else:
+            location_cache[key] = reject_location_entry(lat, lng, entry.get("attempts", 0))
+            queued += 1
+    return queued, accepted
+
+def validate_dataset_coordinates(df, location_cache):
+    """
+    Flag dataset rows whose coordinates fall outside the village.
+
+    Sets a 'Geofence' column: "inside", "outside" (out of town, or not
+    checked against the cache), "rejected" (the cache has queued the
+    location for a re-geocode; its coordinates are cleared and Loc set to
+    0 until then) or "" (no coordinates). Rows whose location has since
+    been re-geocoded inside the village take the cached coordinates.
+
+    Args:
+        df (DataFrame): Dataset with 'Location', 'Lat', 'Long' and 'Loc' columns.
+        location_cache (dict): Location cache, validated first (see
+            validate_location_cache).
+
+    Returns:
+        dict: Row counts per 'Geofence' value.
+    """
+    # Only called with a DataFrame, so pandas is already loaded
+    import pandas as pd
+
+    lats = pd.to_numeric(df["Lat"], errors="coerce")
+    lngs = pd.to_numeric(df["Long"], errors="coerce")
+    inside = points_in_boundary(lats, lngs)
+    located = (lats.notna() & lngs.notna()).to_numpy()
+    geofence = np.where(inside, "inside", np.where(located, GEOFENCE_OUTSIDE, "")).astype(object)
+
+    outliers = np.flatnonzero(located & ~inside)
+    for position, key in zip(outliers, df["Location"].iloc[outliers].map(normalize_location)):
+        entry = location_cache.get(key)
+        if entry is None:
+            continue
+        entry = upgrade_location_entry(entry)
+        if "rejected" in entry:
+            geofence[position] = "rejected"
+        elif entry["status"] == GEOCODE_STATUS_OK and entry.get("geofence") != GEOFENCE_OUTSIDE:
+            # Re-geocoded inside the village since the row was written
+            lats.iat[position], lngs.iat[position] = entry["lat"], entry["lng"]
+            geofence[position] = "inside"
+    rejected = geofence == "rejected"
+    df["Lat"] = lats.mask(rejected)
+    df["Long"] = lngs.mask(rejected)
+    df.loc[rejected, "Loc"] = 0
+    df["Geofence"] = geofence
+    return pd.Series(geofence).value_counts().to_dict()
+
+def backfill_coordinates(df, location_cache):
+    """
+    Fill Lat/Long for rows without coordinates whose location has since been
+    geocoded (e.g., by a scheduled retry) or is an intersection of streets
+    known from the cache.
+
+    Args:
+        df (DataFrame): Dataset with 'Location', 'Lat', 'Long' and 'Loc' columns.
+        location_cache (dict): Location cache; intersections resolved here
+            are added to it.
+
+    Returns:
+        int: Number of rows filled in place.
+    """
+    missing = df["Lat"].isna() | df["Long"].isna()
+    if not missing.any():
+        return 0
+    locations = df.loc[missing, "Location"]
+    keys = locations.map(normalize_location)
+    coords = {key: location_entry_coords(location_cache[key]) for key in keys.unique() if key in location_cache}
+    for loc_str, key in zip(locations, keys):
+        if None in coords.get(key, (None, None)):
+            crossing = intersection_location_coords(loc_str, key, location_cache)
+            if crossing is not None:
+                coords[key] = crossing
+    lats = keys.map(lambda key: coords.get(key, (None, None))[0])
+    lngs = keys.map(lambda key: coords.get(key, (None, None))[1])
+    filled = lats.notna() & lngs.notna()
+    idx = filled[filled].index
+    df.loc[idx, "Lat"] = lats[idx]
+    df.loc[idx, "Long"] = lngs[idx]
+    df.loc[idx, "Loc"] = 1
+    return len(idx)
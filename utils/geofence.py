@@ -0,0 +1,139 @@
+# utils/geofence.py
+
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from utils.intersections import LOCATION_TAIL_RE
+
+# Bundled village boundary (GeoJSON polygon, [lng, lat] positions)
+BOUNDARY_PATH = Path(__file__).resolve().parent.parent / "data" / "oak_park_boundary.geojson"
+# Points this close outside the boundary still count as inside: the border
+# streets' own blocks geocode to either side of the centerline
+GEOFENCE_BUFFER_M = 150.0
+METERS_PER_DEGREE = 111320.0
+
+# Locations naming another town are expected to geocode outside the village:
+# any ", <place>" that is neither Oak Park nor the state ("..., oak park, il"
+# is in town), or a neighboring town's name ending the location, optionally
+# followed by the state ("... pulaski chicago", "... harlem berwyn il"), but
+# not a street named after one: "200 block of chicago", or Chicago Ave as the
+# second street of an intersection ("ridgeland and chicago", "harlem/chicago")
+OTHER_TOWN_RE = re.compile(
+    r",\s*(?!oak park\b|il\b)[a-z]"
+    r"|(?<!\bof)(?<!\bblock)(?<![\d\s])(?:(?<!\band)(?<!&)(?<!/)(?<!\bat)|(?!\s+chicago\b))\s+"
+    r"(?:chicago|forest park|river forest|elmwood park|berwyn|cicero|maywood|melrose park|bellwood|"
+    r"broadview|hillside|westchester|berkeley|riverside|evanston|park ridge|glen ellyn)"
+    r"(?:\s*,?\s*il\b)?\s*\.?$"
+)
+
+# Boundary ring loaded from BOUNDARY_PATH on first use
+boundary = None
+boundary_lock = threading.Lock()
+
+
+def load_boundary(boundary_path=BOUNDARY_PATH):
+    """
+    Read the outer ring of the first polygon in a GeoJSON file.
+
+    Args:
+        boundary_path (Path): GeoJSON FeatureCollection, Feature or Polygon.
+
+    Returns:
+        ndarray: (n, 2) ring of (lat, lng) vertices.
+    """
+    with Path(boundary_path).open('r', encoding='utf-8') as f:
+        geojson = json.load(f)
+    if geojson.get("type") == "FeatureCollection":
+        geojson = geojson["features"][0]
+    if geojson.get("type") == "Feature":
+        geojson = geojson["geometry"]
+    if geojson.get("type") == "MultiPolygon":
+        ring = geojson["coordinates"][0][0]
+    else:
+        ring = geojson["coordinates"][0]
+    return np.array(ring, dtype=float)[:, ::-1]
+
+
+def get_boundary():
+    """
+    The village boundary ring, loaded from the bundled file once.
+    """
+    global boundary
+    with boundary_lock:
+        if boundary is None:
+            boundary = load_boundary()
+            logging.debug(f"Loaded village boundary ({len(boundary)} vertices) from '{BOUNDARY_PATH}'.")
+        return boundary
+
+
+def boundary_bounds(ring=None):
+    """
+    Bounding box of the boundary, as googlemaps' geocode(bounds=...) takes it.
+    """
+    ring = get_boundary() if ring is None else ring
+    return {
+        "southwest": (float(ring[:, 0].min()), float(ring[:, 1].min())),
+        "northeast": (float(ring[:, 0].max()), float(ring[:, 1].max())),
+    }
+
+
+def points_in_boundary(lats, lngs, ring=None, buffer_m=GEOFENCE_BUFFER_M):
+    """
+    Which points fall inside the boundary (or within buffer_m of it).
+
+    All points are tested in one pass: even-odd ray casting against every
+    edge at once, plus the distance to every edge for the buffer, on local
+    meter coordinates.
+
+    Args:
+        lats (array-like): Latitudes (NaN for missing).
+        lngs (array-like): Longitudes (NaN for missing).
+        ring (ndarray): (n, 2) (lat, lng) ring (defaults to the bundled
+            village boundary).
+        buffer_m (float): Tolerance outside the boundary in meters.
+
+    Returns:
+        ndarray of bool: One flag per point; missing coordinates are False.
+    """
+    ring = get_boundary() if ring is None else np.asarray(ring, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    origin = ring.mean(axis=0)
+    scale = np.array([METERS_PER_DEGREE, METERS_PER_DEGREE * np.cos(np.radians(origin[0]))])
+
+    # (points, 1) against (1, edges)
+    y = ((lats - origin[0]) * scale[0])[:, None]
+    x = ((lngs - origin[1]) * scale[1])[:, None]
+    vertices = (ring - origin) * scale
+    y0, x0 = vertices[:, 0][None, :], vertices[:, 1][None, :]
+    y1, x1 = np.roll(y0, -1, axis=1), np.roll(x0, -1, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Horizontal edges never straddle y, so their division is masked out
+        crosses = ((y0 > y) != (y1 > y)) & (x < (x1 - x0) * (y - y0) / (y1 - y0) + x0)
+    inside = crosses.sum(axis=1) % 2 == 1
+
+    if buffer_m:
+        dx, dy = x1 - x0, y1 - y0
+        length_sq = np.where(dx ** 2 + dy ** 2 > 0, dx ** 2 + dy ** 2, 1.0)
+        t = np.clip(((x - x0) * dx + (y - y0) * dy) / length_sq, 0.0, 1.0)
+        distance = np.hypot(x - (x0 + t * dx), y - (y0 + t * dy)).min(axis=1)
+        inside |= distance <= buffer_m
+    return inside & ~(np.isnan(lats) | np.isnan(lngs))
+
+
+def names_other_town(loc_str):
+    """
+    Whether a location string names a town other than Oak Park.
+
+    Text after the location (victim field, business name) is ignored, so
+    "... VICTIM/ADDRESS: CHICAGO RESIDENT" does not count.
+    """
+    if not isinstance(loc_str, str):
+        return False
+    return OTHER_TOWN_RE.search(LOCATION_TAIL_RE.sub("", loc_str.lower())) is not None
@@ -0,0 +1,427 @@
+# utils/git.py
+
+import os
+import re
+import sys
+import shutil
+import logging
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import urlparse, urlunparse
+
+def extract_year(filename, start_year=2017, end_year=2030):
+    """
+    Extracts a four-digit year from the filename.
+    Returns the year as a string if found and within the range.
+    Returns None otherwise.
+    """
+    match = re.search(r'(20[1][7-9]|20[2][0-9]|2030)', filename)
+    if match:
+        return match.group(0)
+    return None
+
+def get_file_sha(repo_owner, repo_name, file_path, github_pat):
+    """
+    Checks if a file exists in the repository and returns its SHA if it does.
+
+    Args:
+        repo_owner (str): GitHub username or organization.
+        repo_name (str): Repository name.
+        file_path (str): Path to the file within the repository.
+        github_pat (str): Personal Access Token for authentication.
+
+    Returns:
+        str or None: SHA of the file if it exists, else None.
+    """
+    # Imported here so the git helpers load without the HTTP stack
+    import requests
+
+    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
+    headers = {"Authorization": f"token {github_pat}"}
+    
+    response = requests.get(api_url, headers=headers)
+    
+    if response.status_code == 200:
+        file_info = response.json()
+        return file_info.get('sha')
+    elif response.status_code == 404:
+        return None
+    else:
+        logging.error(f"Failed to check file existence: {response.status_code} - {response.text}")
+        print(f"[ERROR] Failed to check file existence: {response.status_code} - {response.text}")
+        return None
+
+# def upload_file_to_github(file_path, github_repo_path, target_subfolder):
+#     """
+#     Uploads a specified file to a target subfolder within the GitHub repository
+#     using the GitHub API and Personal Access Token (PAT).
+
+#     Args:
+#         file_path (Path): Path to the file to upload.
+#         github_repo_path (Path): Path to the local GitHub repository (not used in API method).
+#         target_subfolder (str): Subfolder within the repository where the file will be placed.
+#     """
+#     try:
+#         GITHUB_PAT = os.getenv("GITHUB_PAT")
+#         if not GITHUB_PAT:
+#             raise ValueError("GITHUB_PAT not found in environment variables.")
+
+#         repo_owner = "jesse-anderson"  # Replace with your GitHub username or organization
+#         repo_name = "jesse-anderson.github.io"  # Replace with your repository name
+
+#         # Define target path within the repository
+#         target_path = f"{target_subfolder}/{file_path.name}"
+
+#         # Check if the file already exists to determine if it's an update or create operation
+#         existing_sha = get_file_sha(repo_owner, repo_name, target_path, GITHUB_PAT)
+
+#         with open(file_path, 'rb') as f:
+#             content = f.read()
+
+#         encoded_content = base64.b64encode(content).decode('utf-8')
+
+#         commit_message = f"Add {'update' if existing_sha else 'new'} file {file_path.name} on {datetime.now().strftime('%Y-%m-%d')}"
+
+#         data = {
+#             "message": commit_message,
+#             "content": encoded_content,
+#             "branch": "main"
+#         }
+
+#         if existing_sha:
+#             data["sha"] = existing_sha  # Include sha if updating an existing file
+
+#         api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{target_path}"
+#         headers = {"Authorization": f"token {GITHUB_PAT}"}
+
+#         response = requests.put(api_url, json=data, headers=headers)
+
+#         if response.status_code in [200, 201]:
+#             action = "updated" if existing_sha else "created"
+#             logging.info(f"Successfully {action} {file_path.name} to GitHub.")
+#             print(f"Successfully {action} {file_path.name} to GitHub.")
+#         else:
+#             logging.error(f"Failed to upload {file_path.name} to GitHub. Status Code: {response.status_code}")
+#             print(f"Failed to upload {file_path.name} to GitHub. Status Code: {response.status_code}")
+#             print(response.json())
+
+#     except Exception as e:
+#         logging.error(f"Failed to upload {file_path.name} to GitHub: {e}")
+#         print(f"[ERROR] Could not upload {file_path.name} to GitHub: {e}")
+
+# def upload_files_to_github_batch(file_paths, github_repo_path, target_subfolder):
+#     """
+#     Uploads multiple files to a target subfolder within the GitHub repository
+#     using the GitHub API and Personal Access Token (PAT).
+#     """
+#     try:
+#         logging.info(f"Starting batch upload for files: {[str(fp) for fp in file_paths]}")
+#         print(f"Starting batch upload for files: {[str(fp) for fp in file_paths]}")
+
+#         # Define target directory and ensure it exists
+#         target_dir = Path(target_subfolder)
+#         for file_path in file_paths:
+#             upload_file_to_github(file_path, github_repo_path, target_subfolder)
+
+#     except Exception as e:
+#         logging.error(f"Failed to upload files to GitHub: {e}")
+#         print(f"[ERROR] Could not upload files to GitHub: {e}")
+
+def abort_incomplete_rebase(repo_path):
+    """
+    Aborts any ongoing rebase in the specified repository.
+    
+    Args:
+        repo_path (Path): Path to the local Git repository.
+    """
+    rebase_merge = repo_path / ".git" / "rebase-merge"
+    if rebase_merge.exists():
+        logging.warning("Detected an incomplete rebase. Aborting it.")
+        print("Detected an incomplete rebase. Aborting it.")
+        run_subprocess(['git', '-C', str(repo_path), 'rebase', '--abort'])
+
+
+def run_subprocess(command, check=True):
+    """
+    Runs a subprocess command and returns the result.
+
+    Args:
+        command (list): The command and its arguments to execute.
+        check (bool): If True, raises CalledProcessError on non-zero exit.
+
+    Returns:
+        subprocess.CompletedProcess: The result of the subprocess execution.
+    """
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=check)
+        logging.debug(f"Command {' '.join(command)} executed successfully.")
+        return result
+    except subprocess.CalledProcessError as e:
+        error_message = e.stderr.strip()
+        logging.error(f"Command {' '.join(command)} failed with error: {error_message}")
+        print(f"Error: Command {' '.join(command)} failed with error: {error_message}")
+        
+        # Specific handling for rebase-merge directory issue
+        if "rebase-merge" in error_message:
+            repo_path = Path(command[2])  # Assuming 'git -C <repo_path> ...'
+            abort_incomplete_rebase(repo_path)
+            # Retry the command once after aborting
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, check=check)
+                logging.debug(f"Command {' '.join(command)} executed successfully after aborting rebase.")
+                return result
+            except subprocess.CalledProcessError as e_retry:
+                logging.error(f"Retrying command {' '.join(command)} failed with error: {e_retry.stderr.strip()}")
+                print(f"Error: Retrying command {' '.join(command)} failed with error: {e_retry.stderr.strip()}")
+                raise
+        else:
+            raise
+    except Exception as e:
+        logging.error(f"Unexpected error running command {' '.join(command)}: {e}")
+        print(f"Error: Unexpected error running command {' '.join(command)}: {e}")
+        raise
+
+
+def git_commit_and_force_push(repo_path, commit_message):
+    """
+    Stages all changes, commits with the provided message, and force pushes
+    to the remote repository.
+
+    Args:
+        repo_path (Path): Path to the local Git repository.
+        commit_message (str): Commit message.
+    """
+    try:
+        logging.info("Starting git_commit_and_force_push process.")
+        print("Starting git_commit_and_force_push process.")
+
+        # Verify that repo_path exists and is a directory
+        if not repo_path.exists() or not repo_path.is_dir():
+            logging.error(f"Repository path '{repo_path}' does not exist or is not a directory.")
+            print(f"Error: Repository path '{repo_path}' does not exist or is not a directory.")
+            return
+
+        # Stage all changes
+        run_subprocess(['git', '-C', str(repo_path), 'add', '-A'])
+        logging.info("Staged all changes.")
+        print("Staged all changes.")
+
+        # Check if there are any changes to commit
+        status_result = run_subprocess(['git', '-C', str(repo_path), 'status', '--porcelain'])
+        if not status_result.stdout.strip():
+            logging.info("No changes to commit.")
+            print("No changes to commit.")
+            return
+
+        # Commit changes
+        run_subprocess(['git', '-C', str(repo_path), 'commit', '-m', commit_message])
+        logging.info(f"Committed changes with message: '{commit_message}'.")
+        print(f"Committed changes with message: '{commit_message}'.")
+
+        # Get the original remote URL
+        original_remote_result = run_subprocess(['git', '-C', str(repo_path), 'remote', 'get-url', 'origin'])
+        original_remote_url = original_remote_result.stdout.strip()
+        logging.debug(f"Original remote URL: {original_remote_url}")
+        print("Original remote URL retrieved.")
+
+        # Determine if the remote URL is HTTPS or SSH
+        if original_remote_url.startswith("https://"):
+            auth_method = "https"
+            logging.debug("Authentication method detected: HTTPS with PAT.")
+        elif original_remote_url.startswith("git@") or original_remote_url.startswith("ssh://"):
+            auth_method = "ssh"
+            logging.debug("Authentication method detected: SSH.")
+        else:
+            logging.error("Unsupported remote URL format.")
+            print("Error: Unsupported remote URL format.")
+            return
+
+        # If HTTPS, modify remote URL to include PAT and username
+        if auth_method == "https":
+            github_username = os.getenv("GITHUB_USERNAME")
+            github_pat = os.getenv("GITHUB_PAT")
+
+            if not github_username:
+                logging.error("GITHUB_USERNAME not found in environment variables.")
+                print("Error: GITHUB_USERNAME not found in environment variables.")
+                return
+
+            if not github_pat:
+                logging.error("GITHUB_PAT not found in environment variables.")
+                print("Error: GITHUB_PAT not found in environment variables.")
+                return
+
+            # Encode username and PAT
+            github_username_encoded = github_username
+            github_pat_encoded = github_pat
+
+            # Parse the original URL to safely inject credentials
+            parsed_url = urlparse(original_remote_url)
+            netloc = f"{github_username_encoded}:{github_pat_encoded}@{parsed_url.hostname}"
+            if parsed_url.port:
+                netloc += f":{parsed_url.port}"
+            remote_with_credentials = urlunparse(parsed_url._replace(netloc=netloc))
+
+            logging.debug(f"Modified remote URL with credentials: {remote_with_credentials}")
+            print("Remote URL updated with credentials.")
+
+            # Set the remote URL with credentials
+            run_subprocess(['git', '-C', str(repo_path), 'remote', 'set-url', 'origin', remote_with_credentials])
+
+        # Force push to remote
+        run_subprocess(['git', '-C', str(repo_path), 'push', 'origin', 'main', '--force'])
+        logging.info("Force pushed changes to remote repository.")
+        print("Force pushed changes to remote repository.")
+
+        # Restore the original remote URL if it was modified
+        if auth_method == "https":
+            run_subprocess(['git', '-C', str(repo_path), 'remote', 'set-url', 'origin', original_remote_url])
+            logging.debug("Restored original remote URL.")
+            print("Restored original remote URL.")
+
+    except Exception as e:
+        logging.error(f"Failed during git_commit_and_force_push: {e}")
+        print(f"Error: Failed during git_commit_and_force_push: {e}")
+        sys.exit(1)
+
+
+def upload_files_via_git(repo_path, files_to_upload, target_subfolder):
+    """
+    Copies files to the target subfolder within the local repository and commits & pushes the changes.
+
+    Args:
+        repo_path (Path): Path to the local Git repository.
+        files_to_upload (list of Path): List of file paths to upload.
+        target_subfolder (str): Subfolder within the repository where files will be placed.
+    """
+    try:
+        logging.info("Starting the upload_files_via_git process.")
+        print("Starting the upload_files_via_git process.")
+
+        # Ensure the repository path exists
+        if not repo_path.exists() or not repo_path.is_dir():
+            logging.error(f"Repository path '{repo_path}' does not exist or is not a directory.")
+            print(f"Error: Repository path '{repo_path}' does not exist or is not a directory.")
+            return
+
+        # Define target directory within the repository
+        target_dir = repo_path / target_subfolder
+        target_dir.mkdir(parents=True, exist_ok=True)
+        logging.info(f"Ensured that target directory '{target_dir}' exists.")
+        print(f"Ensured that target directory '{target_dir}' exists.")
+
+        # Copy each file to the target directory
+        for file_path in files_to_upload:
+            if not file_path.exists() or not file_path.is_file():
+                logging.warning(f"File '{file_path}' does not exist or is not a file. Skipping.")
+                print(f"Warning: File '{file_path}' does not exist or is not a file. Skipping.")
+                continue
+
+            target_file = target_dir / file_path.name
+
+            try:
+                shutil.copy2(file_path, target_file)
+                logging.info(f"Copied '{file_path}' to '{target_file}'.")
+                print(f"Copied '{file_path}' to '{target_file}'.")
+            except Exception as copy_error:
+                logging.error(f"Failed to copy '{file_path}' to '{target_file}': {copy_error}")
+                print(f"Error: Could not copy '{file_path}' to '{target_file}': {copy_error}")
+                continue  # Proceed with other files
+
+        # Prepare commit message
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        commit_message = f"Add/update files in '{target_subfolder}' on {timestamp}"
+        logging.info(f"Prepared commit message: '{commit_message}'")
+        print(f"Prepared commit message: '{commit_message}'")
+
+        # Commit and push changes using the existing git_commit_and_push function
+        git_commit_and_push(repo_path, commit_message)
+
+    except Exception as e:
+        logging.error(f"Unexpected error in upload_files_via_git: {e}")
+        print(f"Error: Unexpected error in upload_files_via_git: {e}")
+
+def upload_files(repo_path, files_to_upload, target_subfolder):
+    """
+    Copies specified files to the target subfolder within the local Git repository.
+
+    Args:
+        repo_path (Path): Path to the local Git repository.
+        files_to_upload (list of Path): List of file paths to upload.
+        target_subfolder (str): Subfolder within the repository where files will be placed.
+    """
+    try:
+        logging.info(f"Uploading files to '{target_subfolder}'.")
+        print(f"Uploading files to '{target_subfolder}'.")
+        
+        # Define target directory
+        target_dir = repo_path / target_subfolder
+        target_dir.mkdir(parents=True, exist_ok=True)
+        logging.debug(f"Ensured target directory '{target_dir}' exists.")
+        print(f"Ensured target directory '{target_dir}' exists.")
+
+        # Copy each file
+        for file_path in files_to_upload:
+            if not file_path.exists() or not file_path.is_file():
+                logging.warning(f"File '{file_path}' does not exist or is not a file. Skipping.")
+                print(f"Warning: File '{file_path}' does not exist or is not a file. Skipping.")
+                continue
+
+            destination = target_dir / file_path.name
+            try:
+                shutil.copy2(file_path, destination)
+                logging.info(f"Copied '{file_path}' to '{destination}'.")
+                print(f"Copied '{file_path}' to '{destination}'.")
+            except Exception as e:
+                logging.error(f"Failed to copy '{file_path}' to '{destination}': {e}")
+                print(f"Error: Could not copy '{file_path}' to '{destination}': {e}")
+    except Exception as e:
+        logging.error(f"Unexpected error during file upload: {e}")
+        print(f"Error: Unexpected error during file upload: {e}")
+        raise        
+
+def synchronize_repository(repo_path):
+    """
+    Pulls the latest changes from the remote repository to synchronize the local repository.
+    
+    Args:
+        repo_path (Path): Path to the local Git repository.
+    """
+    try:
+        logging.info("Synchronizing local repository with remote.")
+        print("Synchronizing local repository with remote.")
+        
+        # Abort any incomplete rebase
+        abort_incomplete_rebase(repo_path)
+
+        # Stage + stash any changes
+        stash_command = ['git', '-C', str(repo_path), 'stash', 'push', '-u', '-m', 'Auto-stash before pull']
+        stash_result = subprocess.run(stash_command, capture_output=True, text=True)
+        if stash_result.returncode != 0:
+            logging.warning(f"Could not stash changes automatically. Output: {stash_result.stderr.strip()}")
+            print(f"Warning: Could not stash changes automatically. Output: {stash_result.stderr.strip()}")
+
+        pull_result = run_subprocess(
+            ['git', '-C', str(repo_path), 'pull', 'origin', 'main', '--rebase']
+        )
+        if pull_result.returncode != 0:
+            logging.error(f"Failed to synchronize repository: {pull_result.stderr.strip()}")
+            print(f"Error: Failed to synchronize repository: {pull_result.stderr.strip()}")
+            sys.exit(1)
+        else:
+            logging.info("Repository synchronized successfully.")
+            print("Repository synchronized successfully.")
+
+        # Attempt to pop the stash
+        pop_command = ['git', '-C', str(repo_path), 'stash', 'pop']
+        pop_result = subprocess.run(pop_command, capture_output=True, text=True)
+        if pop_result.returncode != 0:
+            # This might indicate there were no stashes to pop or a conflict occurred
+            logging.warning(f"Could not pop stashed changes. Output: {pop_result.stderr.strip()}")
+            print(f"Warning: Could not pop stashed changes. Output: {pop_result.stderr.strip()}")
+
+    except Exception as e:
+        logging.error(f"Unexpected error during repository synchronization: {e}")
+        print(f"Error: Unexpected error during repository synchronization: {e}")
+        sys.exit(1)
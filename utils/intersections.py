@@ -0,0 +1,224 @@
+# utils/intersections.py
+
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from utils.locations import normalize_location
+from utils.location_match import decompose_location, split_street
+
+# Meters per degree of latitude; longitude degrees are scaled by cos(lat)
+METERS_PER_DEGREE = 111320.0
+# Points farther than this from a street's line do not belong to it
+STREET_MAX_RESIDUAL_M = 80.0
+# A street needs this many points spanning this length to be fitted
+STREET_MIN_POINTS = 3
+STREET_MIN_LENGTH_M = 300.0
+# An intersection may lie this far past the last known block of each street
+STREET_EXTEND_M = 800.0
+# Streets crossing at less than this angle (sine) are treated as parallel
+MIN_CROSSING_SINE = 0.5
+
+# "lake & east", "randolph st / s east ave", "harlem and lake", "lake at east"
+INTERSECTION_SPLIT_RE = re.compile(r"\s*(?:&|/|\band\b|\bat\b)\s*")
+# Text after the location: victim field, department footer, business name
+LOCATION_TAIL_RE = re.compile(r"\s*(?:\(|\s[-–—]\s|vict\s?im|oak park police).*$")
+# A block or house number in front of a street ("300 block of south scoville")
+STREET_NUMBER_RE = re.compile(r"^\d[\d\s-]*(?:bloc\s?k\s*(?:of\s+)?)?")
+
+
+def parse_intersection(loc_str):
+    """
+    Street names of an intersection location.
+
+    A trailing ", <city>" other than Oak Park means the intersection is out
+    of town, so it is not parsed.
+
+    Args:
+        loc_str (str): Raw location string from the PDF.
+
+    Returns:
+        tuple or None: ((name, suffix), (name, suffix)) of the two streets
+        as produced by split_street (suffix None when absent), or None if
+        the location is not a two-street intersection in Oak Park.
+    """
+    if not isinstance(loc_str, str):
+        return None
+    text = LOCATION_TAIL_RE.sub("", loc_str.lower())
+    text, _, city = text.partition(",")
+    if city.strip(" .") and "oak park" not in city:
+        return None
+    parts = INTERSECTION_SPLIT_RE.split(text.strip())
+    if len(parts) != 2:
+        return None
+    streets = []
+    for part in parts:
+        _, name, suffix = split_street(normalize_location(STREET_NUMBER_RE.sub("", part.strip())))
+        if not name or any(ch.isdigit() for ch in name):
+            return None
+        streets.append((name, suffix))
+    if streets[0][0] == streets[1][0]:
+        return None
+    return tuple(streets)
+
+
+def fit_street(points):
+    """
+    Fit a street's centerline to its block-level points.
+
+    Every line through two of the (distinct) points is scored by how many
+    points lie within STREET_MAX_RESIDUAL_M of it; the best line's inliers
+    are then refitted by total least squares (their principal axis). Bad
+    geocodes and same-named streets elsewhere fall outside the consensus.
+
+    Args:
+        points (ndarray): (n, 2) local x/y coordinates in meters.
+
+    Returns:
+        tuple or None: (center, direction, t_min, t_max, inliers), the line
+        through center along the unit vector direction covering parameters
+        t_min..t_max, and the mask of points used; None if too few points
+        agree or they span too short a stretch.
+    """
+    unique = np.unique(points, axis=0)
+    if len(unique) < STREET_MIN_POINTS:
+        return None
+    first, second = np.triu_indices(len(unique), k=1)
+    directions = unique[second] - unique[first]
+    lengths = np.hypot(*directions.T)
+    keep = lengths >= STREET_MAX_RESIDUAL_M
+    if not keep.any():
+        return None
+    first, directions = first[keep], directions[keep] / lengths[keep, None]
+    normals = np.column_stack([-directions[:, 1], directions[:, 0]])
+    # (lines, points) distances of every point from every candidate line
+    distances = np.abs(((points[None, :, :] - unique[first][:, None, :]) * normals[:, None, :]).sum(axis=2))
+    inliers = distances[np.argmax((distances <= STREET_MAX_RESIDUAL_M).sum(axis=1))] <= STREET_MAX_RESIDUAL_M
+
+    fitted = points[inliers]
+    if len(np.unique(fitted, axis=0)) < STREET_MIN_POINTS:
+        return None
+    center = fitted.mean(axis=0)
+    _, _, vt = np.linalg.svd(fitted - center, full_matrices=False)
+    direction = vt[0]
+    t = (fitted - center) @ direction
+    if t.max() - t.min() < STREET_MIN_LENGTH_M:
+        return None
+    return center, direction, t.min() - STREET_EXTEND_M, t.max() + STREET_EXTEND_M, inliers
+
+
+class StreetGeometry:
+    """
+    Street centerlines fitted from geocoded block locations.
+
+    Every given cache entry that starts with a block or house number
+    contributes a point to its street, keyed by street name (direction and
+    suffix dropped). Coordinates are projected to local meters around the
+    median point, where Oak Park's straight street grid is well described
+    by one line per street. The suffixes written on a street's inliers are
+    kept, so "north boulevard" is not mistaken for North Avenue.
+    """
+
+    def __init__(self, location_points):
+        """
+        Args:
+            location_points (iterable of tuple): (cache key, lat, lng).
+        """
+        by_street = defaultdict(list)
+        for key, lat, lng in location_points:
+            parts = decompose_location(key)
+            if parts is not None and parts[3]:
+                by_street[parts[3]].append((lat, lng, parts[4]))
+
+        all_points = np.array([p[:2] for points in by_street.values() for p in points], dtype=float)
+        self.origin = np.median(all_points, axis=0) if len(all_points) else np.zeros(2)
+        self.scale = np.array([METERS_PER_DEGREE, METERS_PER_DEGREE * np.cos(np.radians(self.origin[0]))])
+        # name -> (center, direction, t_min, t_max, suffixes)
+        self.streets = {}
+        for street, points in by_street.items():
+            fitted = fit_street(self.to_local(np.array([p[:2] for p in points], dtype=float)))
+            if fitted is not None:
+                *line, inliers = fitted
+                suffixes = {p[2] for p, inlier in zip(points, inliers) if inlier and p[2]}
+                self.streets[street] = (*line, suffixes)
+
+    def to_local(self, lat_lng):
+        """
+        (lat, lng) rows -> local (x east, y north) meters.
+        """
+        north, east = ((lat_lng - self.origin) * self.scale).T
+        return np.column_stack([east, north])
+
+    def to_lat_lng(self, xy):
+        """
+        Local (x, y) meters -> (lat, lng).
+        """
+        lat, lng = np.array([xy[1], xy[0]]) / self.scale + self.origin
+        return float(lat), float(lng)
+
+    def intersect(self, street_a, street_b):
+        """
+        Where two fitted streets cross.
+
+        Args:
+            street_a (tuple): (name, suffix) from parse_intersection.
+            street_b (tuple): (name, suffix).
+
+        Returns:
+            tuple or None: (lat, lng), or None if either street is unknown
+            (or was fitted under another suffix), they are near-parallel,
+            or they would cross beyond the known stretch of either street.
+        """
+        lines = []
+        for name, suffix in (street_a, street_b):
+            if name not in self.streets:
+                return None
+            *line, suffixes = self.streets[name]
+            if suffix and suffixes and suffix not in suffixes:
+                return None
+            lines.append(line)
+        (center_a, dir_a, min_a, max_a), (center_b, dir_b, min_b, max_b) = lines
+        if abs(dir_a[0] * dir_b[1] - dir_a[1] * dir_b[0]) < MIN_CROSSING_SINE:
+            return None
+        # center_a + t_a * dir_a == center_b + t_b * dir_b
+        t_a, t_b = np.linalg.solve(np.column_stack([dir_a, -dir_b]), center_b - center_a)
+        if not (min_a <= t_a <= max_a and min_b <= t_b <= max_b):
+            return None
+        return self.to_lat_lng(center_a + t_a * dir_a)
+
+
+# Street geometry of the location cache it was built from
+street_geometry = None
+street_geometry_cache_id = None
+street_geometry_lock = threading.Lock()
+
+
+def get_street_geometry(location_points, cache_id):
+    """
+    Street geometry for a location cache, fitted once per cache.
+
+    Args:
+        location_points (callable): Returns the (key, lat, lng) points to fit.
+        cache_id (int): Identity of the location cache.
+
+    Returns:
+        StreetGeometry: The fitted streets.
+    """
+    global street_geometry, street_geometry_cache_id
+    with street_geometry_lock:
+        if street_geometry is None or street_geometry_cache_id != cache_id:
+            street_geometry = StreetGeometry(location_points())
+            street_geometry_cache_id = cache_id
+        return street_geometry
+
+
+def reset_street_geometry():
+    """
+    Drop the fitted streets so the next lookup refits them from the cache.
+    """
+    global street_geometry, street_geometry_cache_id
+    with street_geometry_lock:
+        street_geometry = None
+        street_geometry_cache_id = None
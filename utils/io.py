@@ -0,0 +1,310 @@
+# utils/io.py
+
+import os
+import json
+import hashlib
+import logging
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from pipeline_metrics import increment
+
+def load_json_cache(cache_path):
+    """
+    Load JSON cache from the specified path.
+
+    Args:
+        cache_path (Path): Path to the JSON cache file.
+
+    Returns:
+        dict: The loaded cache data.
+    """
+    cache_file = Path(cache_path)
+    if cache_file.exists():
+        try:
+            with cache_file.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"Failed to load cache '{cache_path}': {e}")
+            return {}
+    return {}
+
+def save_json_cache(cache_path, data):
+    """
+    Save JSON cache to the specified path.
+
+    The cache is written to a temporary file in the same directory and
+    renamed over the old one, so a crash mid-write leaves the previous
+    version intact.
+
+    Args:
+        cache_path (Path): Path to save the JSON cache.
+        data (dict): Data to be saved in the cache.
+    """
+    cache_file = Path(cache_path)
+    temp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        with temp_file.open('w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, cache_file)
+    except (OSError, TypeError, ValueError) as e:
+        logging.error(f"Failed to save cache '{cache_path}': {e}")
+        temp_file.unlink(missing_ok=True)
+
+def save_npz(npz_path, arrays, compressed=False):
+    """
+    Save arrays as an .npz file, replacing the old one atomically.
+
+    Like save_json_cache, the arrays are written and fsynced to a temporary
+    file in the same directory which is then renamed over the old file, so
+    a crash mid-write never leaves a truncated archive behind.
+
+    Args:
+        npz_path (Path): Destination .npz path.
+        arrays (dict): {name: array} to store.
+        compressed (bool): Deflate the members (np.savez_compressed).
+
+    Raises:
+        OSError: If the file cannot be written; the old file is kept.
+    """
+    npz_file = Path(npz_path)
+    temp_file = npz_file.with_name(f".{npz_file.name}.{os.getpid()}.tmp")
+    try:
+        with temp_file.open('wb') as f:
+            (np.savez_compressed if compressed else np.savez)(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, npz_file)
+    except OSError:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+def save_zip(zip_path, file_path, arcname):
+    """
+    Zip one file, replacing the old archive atomically.
+
+    Like save_npz, the archive is written and fsynced to a temporary file
+    in the same directory which is then renamed over the old one, so a
+    crash mid-write never leaves a truncated or empty dataset behind.
+
+    Args:
+        zip_path (Path): Destination .zip path.
+        file_path (Path): File to store.
+        arcname (str): Name of the file inside the archive.
+
+    Raises:
+        OSError: If the archive cannot be written; the old one is kept.
+    """
+    zip_file = Path(zip_path)
+    temp_file = zip_file.with_name(f".{zip_file.name}.{os.getpid()}.tmp")
+    try:
+        with temp_file.open('wb') as f:
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(file_path, arcname=arcname)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, zip_file)
+    except OSError:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+def load_csv_data(csv_path, zip_path):
+    """
+    Load CSV data from a regular CSV or a zipped CSV.
+
+    Args:
+        csv_path (Path): Path to the CSV file.
+        zip_path (Path): Path to the ZIP file.
+
+    Returns:
+        DataFrame: Pandas DataFrame containing the CSV data.
+    """
+    if zip_path.exists():
+        try:
+            df = pd.read_csv(zip_path, compression='zip', encoding="cp1252", encoding_errors='replace')
+            logging.info(f"Loaded data from zip '{zip_path}'.")
+            print(f"Loaded data from zip '{zip_path}'.")
+            return df
+        except Exception as e:
+            logging.error(f"Failed to read CSV from zip '{zip_path}': {e}")
+            print(f"Error: Failed to read CSV from zip '{zip_path}': {e}")
+    elif csv_path.exists():
+        try:
+            df = pd.read_csv(csv_path, encoding="cp1252", encoding_errors='replace')
+            logging.info(f"Loaded data from CSV '{csv_path}'.")
+            print(f"Loaded data from CSV '{csv_path}'.")
+            return df
+        except Exception as e:
+            logging.error(f"Failed to read CSV '{csv_path}': {e}")
+            print(f"Error: Failed to read CSV '{csv_path}': {e}")
+    else:
+        logging.error(f"No CSV or ZIP file found at '{csv_path}' or '{zip_path}'.")
+        print(f"Error: No CSV or ZIP file found at '{csv_path}' or '{zip_path}'.")
+    return pd.DataFrame()  # Return empty DataFrame on failure
+
+def fetch_pdf_links(base_url):
+    """
+    Fetch PDF links from Oak Park site.
+
+    Args:
+        base_url (str): The base URL to fetch PDFs from.
+
+    Returns:
+        list: List of PDF URLs.
+    """
+    try:
+        response = requests.get(base_url)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch PDF links from '{base_url}': {e}")
+        return []
+
+    soup = BeautifulSoup(response.content, 'html.parser')
+    pdf_links = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if href.lower().endswith('.pdf'):
+            if href.startswith('http'):
+                pdf_links.append(href)
+            else:
+                pdf_links.append('https://www.oak-park.us' + href)
+    return pdf_links
+
+def download_pdf(url, download_dir, redownload=False):
+    """
+    Download a PDF if not already downloaded (unless redownload=True).
+
+    Args:
+        url (str): The URL of the PDF to download.
+        download_dir (str or Path): The directory to save the downloaded PDF.
+        redownload (bool): If True, download even if the file exists.
+
+    Returns:
+        str or None: Path to the downloaded PDF or None if failed.
+    """
+    download_path = Path(download_dir)
+    download_path.mkdir(parents=True, exist_ok=True)
+    local_filename = download_path / Path(url).name
+
+    if not redownload and local_filename.exists():
+        return str(local_filename)
+
+    try:
+        resp = requests.get(url)
+        resp.raise_for_status()
+        with local_filename.open('wb') as f:
+            f.write(resp.content)
+        logging.info(f"Downloaded: {local_filename}")
+        print(f"Downloaded: {local_filename}")
+        return str(local_filename)
+    except requests.RequestException as e:
+        logging.error(f"Failed to download '{url}': {e}")
+        print(f"Failed to download '{url}': {e}")
+        return None
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """
+    SHA-256 hex digest of a file's contents.
+
+    Args:
+        file_path (str or Path): File to hash.
+        chunk_size (int): Bytes read per chunk.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def check_pdf_cache(pdf_path, pdf_cache, existing_complaint_numbers):
+    """
+    Decide whether a downloaded PDF needs (re)processing.
+
+    A PDF is skipped when its content is unchanged, its cache entry is all
+    error-free, and every complaint it produced is already in the dataset.
+    Content is compared by SHA-256; the digest is only recomputed when the
+    size or mtime differs from the cache entry, so a redownload, checkout or
+    copy that touches the mtime costs one hash instead of a reprocess. The
+    cache entry's stat fields are refreshed in place when the content matches.
+    An entry written before digests were cached is accepted on its complaints
+    alone and takes the current digest.
+
+    Args:
+        pdf_path (str or Path): Downloaded PDF.
+        pdf_cache (dict): PDF cache keyed by file name.
+        existing_complaint_numbers (set): Complaint numbers in the dataset.
+
+    Returns:
+        tuple: (process (bool), file info dict for the cache entry, or None
+        if the file could not be read)
+    """
+    filename = Path(pdf_path).name
+    try:
+        stat = Path(pdf_path).stat()
+    except OSError as e:
+        logging.error(f"Failed to get stats for '{pdf_path}': {e}")
+        print(f"Failed to get stats for '{pdf_path}': {e}")
+        return False, None
+    file_info = {"file_size": stat.st_size, "last_modified": stat.st_mtime}
+
+    cache_info = pdf_cache.get(filename, {})
+    if (
+        cache_info.get("sha256")
+        and file_info["file_size"] == cache_info.get("file_size", -1)
+        and file_info["last_modified"] == cache_info.get("last_modified", -1)
+    ):
+        # Stat unchanged: trust the cached digest
+        file_info["sha256"] = cache_info["sha256"]
+    else:
+        try:
+            file_info["sha256"] = file_sha256(pdf_path)
+        except OSError as e:
+            logging.error(f"Failed to hash '{pdf_path}': {e}")
+            print(f"Failed to hash '{pdf_path}': {e}")
+            return False, None
+        increment("pdfs_hashed")
+
+    if not cache_info:
+        logging.info(f"No cache entry for '{filename}'; processing...")
+        print(f"No cache entry for '{filename}'; processing...")
+        return True, file_info
+
+    has_digest = bool(cache_info.get("sha256"))
+    if has_digest:
+        unchanged = file_info["sha256"] == cache_info["sha256"]
+    else:
+        # Entry from before digests were cached: there is nothing to compare,
+        # so it stands if its complaints are all present, and adopts the digest
+        unchanged = True
+
+    if (
+        unchanged
+        and cache_info.get("all_error_free", False)
+        and all(c in existing_complaint_numbers for c in cache_info.get("complaints", []))
+    ):
+        # Record the digest and current stat so the next run skips the hash
+        cache_info.update(file_info)
+        logging.info(f"Skipping '{filename}' (cache says all error-free + all in CSV + unchanged).")
+        increment("pdfs_skipped")
+        print(f"Skipping '{filename}' (cache says all error-free + all in CSV + unchanged).")
+        return False, file_info
+
+    if not unchanged:
+        reason = "content changed"
+    elif not has_digest:
+        reason = "no cached digest; not all error-free or missing from CSV"
+    else:
+        reason = "not all error-free or missing from CSV"
+    logging.info(f"Reprocessing '{filename}' ({reason})...")
+    print(f"Reprocessing '{filename}' ({reason})...")
+    return True, file_info
@@ -0,0 +1,193 @@
+# utils/location_match.py
+
+import re
+import threading
+from collections import defaultdict
+
+# Minimum confidence for a cached location to stand in for a new variant
+DEFAULT_MIN_MATCH_CONFIDENCE = 0.8
+# A runner-up on a different street this close to the best is ambiguous
+MATCH_AMBIGUITY_MARGIN = 0.05
+# Confidence factor when only one side names a direction or suffix
+PARTIAL_MATCH_FACTOR = 0.9
+
+DIRECTIONS = {"north", "south", "east", "west"}
+# Street suffixes as written in the PDFs -> canonical suffix
+STREET_SUFFIXES = {
+    "street": "street", "st": "street",
+    "avenue": "avenue", "ave": "avenue", "av": "avenue",
+    "boulevard": "boulevard", "blvd": "boulevard",
+    "road": "road", "rd": "road",
+    "lane": "lane", "ln": "lane",
+    "drive": "drive", "dr": "drive",
+    "court": "court", "ct": "court",
+    "place": "place", "pl": "place",
+    "terrace": "terrace", "ter": "terrace",
+    "circle": "circle", "cir": "circle",
+    "parkway": "parkway", "pkwy": "parkway",
+}
+
+# "<number> [block [of]] <street>"; OCR splits numbers ("1 00") and "block"
+# ("bloc k"), and block ranges lose their dash ("0 100 block")
+ADDRESS_RE = re.compile(r"^(?P<number>\d+(?: \d+)*) (?:(?P<block>bloc ?k)(?: of)? )?(?P<street>\D.*)$")
+
+
+def block_number(number_text):
+    """
+    Canonical block or house number from the digits before the street.
+
+    "0 100" (a 0-100 block range) -> 100, "0100" -> 100, "1 00" -> 100.
+    """
+    tokens = number_text.split()
+    if len(tokens) > 1 and not tokens[0].strip("0"):
+        tokens = tokens[1:]
+    return int("".join(tokens))
+
+
+def decompose_location(normalized_loc_str):
+    """
+    Split a normalized location into block number, direction, street name
+    and suffix.
+
+    Args:
+        normalized_loc_str (str): Location from normalize_location.
+
+    Returns:
+        tuple or None: (number, is_block, direction, street, suffix), with
+        direction and suffix None when absent; None if the location does
+        not start with a number.
+    """
+    match = ADDRESS_RE.match(normalized_loc_str)
+    if not match:
+        return None
+    return (
+        block_number(match.group("number")),
+        match.group("block") is not None,
+        *split_street(match.group("street")),
+    )
+
+
+def split_street(street_text):
+    """
+    Split a normalized street into direction, name and suffix.
+
+    A leading direction is only split off when a name follows it, so
+    "south boulevard" and "north avenue" keep their names.
+
+    Returns:
+        tuple: (direction, name, suffix), direction and suffix None when absent.
+    """
+    tokens = street_text.split()
+    direction = None
+    if len(tokens) > 1 and tokens[0] in DIRECTIONS and (len(tokens) > 2 or tokens[1] not in STREET_SUFFIXES):
+        direction = tokens.pop(0)
+    suffix = None
+    if len(tokens) > 1 and tokens[-1] in STREET_SUFFIXES:
+        suffix = STREET_SUFFIXES[tokens.pop()]
+    return direction, " ".join(tokens), suffix
+
+
+def street_similarity(a, b):
+    """
+    1 - Levenshtein distance / length of the longer street name.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+def part_factor(a, b):
+    """
+    1 when both parts agree, PARTIAL_MATCH_FACTOR when one is missing,
+    0 when they conflict.
+    """
+    if a == b:
+        return 1.0
+    if a is None or b is None:
+        return PARTIAL_MATCH_FACTOR
+    return 0.0
+
+
+class LocationMatcher:
+    """
+    Fuzzy lookup of location-cache keys.
+
+    Keys are decomposed into (number, is_block, direction, street, suffix)
+    and bucketed by number, so a query is only compared with locations on
+    the same block. Within a bucket the street names are scored by edit
+    distance (see street_similarity), scaled down when the direction or suffix
+    is missing on one side and rejected when they conflict.
+    """
+
+    def __init__(self):
+        self.buckets = defaultdict(list)
+        self.keys = set()
+        self.lock = threading.Lock()
+
+    def add(self, key, lat, lng):
+        """
+        Index one cache key with its coordinates (keys not starting with a
+        number are ignored).
+        """
+        with self.lock:
+            if key in self.keys:
+                return
+            self.keys.add(key)
+            parts = decompose_location(key)
+            if parts is not None:
+                number, is_block, direction, street, suffix = parts
+                self.buckets[(number, is_block)].append((direction, street, suffix, key, lat, lng))
+
+    def match(self, normalized_loc_str, min_confidence=DEFAULT_MIN_MATCH_CONFIDENCE):
+        """
+        Best indexed location for a query.
+
+        Args:
+            normalized_loc_str (str): Location from normalize_location.
+            min_confidence (float): Minimum score to accept (0-1).
+
+        Returns:
+            tuple or None: (key, lat, lng, confidence), or None if no
+            candidate clears min_confidence or the best is ambiguous.
+        """
+        parts = decompose_location(normalized_loc_str)
+        if parts is None:
+            return None
+        number, is_block, direction, street, suffix = parts
+        with self.lock:
+            candidates = list(self.buckets.get((number, is_block), ()))
+
+        scored = []
+        for c_direction, c_street, c_suffix, key, lat, lng in candidates:
+            if key == normalized_loc_str:
+                continue
+            factor = part_factor(direction, c_direction) * part_factor(suffix, c_suffix)
+            # Edit distance is at least the length difference; skip hopeless candidates
+            longest = max(len(street), len(c_street), 1)
+            floor = min_confidence - MATCH_AMBIGUITY_MARGIN
+            if factor == 0 or factor * (1 - abs(len(street) - len(c_street)) / longest) < floor:
+                continue
+            confidence = factor * street_similarity(street, c_street)
+            if confidence >= floor:
+                scored.append((confidence, (c_direction, c_street), key, lat, lng))
+        if not scored:
+            return None
+        scored.sort(key=lambda s: s[0], reverse=True)
+        confidence, best_street, key, lat, lng = scored[0]
+        if confidence < min_confidence:
+            return None
+        # "400 block of harlem" is as close to north as to south Harlem
+        for runner_up, c_street, *_ in scored[1:]:
+            if confidence - runner_up > MATCH_AMBIGUITY_MARGIN:
+                break
+            if c_street != best_street:
+                return None
+        return key, lat, lng, confidence
@@ -0,0 +1,111 @@
+# utils/locations.py
+
+import re
+import string
+
+# Version of the location-cache key space produced by normalize_location.
+# Bump this whenever the normalization rules change and run
+# migrate_location_cache.py so existing cache keys are rewritten.
+LOCATION_KEY_VERSION = 2
+
+def normalize_location(loc_str, version=LOCATION_KEY_VERSION):
+    """
+    Normalize the location string to ensure consistency in caching.
+    
+    Steps:
+    - Convert to lowercase.
+    - Remove leading/trailing whitespace.
+    - Remove punctuation.
+    - Replace multiple spaces with a single space.
+    - Standardize common street suffixes.
+    - (version >= 2) Drop dashes and expand directional prefixes ("n" -> "north").
+    
+    Args:
+        loc_str (str or float): The original location string.
+        version (int): Key-space version to produce (defaults to the current one).
+
+    Returns:
+        str: The normalized location string.
+    """
+    if not isinstance(loc_str, str):
+        # Non-strings come from DataFrame cells, so pandas is already loaded
+        import pandas as pd
+        if pd.isna(loc_str):
+            loc_str = ""
+        else:
+            loc_str = str(loc_str)
+    
+    if not loc_str:
+        return ""
+    
+    # Convert to lowercase
+    loc_str = loc_str.lower()
+    # Remove leading/trailing whitespace
+    loc_str = loc_str.strip()
+    # Remove punctuation
+    loc_str = loc_str.translate(str.maketrans('', '', string.punctuation))
+    if version >= 2:
+        # string.punctuation only covers ASCII; PDFs also use en/em dashes
+        loc_str = re.sub(r'[\u2010-\u2015]', ' ', loc_str)
+    # Replace multiple spaces with a single space
+    loc_str = re.sub(r'\s+', ' ', loc_str)
+    if version >= 2:
+        loc_str = standardize_directions(loc_str.strip())
+    # Standardize suffixes
+    loc_str = standardize_suffix(loc_str)
+    return loc_str
+
+def standardize_directions(address):
+    """
+    Expand single-letter directional prefixes ("n taylor" -> "north taylor").
+
+    Only tokens followed by another word are expanded, so a trailing letter
+    (e.g., a unit) is left alone.
+
+    Args:
+        address (str): The address string.
+
+    Returns:
+        str: The address with expanded directions.
+    """
+    direction_mapping = {
+        "n": "north",
+        "s": "south",
+        "e": "east",
+        "w": "west",
+    }
+    tokens = address.split()
+    for i, token in enumerate(tokens[:-1]):
+        if token in direction_mapping:
+            tokens[i] = direction_mapping[token]
+    return ' '.join(tokens)
+
+def standardize_suffix(address):
+    """
+    Standardize common street suffixes to ensure consistency.
+
+    Args:
+        address (str): The address string.
+
+    Returns:
+        str: The address with standardized suffixes.
+    """
+    suffix_mapping = {
+        "st": "street",
+        "ave": "avenue",
+        "blvd": "boulevard",
+        "rd": "road",
+        "ln": "lane",
+        "dr": "drive",
+        "ct": "court",
+        "pl": "place",
+        "ter": "terrace",
+        "cir": "circle",
+        # Add more suffixes as needed
+    }
+    tokens = address.split()
+    if tokens:
+        last_token = tokens[-1]
+        if last_token in suffix_mapping:
+            tokens[-1] = suffix_mapping[last_token]
+    return ' '.join(tokens)
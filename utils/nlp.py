@@ -0,0 +1,44 @@
+# utils/nlp.py
+
+import re
+import string
+
+from nltk.corpus import stopwords
+
+def clean_narrative_basic(narrative):
+    """
+    Lightly clean the original narrative:
+      - Lowercase
+      - Reduce multiple spaces
+    (No punctuation removal or stopword removal.)
+
+    Args:
+        narrative (str): The original narrative text.
+
+    Returns:
+        str: Lightly cleaned narrative.
+    """
+    lowercased = narrative.lower()
+    light_clean = re.sub(r"\s+", " ", lowercased).strip()
+    return light_clean
+
+def process_narrative_nlp(narrative):
+    """
+    Full NLP cleaning of the narrative:
+      - Remove punctuation
+      - Lowercase
+      - Remove English stopwords
+
+    Args:
+        narrative (str): The original narrative text.
+
+    Returns:
+        str: Fully processed narrative.
+    """
+    narrative_no_punct = narrative.translate(str.maketrans('', '', string.punctuation))
+    narrative_lower = narrative_no_punct.lower()
+    tokens = narrative_lower.split()
+    stop_words = set(stopwords.words('english'))
+    tokens_clean = [t for t in tokens if t not in stop_words]
+    processed = " ".join(tokens_clean)
+    return processed
@@ -0,0 +1,480 @@
+# utils/parsing.py
+
+import os
+import re
+import mmap
+import time
+import logging
+import unicodedata
+
+from dateutil import parser as date_parser
+from PyPDF2 import PdfReader
+try:
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.layout import LAParams, LTTextContainer
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+except ImportError:  # optional layout-aware text backend
+    PDFPage = None
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional faster text backend
+    pdfium = None
+
+from pipeline_metrics import stage_timer, add_timing, increment
+from text_repair import repair_text
+from utils.locations import normalize_location
+from utils.nlp import clean_narrative_basic, process_narrative_nlp
+from utils.geocode import cached_location_coords, geocode_location
+
+def clean_text(text):
+    """
+    Normalize text from PDF pages.
+
+    Args:
+        text (str): Raw text extracted from a PDF.
+
+    Returns:
+        str: Cleaned and normalized text.
+    """
+    if not isinstance(text, str):
+        logging.warning(f"Expected string for text cleaning, got {type(text)}. Converting to string.")
+        text = str(text)
+    text = unicodedata.normalize("NFKD", text)
+    text = re.sub(r"\n+", " ", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip()
+
+def parse_date(date_str):
+    """
+    Parse a date string -> 'YYYY-MM-DD' or '1900-01-01' if fail.
+
+    This function attempts to handle multiple date formats, including:
+      - D MMM YYYY (e.g., 1 Jan 2023)
+      - MM/DD/YYYY
+      - YYYY-MM-DD
+      - etc.
+
+    Steps:
+      1) If the string is empty, return '1900-01-01'.
+      2) Normalize common delimiters like hyphens, en-dashes, em-dashes, slashes, etc.
+      3) Use a regex to find possible date substrings.
+      4) Parse using dateutil.parser with dayfirst=True (adjust if needed).
+      5) Return the 'latest' date if multiple are found, or '1900-01-01' if none.
+    """
+    if not date_str:
+        return "1900-01-01"
+    date_str = date_str.strip()
+    # Replace multiple dashes or slashes with a single hyphen
+    # Example: "12/01/2023 – 12/02/2023" -> "12-01-2023 - 12-02-2023"
+    date_str = re.sub(r'\s*[-–—/]\s*', '-', date_str)
+
+    # date_pattern = (
+    #     r'(\d{1,2}[A-Za-z]{3}\d{2,4}|'      
+    #     r'\d{1,2}-[A-Za-z]{3}-\d{2,4})'
+    # )
+
+    # # Extended date patterns to capture more variations
+    date_pattern = (
+        r'(\d{1,2}[A-Za-z]{3}-\d{2,4})|'     # e.g. "1Jan-2023" or "12Dec-21"
+        r'(\d{1,2}-[A-Za-z]{3}-\d{2,4})|'    # e.g. "1-Jan-2023"
+        r'(\d{1,2}\s[A-Za-z]{3,9}\s\d{2,4})|' # e.g. "1 Jan 2023"
+        r'([A-Za-z]{3,9}\s\d{1,2},\s?\d{4})|' # e.g. "January 1, 2023"
+        r'(\d{4}-\d{2}-\d{2})|'              # e.g. "2023-01-01"
+        r'(\d{1,2}/\d{1,2}/\d{4})|'          # e.g. "12/31/2023"
+        r'(\d{1,2}\s[A-Za-z]{4,9}\s\d{4})'   # e.g. "1 January 2023"
+    )
+    matches = re.findall(date_pattern, date_str, flags=re.IGNORECASE)
+
+    # The regex above returns a tuple for each match, so flatten them
+    # Each match might be something like ('12/31/2023', '', '', '', '', '', '')
+    # We'll filter out empty strings below
+
+    flattened = []
+    for match_tuple in matches:
+        for m in match_tuple:
+            if m.strip():
+                flattened.append(m.strip())
+
+    # If no matches, just attempt a direct parse in case there's a weird format
+    if not flattened:
+        try:
+            dt = date_parser.parse(date_str, dayfirst=True, fuzzy=True)
+            return dt.strftime("%Y-%m-%d")
+        except:
+            return "1900-01-01"
+
+    # If there's at least one match, parse them all
+    parsed_dates = []
+    for d in flattened:
+        try:
+            dt = date_parser.parse(d, dayfirst=True, fuzzy=True)
+            parsed_dates.append(dt)
+        except:
+            continue
+
+    # If any valid dates were parsed, return the latest
+    if parsed_dates:
+        return max(parsed_dates).strftime("%Y-%m-%d")
+
+    # If we got here, everything failed
+    return "1900-01-01"
+
+# Field patterns for one complaint block of a daily summary PDF
+COMPLAINT_MARKER  = "COMPLAINT NUMBER:"
+COMPLAINT_PATTERN = r"COMPLAINT NUMBER:\s*(\d{2}-\d{5})(?=\s+OFFENSE:|$)"
+OFFENSE_PATTERN   = r"OFFENSE:\s+(.*?)\s+DATE\(S\):"
+DATE_PATTERN      = r"DATE\(S\)\s*:?\s+([A-Za-z0-9\s&\-–—/]+?)(?=\s+TIME\(S\)|\s+$)"
+TIME_PATTERN      = r"TIME\(S\):\s+([\d:HRS\s\-–—]+)"
+LOCATION_PATTERN  = r"LOCATION:\s+(.+?)(?=\s+(?:VICTIM/ADDRESS|NARRATIVE|NARRITIVE|NARRTIVE))"
+VICTIM_PATTERN    = r"VICTIM/ADDRESS:\s+(.+?)(?=\s+NARRATIVE|NARRITIVE|NARRTIVE)"
+NARRATIVE_PATTERN = r"NARR(?:ATIVE|ITIVE|TIVE)\s*:\s+(.+?)(?=COMPLAINT NUMBER|$)"
+
+def pypdf2_page_texts(pdf_file):
+    """
+    PDF text backend using PyPDF2 (pure Python; the default).
+    """
+    with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reader = PdfReader(mapped)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+def pdfminer_page_texts(pdf_file):
+    """
+    PDF text backend using pdfminer.six.
+
+    Layout ordering is disabled (boxes_flow=None) so each label stays next
+    to its value, and a wide char_margin keeps words whole where PyPDF2
+    inserts spaces ("blo ck").
+    """
+    with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        resource_manager = PDFResourceManager()
+        device = PDFPageAggregator(resource_manager, laparams=LAParams(boxes_flow=None, char_margin=20))
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        for page in PDFPage.get_pages(mapped):
+            interpreter.process_page(page)
+            layout = device.get_result()
+            yield "\n".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+def pdfium_page_texts(pdf_file):
+    """
+    PDF text backend using pypdfium2 (PDFium, compiled). PDFium reads the
+    blocks it needs from the file on demand.
+    """
+    document = pdfium.PdfDocument(pdf_file)
+    try:
+        for page in document:
+            textpage = page.get_textpage()
+            yield textpage.get_text_range()
+            textpage.close()
+            page.close()
+    finally:
+        document.close()
+
+# PDF text backends: name -> (callable yielding raw page texts from an open
+# binary PDF file, True if its library is installed). Others may be added with
+# register_pdf_text_backend.
+PDF_TEXT_BACKENDS = {
+    "pypdf2": (pypdf2_page_texts, True),
+    "pdfminer": (pdfminer_page_texts, PDFPage is not None),
+    "pypdfium2": (pdfium_page_texts, pdfium is not None),
+}
+DEFAULT_PDF_TEXT_BACKEND = "pypdf2"
+
+# Backend used by iter_pdf_pages for this run (see set_pdf_text_backend)
+pdf_text_backend = DEFAULT_PDF_TEXT_BACKEND
+
+def register_pdf_text_backend(name, page_texts, available=True):
+    """
+    Register a PDF text backend.
+
+    Args:
+        name (str): Backend name used with set_pdf_text_backend.
+        page_texts (callable): page_texts(pdf_file) yielding raw text per page.
+        available (bool): False if its library is not installed.
+    """
+    PDF_TEXT_BACKENDS[name] = (page_texts, available)
+
+def available_pdf_text_backends():
+    """
+    Names of the PDF text backends whose libraries are installed.
+    """
+    return [name for name, (_, available) in PDF_TEXT_BACKENDS.items() if available]
+
+def set_pdf_text_backend(name=None):
+    """
+    Select the PDF text backend for this run.
+
+    Args:
+        name (str): Backend name; defaults to the OP_CRIME_PDF_BACKEND
+            environment variable, then DEFAULT_PDF_TEXT_BACKEND.
+
+    Returns:
+        str: The selected backend name.
+
+    Raises:
+        ValueError: If the backend is unknown or its library is not installed.
+    """
+    global pdf_text_backend
+    name = (name or os.getenv("OP_CRIME_PDF_BACKEND") or DEFAULT_PDF_TEXT_BACKEND).lower()
+    if name not in PDF_TEXT_BACKENDS:
+        raise ValueError(f"Unknown PDF text backend '{name}'. Expected one of {sorted(PDF_TEXT_BACKENDS)}.")
+    if not PDF_TEXT_BACKENDS[name][1]:
+        raise ValueError(f"PDF text backend '{name}' is not installed.")
+    pdf_text_backend = name
+    return name
+
+def iter_pdf_pages(file_path, backend=None):
+    """
+    Yield the cleaned text of each PDF page, one page at a time.
+
+    Pages are extracted lazily from the file (memory-mapped by the Python
+    backends), so only the page being parsed is held as text.
+
+    Args:
+        file_path (str or Path): Path to the PDF file.
+        backend (str): PDF text backend (defaults to the one selected with
+            set_pdf_text_backend).
+
+    Yields:
+        str: Cleaned page text (see clean_text).
+    """
+    page_texts, _ = PDF_TEXT_BACKENDS[backend or pdf_text_backend]
+    with open(file_path, 'rb') as pdf_file:
+        pages = page_texts(pdf_file)
+        while True:
+            with stage_timer("pdf_text_extraction"):
+                raw_text = next(pages, None)
+            if raw_text is None:
+                break
+            with stage_timer("text_cleaning"):
+                page_text = clean_text(raw_text)
+            yield page_text
+
+def iter_complaint_blocks(pages):
+    """
+    Group page texts into complaint blocks.
+
+    A block runs from one "COMPLAINT NUMBER:" marker to the next, so a
+    complaint continued on the following page is yielded once that page
+    reaches the next marker (or the document ends). Text before the first
+    marker (the report header) is dropped.
+
+    Args:
+        pages (iterable of str): Cleaned page texts in order.
+
+    Yields:
+        str: Text of one complaint, starting with its marker.
+    """
+    buffer = ""
+    for page_text in pages:
+        if not page_text:
+            continue
+        buffer = f"{buffer} {page_text}" if buffer else page_text
+        start = buffer.find(COMPLAINT_MARKER)
+        if start < 0:
+            buffer = ""
+            continue
+        next_start = buffer.find(COMPLAINT_MARKER, start + 1)
+        while next_start >= 0:
+            yield buffer[start:next_start].rstrip()
+            start = next_start
+            next_start = buffer.find(COMPLAINT_MARKER, start + 1)
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer
+
+def extract_data_from_pdf(file_path, gmaps_client, location_cache, reprocess_locs, existing_complaint_numbers,pdf_url):
+    """
+    Extract data from PDF, returning (report, log_entries).
+    Only processes complaints not already in existing_complaint_numbers.
+
+    Pages are streamed and each complaint is parsed from its own block, so
+    a field missing from one complaint cannot shift values onto the next.
+
+    Args:
+        file_path (str or Path): Path to the PDF file.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client.
+        location_cache (dict): Cache of normalized locations to entries
+            (see make_location_entry; legacy [lat, lng] values are accepted).
+        reprocess_locs (bool): Flag to force reprocessing of locations.
+        existing_complaint_numbers (set): Set of complaint numbers already processed.
+
+    Returns:
+        tuple: (list of report entries, list of log entries)
+    """
+    # Resolve the debug check once per PDF so the per-complaint loop never
+    # builds log strings when DEBUG is disabled
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    report = []
+    log_entries = []
+    num_entries = 0
+    try:
+        for block in iter_complaint_blocks(iter_pdf_pages(file_path)):
+            num_entries += 1
+            entry = parse_complaint_block(
+                block, gmaps_client, location_cache, reprocess_locs,
+                existing_complaint_numbers, pdf_url, log_entries, debug_enabled
+            )
+            if entry is not None:
+                report.append(entry)
+    except Exception as e:
+        logging.error(f"Failed to read PDF '{file_path}': {e}")
+        return [], [f"Failed to read PDF '{file_path}': {e}"]
+
+    logging.debug("Number of complaints found: %d", num_entries)
+    return report, log_entries
+
+def parse_complaint_block(block, gmaps_client, location_cache, reprocess_locs, existing_complaint_numbers,
+                          pdf_url, log_entries, debug_enabled=False):
+    """
+    Parse, geocode and validate one complaint block.
+
+    Args:
+        block (str): Complaint text from iter_complaint_blocks.
+        gmaps_client (googlemaps.Client): Initialized Google Maps client, or
+            None to leave uncached locations without coordinates.
+        location_cache (dict): Location cache; updated in place on lookups.
+        reprocess_locs (bool): Flag to force reprocessing of locations.
+        existing_complaint_numbers (set): Complaint numbers already processed.
+        pdf_url (str): Source URL recorded in 'File Name'.
+        log_entries (list): Error log lines are appended here.
+        debug_enabled (bool): Whether DEBUG logging is on.
+
+    Returns:
+        dict or None: Report entry, or None if the block was skipped.
+    """
+    def field(pattern, flags=0):
+        match = re.search(pattern, block, flags=flags)
+        return match.group(1).strip() if match else "N/A"
+
+    try:
+        with stage_timer("regex_parse"):
+            complaint_match = re.search(COMPLAINT_PATTERN, block, flags=re.DOTALL)
+            if not complaint_match:
+                logging.debug("No complaint number in block: %s", block[:80])
+                return None
+            comp_num = complaint_match.group(1)
+
+            # Skip already processed complaints
+            if comp_num in existing_complaint_numbers:
+                logging.info("Skipping already processed Complaint # %s", comp_num)
+                increment("complaints_skipped_existing")
+                return None
+
+            # Extract other fields
+            offense  = field(OFFENSE_PATTERN, re.DOTALL)
+            raw_date = field(DATE_PATTERN)
+            time_str = field(TIME_PATTERN)
+            loc_str  = field(LOCATION_PATTERN, re.DOTALL)
+            victim   = field(VICTIM_PATTERN, re.DOTALL)
+            narr_raw = field(NARRATIVE_PATTERN, re.DOTALL)
+
+        # Log extracted fields
+        if debug_enabled:
+            logging.debug(
+                "Processing Complaint #%s:\n  Offense: %s\n  Time: %s\n  Location: %s\n"
+                "  Victim/Address: %s\n  Narrative: %s",
+                comp_num, offense, time_str, loc_str, victim, narr_raw
+            )
+
+        # Normalize location
+        normalized_loc_str = normalize_location(loc_str)
+
+        with stage_timer("nlp"):
+            # Re-join words split by PDF extraction ("FO OTAGE")
+            if narr_raw != "N/A":
+                narr_raw = repair_text(narr_raw)
+
+            # Clean narrative
+            narrative_cleaned = clean_narrative_basic(narr_raw) if narr_raw != "N/A" else "N/A"
+
+            # NLP processing
+            if narr_raw != "N/A":
+                nlp_text = process_narrative_nlp(narr_raw)
+                nlp_flag = 1
+            else:
+                nlp_text = "N/A"
+                nlp_flag = 0
+
+        # Geocode location: cached successes are final; cached failures
+        # are retried only once their backoff has elapsed
+        cached_coords = cached_location_coords(normalized_loc_str, location_cache, reprocess_locs)
+        if cached_coords is not None:
+            lat, lng = cached_coords
+            increment("geocode_cache_hits")
+            logging.debug("Using cached coordinates for '%s': (%s, %s)", normalized_loc_str, lat, lng)
+        elif gmaps_client is None:
+            # Geocoding deferred to the caller (see ingest_pipeline)
+            lat, lng = None, None
+        else:
+            increment("geocode_cache_misses")
+            with stage_timer("geocoding"):
+                lat, lng = geocode_location(loc_str, normalized_loc_str, gmaps_client, location_cache)
+            if lat is not None and lng is not None:
+                logging.debug("Geocoded '%s' to (%s, %s)", loc_str, lat, lng)
+            else:
+                logging.debug("Failed to geocode '%s'", loc_str)
+        loc_flag = 1 if (lat is not None and lng is not None) else 0
+
+        # Parse date
+        date_start = time.perf_counter()
+        try:
+            if raw_date == "N/A":
+                raw_date = "1900-01-01"
+            # If you have multiple dates separated by '&', split them
+            date_strs = raw_date.split("&")
+            parsed_dates = [parse_date(d) for d in date_strs]
+            parsed_date = max(parsed_dates) if parsed_dates else "1900-01-01"
+        except:
+            parsed_date = "1900-01-01"
+            logging.debug("Parsed Date: %s", parsed_date)
+        add_timing("date_parsing", time.perf_counter() - date_start)
+
+        #TODO clean up processing. Using pdf_url since its faster
+        filename = pdf_url
+        # Create entry
+        entry = {
+            "Date": parsed_date,
+            "Complaint #": comp_num,
+            "Offense": offense,
+            "Time": time_str,
+            "Location": loc_str,
+            "Victim/Address": victim,
+            "Narrative": narrative_cleaned,  # lightly cleaned
+            "NLP_Text": nlp_text,            # fully processed
+            "File Name": filename,
+            "Lat": lat,
+            "Long": lng,
+            "Loc": loc_flag,
+            "nlp": nlp_flag
+        }
+
+        # Define critical fields for error checking
+        critical_fields = ["Date", "Complaint #", "Offense"]
+
+        # Check for errors
+        error_reasons = []
+        for critical_field in critical_fields:
+            if entry[critical_field] in ["N/A", "1900-01-01", None]:
+                error_reasons.append(f"Missing or invalid {critical_field}")
+
+        if not error_reasons:
+            entry["Error Free"] = 1
+        else:
+            entry["Error Free"] = 0
+            entry["Error Reasons"] = "; ".join(error_reasons)
+
+            # Log the complaint's block for the error report
+            debug_log = f"\n[DEBUG] Error block for Complaint # {comp_num}:\n{block.strip()}\n"
+            logging.debug(debug_log)
+            log_entries.append(debug_log)
+
+        return entry
+
+    except Exception as e:
+        error_message = f"Error processing complaint block '{block[:40]}' in '{pdf_url}': {e}"
+        logging.error(error_message)
+        log_entries.append(error_message)
+        return None
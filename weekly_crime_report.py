@@ -13,11 +13,11 @@ from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import base64
 import sys
+import threading
 
 import numpy as np
 import re
 import hashlib
-import requests
 
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -27,6 +27,10 @@ from googleapiclient.errors import HttpError
 
 # Local utility to load env vars
 from utils import load_env_vars,extract_year,upload_files,git_commit_and_force_push
+from mailchimp_sync import sync_mailchimp_subscribers, wait_for_url
+from email_delivery import deliver_in_batches, DEFAULT_BATCH_SIZE
+from log_config import configure_logging
+from complaint_merge import merge_complaints
 
 # Folium plugins
 from folium.plugins import MarkerCluster, HeatMap#, MeasureControl #probably later....
@@ -54,48 +58,16 @@ SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
 #     return df['Email'].tolist()
 
-def get_mailchimp_subscribers():
+def get_mailchimp_subscribers(cache_path=None):
     """
     Fetches all subscribed members from the Mailchimp audience.
-    Handles pagination to retrieve all subscribers.
+    Uses the local subscriber cache so only members changed since the last
+    sync are requested; pages are fetched concurrently (see mailchimp_sync).
     """
-    MAILCHIMP_API_KEY = os.getenv("MAILCHIMP_API_KEY")
-    MAILCHIMP_AUDIENCE_ID = os.getenv("MAILCHIMP_AUDIENCE_ID")
-    MAILCHIMP_DATA_CENTER = os.getenv("MAILCHIMP_DATA_CENTER")  # e.g., 'us1', 'us2'
-
-    if not all([MAILCHIMP_API_KEY, MAILCHIMP_AUDIENCE_ID, MAILCHIMP_DATA_CENTER]):
-        raise ValueError("Missing Mailchimp API configuration in environment variables.")
-
-    MAILCHIMP_API_URL = f"https://{MAILCHIMP_DATA_CENTER}.api.mailchimp.com/3.0"
-    endpoint = f"/lists/{MAILCHIMP_AUDIENCE_ID}/members"
-    params = {
-        "status": "subscribed",
-        "count": 1000,  # Max allowed by Mailchimp
-        "offset": 0
-    }
-    subscribers = []
-
-    while True:
-        response = requests.get(
-            MAILCHIMP_API_URL + endpoint,
-            auth=("anystring", MAILCHIMP_API_KEY),
-            params=params
-        )
-
-        if response.status_code != 200:
-            logging.error(f"Failed to fetch subscribers: {response.status_code} - {response.text}")
-            raise Exception(f"Mailchimp API Error: {response.status_code} - {response.text}")
-
-        data = response.json()
-        members = data.get('members', [])
-        subscribers.extend([member['email_address'] for member in members])
-
-        total_items = data.get('total_items', 0)
-        if len(subscribers) >= total_items:
-            break
-        params['offset'] += params['count']
-        time.sleep(1)  # To respect API rate limits
+    if cache_path is None:
+        cache_path = Path(__file__).parent.resolve() / 'cache' / 'mailchimp_subscribers.json'
 
+    subscribers = sync_mailchimp_subscribers(cache_path)
     logging.info(f"Fetched {len(subscribers)} subscribers from Mailchimp.")
     return subscribers
 
@@ -140,6 +112,9 @@ def load_all_crimes(zip_file_path):
         with z.open('summary_report.csv') as csvfile:
             df = pd.read_csv(csvfile, encoding='cp1252', on_bad_lines='skip')
 
+    # One row per complaint, even when several reports listed it
+    df = merge_complaints(df)
+
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
     df = df[df['Date'].notna()]
     df.sort_values(by='Date', ascending=False, inplace=True)
@@ -615,17 +590,22 @@ def send_email_with_disclaimer_and_links(
     to_emails,
     subject,
     body_text,
-    attachments
+    attachments,
+    ledger_path,
+    service_factory=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_workers=4
 ):
     """
     Sends an email with disclaimers and links using the Gmail API.
+
+    Recipients are BCC'd in batches of `batch_size`, sent from a bounded thread
+    pool and tracked per recipient in the delivery ledger at `ledger_path`, so a
+    rerun after a crash only sends to recipients that were never attempted.
+    `service_factory` builds one Gmail service per worker thread (the client is
+    not thread-safe); without it, batches are sent serially through `service`.
     """
     try:
-        message = MIMEMultipart()
-        message['to'] = "Undisclosed Recipients <jesse@jesse-anderson.net>"
-        message['subject'] = subject
-        message['from'] = sender_email
-
         # disclaimer = """
         # <p><strong>Important Legal Disclaimer</strong></p>
         # <p><strong>By using this demonstrative research tool, you acknowledge and agree:</strong></p>
@@ -704,31 +684,56 @@ Best,
 Crime Report Bot
         """
 
-        part1 = MIMEText(plain_text, 'plain')
-        # part2 = MIMEText(html, 'html')
-        message.attach(part1)
-        # message.attach(part2)
-
-        bcc_emails = ", ".join(to_emails)
-        message['bcc'] = bcc_emails
-
-        # Attach the CSV
+        # Read attachments once; every batch reuses the same bytes
+        attachment_payloads = []
         for file_path in attachments:
             file_path = Path(file_path)
             if not file_path.exists():
                 logging.warning(f"Attachment '{file_path}' not found, skipping.")
                 continue
             with open(file_path, 'rb') as f:
-                mime_application = MIMEApplication(f.read(), Name=file_path.name)
-            mime_application['Content-Disposition'] = f'attachment; filename="{file_path.name}"'
-            message.attach(mime_application)
-
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        body = {'raw': raw_message}
-
-        sent_message = service.users().messages().send(userId="me", body=body).execute()
-        logging.info(f"Email sent successfully. Message ID: {sent_message['id']}")
-        print("Crime report email sent successfully.")
+                attachment_payloads.append((file_path.name, f.read()))
+
+        thread_state = threading.local()
+
+        def send_batch(batch):
+            message = MIMEMultipart()
+            message['to'] = "Undisclosed Recipients <jesse@jesse-anderson.net>"
+            message['subject'] = subject
+            message['from'] = sender_email
+            message.attach(MIMEText(plain_text, 'plain'))
+            message['bcc'] = ", ".join(batch)
+
+            # Attach the CSV
+            for name, payload in attachment_payloads:
+                mime_application = MIMEApplication(payload, Name=name)
+                mime_application['Content-Disposition'] = f'attachment; filename="{name}"'
+                message.attach(mime_application)
+
+            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
+            body = {'raw': raw_message}
+
+            if service_factory is None:
+                batch_service = service
+            else:
+                if not hasattr(thread_state, "service"):
+                    thread_state.service = service_factory()
+                batch_service = thread_state.service
+            sent_message = batch_service.users().messages().send(userId="me", body=body).execute()
+            logging.info(f"Email batch of {len(batch)} sent. Message ID: {sent_message['id']}")
+            return sent_message['id']
+
+        summary = deliver_in_batches(
+            send_batch,
+            to_emails,
+            ledger_path,
+            batch_size=batch_size,
+            max_workers=max_workers if service_factory is not None else 1
+        )
+        print(
+            f"Crime report email delivery: {summary['sent']} sent, {summary['failed']} failed, "
+            f"{summary['skipped']} already sent, {summary['unknown']} unknown."
+        )
     except Exception as e:
         logging.error(f"Failed to send email: {e}")
         print(f"[ERROR] Failed to send email: {e}")
@@ -761,11 +766,7 @@ def main_report_generation():
     if not sender_email:
         raise ValueError("Missing SENDER_EMAIL in env_vars.txt")
 
-    logging.basicConfig(
-        filename=script_dir / 'full_crime_report.log',
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    configure_logging(script_dir / 'full_crime_report.log')
 
     data_dir = script_dir / 'data'
     map_dir = script_dir / 'generated_maps'
@@ -892,6 +893,7 @@ def main_report_generation():
             print(f"Prepared commit message: '{commit_message}'")
 
             # Commit and force push changes
+            pushed_at = datetime.now().astimezone()
             git_commit_and_force_push(github_repo_path, commit_message)
 
             logging.info("Script finished successfully.")
@@ -918,7 +920,11 @@ def main_report_generation():
             logging.error(f"Authentication failed: {e}")
             print(f"[ERROR] Authentication failed: {e}")
             return
-        time.sleep(60) #time to build github pages....
+        # Wait for GitHub Pages to serve the new map instead of a fixed minute
+        if not githubTest:
+            if not wait_for_url(weekly_map_url, timeout=300, interval=5, not_before=pushed_at):
+                logging.warning("GitHub Pages not confirmed ready; sending email anyway.")
+                print("Warning: GitHub Pages not confirmed ready; sending email anyway.")
         # (K) Load Recipients
         try:
             # to_list = load_recipients_list(recipients_csv)
@@ -943,6 +949,8 @@ def main_report_generation():
             'csv_url': csv_url
         }
         attachments = []
+        # One ledger per report period, so a rerun of the same week resumes delivery
+        ledger_path = script_dir / 'cache' / f"email_ledger_{body_text['start_date']}_{body_text['end_date']}.jsonl"
 
         try:
             send_email_with_disclaimer_and_links(
@@ -951,7 +959,9 @@ def main_report_generation():
                 to_emails=to_list,
                 subject=subject,
                 body_text=body_text,
-                attachments=attachments
+                attachments=attachments,
+                ledger_path=ledger_path,
+                service_factory=get_gmail_service
             )
         except Exception as e:
             logging.error(f"Failed to send email: {e}")